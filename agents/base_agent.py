@@ -1,18 +1,57 @@
 # agents/base_agent.py
+import copy
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Any # <--- ADD THIS LINE
+from typing import Any, Optional
 from utils.logger import agent_logger
-from database.db_manager import db_manager
+from utils.metrics import metrics
+from database.db_manager import DatabaseManager, get_db_manager
+
+def _timed_process(process):
+    @functools.wraps(process)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return process(self, *args, **kwargs)
+        finally:
+            metrics.observe("agent", self.name, time.perf_counter() - started)
+    return wrapper
 
 class BaseAgent(ABC):
+    def __init_subclass__(cls, **kwargs):
+        # Every concrete agent's process() is timed into the "agent" histograms.
+        super().__init_subclass__(**kwargs)
+        if "process" in cls.__dict__:
+            cls.process = _timed_process(cls.__dict__["process"])
+
     def __init__(self, name: str):
         self.name = name
         self.logger = agent_logger
-        self.db_manager = db_manager
+        self._db_manager: Optional[DatabaseManager] = None
+
+    @property
+    def db_manager(self) -> DatabaseManager:
+        # Resolved on first use, so an agent pointed at another database (by
+        # assigning db_manager) never opens the default tasks.db.
+        if self._db_manager is None:
+            self._db_manager = get_db_manager()
+        return self._db_manager
+
+    @db_manager.setter
+    def db_manager(self, manager: DatabaseManager):
+        self._db_manager = manager
+
+    def for_user(self, user_id: Optional[str]) -> "BaseAgent":
+        # A copy of this agent that reads and writes only `user_id`'s tasks.
+        agent = copy.copy(self)
+        agent.db_manager = self.db_manager.for_user(user_id)
+        return agent
 
     @abstractmethod
     def process(self, data: Any, **kwargs) -> Any: # Now 'Any' is defined
         pass
 
-    def log(self, message: str):
-        self.logger.log(self.name, message)
\ No newline at end of file
+    def log(self, message: str, level: str = "INFO", task_id: Optional[int] = None):
+        # Non-blocking: the record goes to an in-memory ring buffer and a background writer
+        self.logger.log(self.name, message, level=level, task_id=task_id)
\ No newline at end of file
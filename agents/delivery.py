@@ -0,0 +1,358 @@
+# agents/delivery.py
+# Reminder delivery. ReminderAgent words a reminder; ReminderService queues it
+# in the reminder_outbox table, one row per sink (see
+# DatabaseManager.queue_reminders), and a ReminderDispatcher delivers the rows
+# in the background:
+#   - per sink, due rows are claimed in batches of `batch_size`, and at most
+#     `concurrency` batches are in flight at once (a thread pool per sink);
+#   - a failed batch is retried with exponential backoff (with jitter) up to
+#     `max_attempts` times, then marked failed;
+#   - a task's reminder_sent_at is set only once a sink has acknowledged its
+#     reminder; if every sink gave up, the task is rescheduled and reminded again.
+# The outbox is durable, so reminders queued before a restart are delivered
+# after it. Delivery is at least once: a batch that fails part way is sent
+# again in full (unless the sink reports which reminders got through, as
+# SmtpSink does), and each reminder carries its outbox id so receivers can
+# drop duplicates.
+#
+# Sinks besides the in-app one (the UI's and API's reminder feed) come from
+# REMINDER_SINKS, a JSON list such as
+#   [{"type": "webhook", "url": "https://example.com/hook"},
+#    {"type": "smtp", "host": "localhost", "to": "{user_id}@example.com"},
+#    {"type": "file", "path": "reminders.jsonl"}, {"type": "desktop"}]
+# where every other key is a constructor argument (name, batch_size,
+# concurrency and lease included). The SMTP and HTTP clients are imported by
+# the sinks that use them, keeping them off the app's start-up path.
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from database.db_manager import DatabaseManager
+from utils import timeutil
+from utils.logger import agent_logger
+
+SINKS_ENV = "REMINDER_SINKS"
+MAX_SLEEP_SECONDS = 60  # look at the outbox at least this often (rows queued by other processes)
+
+@dataclass
+class Delivery:
+    id: int  # reminder_outbox row; the same on every retry
+    task_id: int
+    user_id: str
+    message: str
+    queued_at: int  # epoch seconds
+    attempts: int = 0  # failed attempts so far
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "task_id": self.task_id, "user_id": self.user_id, "message": self.message,
+                "queued_at": timeutil.to_text(self.queued_at)}
+
+class PartialDelivery(Exception):
+    # Raised by send() when only some of a batch got through: `delivered` are
+    # the outbox ids acknowledged; the rest are retried.
+    def __init__(self, delivered: Sequence[int], error: BaseException):
+        super().__init__(str(error))
+        self.delivered = list(delivered)
+        self.error = error
+
+class DeliverySink(ABC):
+    # send() delivers a batch or raises (PartialDelivery if some of it was
+    # delivered); returning means every reminder in it was acknowledged.
+    # `name` is what outbox rows refer to, so it has to stay the same across
+    # restarts. lease: seconds a claimed batch may take before another
+    # dispatcher may try it (keep it above the worst-case send time).
+    kind = "sink"
+    batch_size = 50
+    concurrency = 1
+
+    def __init__(self, name: Optional[str] = None, batch_size: Optional[int] = None,
+                 concurrency: Optional[int] = None, lease: float = 60.0):
+        self.name = name or self.kind
+        self.batch_size = batch_size or self.batch_size
+        self.concurrency = concurrency or self.concurrency
+        self.lease = lease
+
+    @abstractmethod
+    def send(self, reminders: List[Delivery]):
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+class InAppSink(DeliverySink):
+    # The reminder feed shown by the UI and GET /reminders. It is kept in the
+    # database (reminder_feed), not in this process's memory, so a reminder
+    # delivered by another process on the same database (`main.py reminders`
+    # or `serve` next to the UI) still reaches the user's UI. Each user keeps
+    # their `max_fired` newest reminders.
+    kind = "app"
+    batch_size = 200
+
+    def __init__(self, db_manager: DatabaseManager, max_fired: int = 500, **options):
+        super().__init__(**options)
+        self.db_manager = db_manager
+        self.max_fired = max_fired
+
+    def send(self, reminders: List[Delivery]):
+        self.db_manager.add_to_feed([(reminder.id, reminder.task_id, reminder.user_id, reminder.message)
+                                     for reminder in reminders], timeutil.now(), keep=self.max_fired)
+
+class FileSink(DeliverySink):
+    # Appends one JSON object per reminder to a file (JSON Lines).
+    kind = "file"
+    batch_size = 500
+
+    def __init__(self, path: str, **options):
+        super().__init__(**options)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, reminders: List[Delivery]):
+        lines = "".join(json.dumps(reminder.to_dict()) + "\n" for reminder in reminders)
+        with self._lock, open(self.path, "a", encoding="utf-8") as stream:
+            stream.write(lines)
+            stream.flush()
+            os.fsync(stream.fileno())
+
+class WebhookSink(DeliverySink):
+    # POSTs {"reminders": [...]} per batch; any 2xx response acknowledges it.
+    kind = "webhook"
+    batch_size = 50
+    concurrency = 4
+
+    def __init__(self, url: str, headers: Optional[Mapping[str, str]] = None, timeout: float = 10.0, **options):
+        super().__init__(**options)
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    def send(self, reminders: List[Delivery]):
+        import urllib.request
+        body = json.dumps({"reminders": [reminder.to_dict() for reminder in reminders]}).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:  # raises HTTPError on 4xx/5xx
+            response.read()
+
+class SmtpSink(DeliverySink):
+    # One SMTP session per batch, one email per reminder. `to` is formatted
+    # with the task owner, e.g. "{user_id}@example.com". A message the server
+    # refuses is retried on its own; the session carries on with the rest.
+    kind = "smtp"
+    batch_size = 20
+    concurrency = 2
+
+    def __init__(self, host: str = "localhost", port: int = 25, sender: str = "reminders@localhost",
+                 to: str = "{user_id}@localhost", starttls: bool = False, username: Optional[str] = None,
+                 password: Optional[str] = None, timeout: float = 10.0, **options):
+        super().__init__(**options)
+        self.host, self.port, self.sender, self.to = host, port, sender, to
+        self.starttls, self.username, self.password = starttls, username, password
+        self.timeout = timeout
+
+    def send(self, reminders: List[Delivery]):
+        import smtplib
+        from email.message import EmailMessage
+        delivered, error = [], None
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            for reminder in reminders:
+                email = EmailMessage()
+                email["From"] = self.sender
+                email["To"] = self.to.format(user_id=reminder.user_id)
+                email["Subject"] = f"Reminder: task #{reminder.task_id}"
+                email["Message-ID"] = f"<reminder-{reminder.id}@todo-agents>"
+                email.set_content(reminder.message)
+                try:
+                    smtp.send_message(email)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    error = e
+                    continue
+                except Exception as e:  # the session is gone; retry whatever is left
+                    raise PartialDelivery(delivered, e) from e
+                delivered.append(reminder.id)
+        if error is not None:
+            raise PartialDelivery(delivered, error)
+
+class DesktopSink(DeliverySink):
+    # Desktop notifications through notify-send (Linux) or osascript (macOS).
+    kind = "desktop"
+    batch_size = 10
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.command = shutil.which("notify-send") or (shutil.which("osascript") if sys.platform == "darwin" else None)
+        if self.command is None:
+            raise RuntimeError("Desktop notifications need notify-send (Linux) or osascript (macOS)")
+
+    def send(self, reminders: List[Delivery]):
+        for reminder in reminders:
+            if os.path.basename(self.command) == "osascript":
+                args = [self.command, "-e", f"display notification {json.dumps(reminder.message)} with title \"Reminder\""]
+            else:
+                args = [self.command, "Reminder", reminder.message]
+            subprocess.run(args, check=True, timeout=10, capture_output=True)
+
+SINK_TYPES = {sink.kind: sink for sink in (FileSink, WebhookSink, SmtpSink, DesktopSink)}
+
+def make_sink(config: Mapping[str, Any]) -> DeliverySink:
+    options = dict(config)
+    kind = options.pop("type", None)
+    if kind not in SINK_TYPES:
+        raise ValueError(f"Unknown reminder sink type {kind!r}; expected one of {', '.join(SINK_TYPES)}")
+    return SINK_TYPES[kind](**options)
+
+def sinks_from_env() -> List[DeliverySink]:
+    config = os.environ.get(SINKS_ENV)
+    return [make_sink(entry) for entry in json.loads(config)] if config else []
+
+class ReminderDispatcher:
+    # Background delivery of reminder_outbox rows to `sinks` (see the top of
+    # this file). Retry n (n = 1, 2, ...) waits base_delay * 2 ** (n - 1)
+    # seconds, capped at max_delay, less up to half of it as jitter.
+    def __init__(self, db_manager: DatabaseManager, sinks: Sequence[DeliverySink], max_attempts: int = 8,
+                 base_delay: float = 1.0, max_delay: float = 300.0):
+        names = [sink.name for sink in sinks]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Reminder sink names must be unique: {names}")
+        self.db_manager = db_manager
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {name: {"delivered": 0, "batches": 0, "retries": 0, "failed": 0} for name in self.sinks}
+        self._busy = {name: 0 for name in self.sinks}  # batches in flight
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._cond = threading.Condition()
+        self._woken = False
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def sink_names(self) -> List[str]:
+        return list(self.sinks)
+
+    # --- lifecycle ---
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self._pools = {name: ThreadPoolExecutor(sink.concurrency, thread_name_prefix=f"Delivery-{name}")
+                       for name, sink in self.sinks.items()}
+        self._thread = threading.Thread(target=self._run, name="ReminderDispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        # Batches already being sent finish (and are acknowledged) first.
+        self._stopped.set()
+        self.wake()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self):
+        # New rows were queued (or a batch finished): look at the outbox now.
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+
+    # --- delivery ---
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _deliver(self, sink: DeliverySink, reminders: List[Delivery]):
+        try:
+            sink.send(reminders)
+        except Exception as e:
+            delivered = set(e.delivered) if isinstance(e, PartialDelivery) else set()
+            error = e.error if isinstance(e, PartialDelivery) else e
+            if delivered:
+                self.db_manager.ack_deliveries(sorted(delivered), time.time())
+            now = time.time()
+            retries = [(reminder.id, None if reminder.attempts + 1 >= self.max_attempts
+                        else now + self._backoff(reminder.attempts + 1))
+                       for reminder in reminders if reminder.id not in delivered]
+            given_up = sum(retry_at is None for _, retry_at in retries)
+            self.db_manager.fail_deliveries(retries, f"{type(error).__name__}: {error}")
+            self._count(sink.name, delivered=len(delivered), batches=1, retries=len(retries) - given_up,
+                        failed=given_up)
+            agent_logger.log("ReminderDispatcher",
+                             f"Delivery of {len(retries)} of {len(reminders)} reminder(s) to {sink.name} failed: "
+                             f"{error}" + (f"; gave up on {given_up}" if given_up else "; will retry"),
+                             level="WARNING")
+        else:
+            self.db_manager.ack_deliveries([reminder.id for reminder in reminders], time.time())
+            self._count(sink.name, delivered=len(reminders), batches=1)
+
+    def _count(self, sink_name: str, **counts: int):
+        with self._cond:
+            for key, value in counts.items():
+                self.stats[sink_name][key] += value
+
+    def _run_batch(self, sink: DeliverySink, reminders: List[Delivery]):
+        try:
+            self._deliver(sink, reminders)
+        except Exception as e:  # e.g. the database went away; the claim lapses and the rows come back
+            agent_logger.log("ReminderDispatcher", f"Reminder delivery error: {e}", level="ERROR")
+        finally:
+            with self._cond:
+                self._busy[sink.name] -= 1
+                self._woken = True
+                self._cond.notify_all()
+
+    def _dispatch(self):
+        # Claims due rows for every sink with free capacity and starts their batches.
+        for name, sink in self.sinks.items():
+            with self._cond:
+                free = sink.concurrency - self._busy[name]
+            if free <= 0:
+                continue
+            rows = self.db_manager.claim_deliveries(name, time.time(), free * sink.batch_size, sink.lease)
+            for start in range(0, len(rows), sink.batch_size):
+                batch = [Delivery(**{key: row[key] for key in ("id", "task_id", "user_id", "message", "queued_at",
+                                                               "attempts")})
+                         for row in rows[start:start + sink.batch_size]]
+                with self._cond:
+                    self._busy[name] += 1
+                self._pools[name].submit(self._run_batch, sink, batch)
+
+    def _seconds_until_next(self) -> float:
+        with self._cond:
+            free = [name for name, sink in self.sinks.items() if self._busy[name] < sink.concurrency]
+        when = self.db_manager.next_delivery_at(free)
+        if when is None:
+            return MAX_SLEEP_SECONDS
+        return min(MAX_SLEEP_SECONDS, max(0.0, when - time.time()))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with self._cond:
+                    self._woken = False
+                self._dispatch()
+                timeout = self._seconds_until_next()
+                with self._cond:
+                    if not self._woken and not self._stopped.is_set() and timeout > 0:
+                        self._cond.wait(timeout)
+            except Exception as e:  # keep delivering; the next pass retries
+                agent_logger.log("ReminderDispatcher", f"Reminder dispatcher error: {e}", level="ERROR")
+                self._stopped.wait(5)
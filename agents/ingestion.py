@@ -0,0 +1,163 @@
+# agents/ingestion.py
+# Streaming bulk import: records are read lazily from a text, CSV or JSONL
+# source, planned in chunks across a process pool, and scheduled with one
+# multi-row insert per chunk. Memory use is bounded by
+# chunk_size * (in-flight chunks), not by the size of the file.
+import csv
+import io
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from utils import date_expressions, timeutil
+from .planner_agent import plan_task
+from .scheduler_agent import SchedulerAgent
+
+FORMATS = ("txt", "csv", "jsonl")
+DESCRIPTION_FIELDS = ("description", "task", "title", "name", "text")
+PRIORITY_NAMES = {"high": 1, "medium": 2, "low": 3, "1": 1, "2": 2, "3": 3}
+
+class IngestionStats:
+    __slots__ = ("read", "scheduled", "skipped", "started")
+
+    def __init__(self):
+        self.read = 0
+        self.scheduled = 0
+        self.skipped = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.scheduled / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.read} read, {self.scheduled} scheduled, {self.skipped} skipped "
+                f"in {self.elapsed:.1f}s ({self.rate:,.0f} tasks/s)")
+
+def detect_format(name: str) -> str:
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    if extension in ("json", "ndjson"):
+        return "jsonl"
+    return extension if extension in FORMATS else "txt"
+
+def _normalise(record: Union[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if isinstance(record, str):
+        return {"text": record.strip()} if record.strip() else None
+    lowered = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    text = next((lowered[field] for field in DESCRIPTION_FIELDS if lowered.get(field)), None)
+    if text is None and record:
+        text = next(iter(record.values()))  # fall back to the first column
+    if not text or not str(text).strip():
+        return None
+    normalised = {"text": str(text).strip()}
+    if lowered.get("due_date"):
+        normalised["due_date"] = str(lowered["due_date"]).strip()
+    if lowered.get("priority") is not None:
+        normalised["priority"] = PRIORITY_NAMES.get(str(lowered["priority"]).strip().lower())
+    return normalised
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    # Lazily yields {"text", ["due_date"], ["priority"]} dicts from an open text stream.
+    if fmt == "csv":
+        rows = csv.DictReader(stream)
+    elif fmt == "jsonl":
+        rows = (json.loads(line) for line in stream if line.strip())
+    else:
+        rows = stream
+    for row in rows:
+        record = _normalise(row)
+        if record is not None:
+            yield record
+
+def _explicit_due_date(value: str, now: datetime) -> Union[int, str]:
+    # A due_date column may hold a full timestamp or any expression the planner
+    # understands; anything else is passed on for the scheduler to reject.
+    try:
+        return timeutil.parse(value)
+    except ValueError:
+        return timeutil.to_epoch(date_expressions.parse(value, now=now).due_date) or value
+
+def plan_chunk(records: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+    # Runs in worker processes: pure planning, explicit columns win over inference.
+    planned = []
+    for record in records:
+        task = plan_task(record["text"], now=now)
+        if record.get("due_date"):
+            task["due_date"] = _explicit_due_date(record["due_date"], now)
+        if record.get("priority"):
+            task["priority"] = record["priority"]
+        planned.append(task)
+    return planned
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _planned_chunks(chunks: Iterator[List[Dict[str, Any]]], now: datetime, workers: int) -> Iterator[List[Dict[str, Any]]]:
+    if workers <= 0:
+        for chunk in chunks:
+            yield plan_chunk(chunk, now)
+        return
+    # Keep only a small window of chunks in flight (Executor.map would read the
+    # whole input up front) and yield results in input order.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(plan_chunk, chunk, now))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def ingest(source: Union[str, TextIO], fmt: Optional[str] = None, workers: Optional[int] = None,
+           chunk_size: int = 1000, scheduler: Optional[SchedulerAgent] = None,
+           progress: Optional[Callable[[IngestionStats], None]] = None) -> IngestionStats:
+    # source: a file path or an open text stream. workers=0 plans in-process.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    scheduler = scheduler or SchedulerAgent()
+    stats = IngestionStats()
+    now = datetime.now()
+
+    stream = open(source, encoding="utf-8-sig", newline="") if isinstance(source, str) else source
+    if fmt is None:
+        fmt = detect_format(source if isinstance(source, str) else getattr(source, "name", ""))
+    try:
+        def counted(records):
+            for record in records:
+                stats.read += 1
+                yield record
+
+        chunks = _chunks(counted(read_records(stream, fmt)), chunk_size)
+        for planned in _planned_chunks(chunks, now, workers):
+            task_ids = scheduler.schedule_many(planned, now=now)
+            stats.scheduled += len(task_ids)
+            stats.skipped += len(planned) - len(task_ids)
+            if progress:
+                progress(stats)
+    finally:
+        if isinstance(source, str):
+            stream.close()
+    scheduler.log(f"Ingestion finished: {stats}")
+    return stats
+
+def ingest_binary(stream: BinaryIO, name: str, **kwargs) -> IngestionStats:
+    # For uploads (e.g. Streamlit's UploadedFile): decode lazily, format from the file name.
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        return ingest(text_stream, fmt=detect_format(name), **kwargs)
+    finally:
+        text_stream.detach()  # leave the caller's stream open
@@ -1,49 +1,62 @@
 # agents/reminder_agent.py
 from .base_agent import BaseAgent
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Optional
+from utils import timeutil
 
 class ReminderAgent(BaseAgent):
     def __init__(self):
         super().__init__("ReminderAgent")
         self.reminders_sent_this_session = [] # Simple way to show reminders in UI
+        self.last_messages: Dict[int, str] = {} # task id -> message, from the last run
 
-    def process(self, **kwargs) -> List[str]:
+    def process(self, tasks: Optional[List[Dict[str, Any]]] = None, **kwargs) -> List[str]:
+        # `tasks` lets the ReminderService hand over tasks it already knows are due;
+        # without it the agent scans the database itself.
         self.log("Checking for tasks needing reminders...")
         self.reminders_sent_this_session.clear() # Clear for this run
+        self.last_messages = {}
 
-        tasks_to_remind = self.db_manager.get_tasks_for_reminder()
+        # Which tasks are due a reminder is decided by the database's ReminderPolicy
+        # (tasks.next_reminder_at); this agent only words and records them.
+        now = timeutil.now() if kwargs.get("now") is None else timeutil.to_epoch(kwargs["now"]) # epoch seconds, like the due dates
+        tasks_to_remind = tasks if tasks is not None else self.db_manager.get_tasks_for_reminder(now)
         
         if not tasks_to_remind:
             self.log("No tasks currently need reminders.")
             return []
 
-        now = datetime.now()
+        reminded_ids = []
+        messages = {}
         for task in tasks_to_remind:
             task_id = task['id']
             description = task['description']
-            due_date_str = task['due_date']
-            
-            due_date = datetime.strptime(due_date_str, '%Y-%m-%d %H:%M:%S') if due_date_str else None
+            due_date = task['due_date'] if isinstance(task['due_date'], int) else None
 
             reminder_message = ""
             if due_date:
                 if due_date < now:
-                    time_diff = now - due_date
-                    reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is OVERDUE by {time_diff.days} days, {time_diff.seconds//3600} hours."
+                    days, seconds = divmod(now - due_date, 86400)
+                    reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is OVERDUE by {days} days, {seconds//3600} hours."
                 else:
-                    time_diff = due_date - now
-                    if time_diff.days < 1 and time_diff.seconds//3600 < 24: # Due within 24 hours
-                         reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is due in {time_diff.seconds//3600} hours, {(time_diff.seconds//60)%60} minutes (at {due_date.strftime('%H:%M')})."
+                    seconds = due_date - now
+                    if seconds < 86400: # Due within 24 hours
+                         reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is due in {seconds//3600} hours, {(seconds//60)%60} minutes (at {timeutil.format_time(due_date, '%H:%M')})."
                     else: # Due further out but within reminder window (e.g. next day)
-                         reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is due on {due_date.strftime('%Y-%m-%d at %H:%M')}."
+                         reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is due on {timeutil.format_time(due_date, '%Y-%m-%d at %H:%M')}."
             else: # Should not happen with current DB query but as a fallback
                 reminder_message = f"REMINDER: Task '{description}' (ID: {task_id}) is pending and has no due date."
 
             if reminder_message:
-                self.log(reminder_message)
+                self.log(reminder_message, level="WARNING" if due_date and due_date < now else "INFO", task_id=task_id)
                 self.reminders_sent_this_session.append(reminder_message)
-                # Update task to mark reminder as sent
-                self.db_manager.update_task(task_id, {"reminder_sent_at": now.strftime('%Y-%m-%d %H:%M:%S')})
-        
-        return self.reminders_sent_this_session
\ No newline at end of file
+                reminded_ids.append(task_id)
+                messages[task_id] = reminder_message
+
+        deliver_to = kwargs.get("deliver_to")
+        if deliver_to:  # queue for delivery; reminder_sent_at is set once a sink acknowledges (agents/delivery.py)
+            self.db_manager.queue_reminders(reminded_ids, now, messages, deliver_to)
+        else:
+            # Mark all reminded tasks (and record the reminders in their history) in a single transaction
+            self.db_manager.mark_reminded(reminded_ids, now, messages)
+        self.last_messages = messages
+        return list(self.reminders_sent_this_session)
\ No newline at end of file
@@ -0,0 +1,178 @@
+# agents/reminder_service.py
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .delivery import DeliverySink, InAppSink, ReminderDispatcher, sinks_from_env
+from .reminder_agent import ReminderAgent
+from database.db_manager import ALL_USERS
+
+MAX_SLEEP_SECONDS = 300  # re-check the clock at least this often (suspend, clock changes)
+
+def next_reminder_time(task: Dict[str, Any]) -> Optional[int]:
+    # Epoch seconds; DatabaseManager keeps next_reminder_at current under its ReminderPolicy.
+    when = task.get('next_reminder_at')
+    return when if isinstance(when, int) else None
+
+class ReminderService:
+    # Fires reminders in the background. Open tasks sit in a min-heap keyed by
+    # their next reminder time and the worker sleeps until the earliest one is
+    # due. DatabaseManager write notifications mark tasks dirty so only those
+    # rows are re-read; the table is scanned once at start-up (and on check_now).
+    # One service covers every user's tasks; get_fired() filters by owner.
+    # Fired reminders are queued for delivery to the in-app feed (the
+    # reminder_feed table) and `sinks` (default: REMINDER_SINKS) and sent by
+    # a ReminderDispatcher.
+    def __init__(self, reminder_agent: Optional[ReminderAgent] = None, max_fired: int = 500,
+                 sinks: Optional[Sequence[DeliverySink]] = None):
+        self.agent = reminder_agent or ReminderAgent()
+        self.db_manager = self.agent.db_manager = self.agent.db_manager.for_user(ALL_USERS)
+        self._heap: List[Tuple[int, int]] = []  # (next reminder, task id)
+        self._scheduled: Dict[int, int] = {}  # task id -> live heap entry; others are stale
+        self._dirty = set()
+        self._full_rescan = True
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.app_sink = InAppSink(self.db_manager, max_fired)
+        self.dispatcher = ReminderDispatcher(self.db_manager,
+                                             [self.app_sink] + list(sinks if sinks is not None else sinks_from_env()))
+
+    # --- lifecycle ---
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self.db_manager.add_listener(self._on_tasks_changed)
+        self.dispatcher.start()
+        self._thread = threading.Thread(target=self._run, name="ReminderService", daemon=True)
+        self._thread.start()
+        self.agent.log("Reminder service started.")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self.db_manager.remove_listener(self._on_tasks_changed)
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.dispatcher.stop(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # --- inputs ---
+    def _on_tasks_changed(self, task_ids: List[int]):
+        with self._cond:
+            self._dirty.update(task_ids)
+            self._cond.notify_all()
+
+    def check_now(self):
+        # Forces a full rescan, e.g. from the UI's manual "check" button.
+        with self._cond:
+            self._full_rescan = True
+            self._cond.notify_all()
+
+    # --- outputs ---
+    def get_fired(self, after: int = 0, user_id: Optional[str] = ALL_USERS,
+                  unseen_only: bool = False) -> List[Tuple[int, str]]:
+        # (sequence number, message) of the reminders fired after sequence
+        # number `after` for `user_id`'s tasks (ALL_USERS: everyone's), oldest
+        # first, by any process on the database; unseen_only skips dismissed ones.
+        return self.db_manager.for_user(user_id).get_reminder_feed(after, unseen_only=unseen_only)
+
+    def dismiss(self, up_to: int, user_id: Optional[str] = ALL_USERS) -> int:
+        # Marks `user_id`'s reminders up to sequence number `up_to` as seen.
+        return self.db_manager.for_user(user_id).dismiss_reminders(up_to)
+
+    # --- scheduling ---
+    def _schedule(self, task: Dict[str, Any]):
+        when = next_reminder_time(task)
+        if when is None:
+            self._scheduled.pop(task['id'], None)
+            return
+        if self._scheduled.get(task['id']) != when:
+            self._scheduled[task['id']] = when
+            heapq.heappush(self._heap, (when, task['id']))
+
+    def _refresh(self):
+        with self._cond:
+            full_rescan, self._full_rescan = self._full_rescan, False
+            dirty, self._dirty = self._dirty, set()
+        if full_rescan:
+            self._heap.clear()
+            self._scheduled.clear()
+            for task in self.db_manager.get_reminder_schedule():
+                self._schedule(task)
+            return
+        if dirty:
+            found = self.db_manager.get_tasks_by_ids(list(dirty))
+            for task in found:
+                self._schedule(task)
+            for task_id in dirty - {task['id'] for task in found}:  # deleted
+                self._scheduled.pop(task_id, None)
+        if len(self._heap) > 2 * len(self._scheduled) + 64:  # drop accumulated stale entries
+            self._heap = [(when, task_id) for task_id, when in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[int]:
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            when, task_id = heapq.heappop(self._heap)
+            if self._scheduled.get(task_id) == when:
+                del self._scheduled[task_id]
+                due_ids.append(task_id)
+        return due_ids
+
+    def _fire(self, due_ids: List[int], now: float):
+        # Re-read the rows so edits that raced with the heap are respected.
+        ready = []
+        for task in self.db_manager.get_tasks_by_ids(due_ids):
+            when = next_reminder_time(task)
+            if when is not None and when <= now:
+                ready.append(task)
+            else:
+                self._schedule(task)
+        if not ready:
+            return
+        self.agent.process(tasks=ready, now=now, deliver_to=self.dispatcher.sink_names)
+        self.dispatcher.wake()
+        # Delivery acknowledgements reschedule the tasks and notify us, so they
+        # come back through _refresh with their cooldown applied.
+
+    def _seconds_until_next(self, now: float) -> float:
+        if not self._heap:
+            return MAX_SLEEP_SECONDS
+        return min(MAX_SLEEP_SECONDS, max(0.0, self._heap[0][0] - now))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._refresh()
+                now = time.time()
+                due_ids = self._pop_due(now)
+                if due_ids:
+                    self._fire(due_ids, now)
+                    continue
+                with self._cond:
+                    if not self._dirty and not self._full_rescan and not self._stopped.is_set():
+                        self._cond.wait(self._seconds_until_next(time.time()))
+            except Exception as e:  # keep the service alive; the next pass retries
+                self.agent.log(f"Reminder service error: {e}", level="ERROR")
+                self._stopped.wait(5)
+
+_service: Optional[ReminderService] = None
+_service_lock = threading.Lock()
+
+def get_reminder_service(start: bool = True) -> ReminderService:
+    # One service per process, shared by every Streamlit session.
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ReminderService()
+        if start and not _service.running:
+            _service.start()
+        return _service
@@ -1,55 +1,85 @@
 # agents/scheduler_agent.py
 from .base_agent import BaseAgent
-from typing import Dict, Any, Optional
-from datetime import datetime
+from database.models import TaskEvent
+from typing import Dict, Any, List, Optional
+from utils import timeutil
 
 class SchedulerAgent(BaseAgent):
     def __init__(self):
         super().__init__("SchedulerAgent")
 
     def process(self, planned_task: Dict[str, Any], **kwargs) -> Optional[int]:
+        if not planned_task:
+            self.log("No planned task received. Cannot schedule.", level="WARNING")
+            return None
+
         self.log(f"Received planned task: {planned_task['description']}")
+        task_to_schedule = self._prepare(planned_task, self._now(kwargs.get("now")))
 
-        if not planned_task:
-            self.log("No planned task received. Cannot schedule.")
+        try:
+            task_id = self.db_manager.add_task(task_to_schedule, events=task_to_schedule["events"])
+            self.log(f"Task '{task_to_schedule['description']}' (ID: {task_id}) successfully scheduled and stored.", task_id=task_id)
+            return task_id
+        except Exception as e:
+            self.log(f"Error scheduling task: {e}", level="ERROR")
             return None
 
+    def schedule_many(self, planned_tasks: List[Dict[str, Any]], **kwargs) -> List[int]:
+        # Bulk path used by ingestion: same validation as process(), one
+        # multi-row insert, and a single summary log line instead of one per task.
+        if not planned_tasks:
+            return []
+        now = self._now(kwargs.get("now"))
+        tasks_to_schedule = [self._prepare(planned_task, now, quiet=True) for planned_task in planned_tasks]
+        try:
+            task_ids = self.db_manager.add_tasks(tasks_to_schedule, events=[task["events"] for task in tasks_to_schedule])
+        except Exception as e:
+            self.log(f"Error scheduling {len(tasks_to_schedule)} tasks: {e}", level="ERROR")
+            return []
+        dropped = sum(1 for planned, task in zip(planned_tasks, tasks_to_schedule)
+                      if planned.get("due_date") and not task["due_date"])
+        self.log(f"Scheduled {len(task_ids)} tasks (IDs {task_ids[0]}-{task_ids[-1]})"
+                 + (f"; {dropped} past or invalid due dates cleared." if dropped else "."))
+        return task_ids
+
+    @staticmethod
+    def _now(now) -> int:
+        # The caller's clock (any timeutil.to_epoch value, 0 included), else the current time.
+        return timeutil.now() if now is None else timeutil.to_epoch(now)
+
+    def _prepare(self, planned_task: Dict[str, Any], now: int, quiet: bool = False) -> Dict[str, Any]:
         # Reasoning: Validate or set due_date
-        due_date_str = planned_task.get("due_date")
-        final_due_date = None
-        if due_date_str:
+        suggested_due_date = planned_task.get("due_date")
+        due_date = None
+        if suggested_due_date:
             try:
-                # Ensure it's a valid datetime object if passed as string
-                if isinstance(due_date_str, str):
-                    final_due_date = datetime.strptime(due_date_str, '%Y-%m-%d %H:%M:%S')
-                elif isinstance(due_date_str, datetime): # Should not happen from Planner currently
-                    final_due_date = due_date_str
-                
+                # Epoch seconds from the Planner; text or a datetime from other callers
+                due_date = timeutil.to_epoch(suggested_due_date)
+
                 # Basic reasoning: if due_date is in the past for a new task, flag it or adjust
-                if final_due_date and final_due_date < datetime.now():
-                    self.log(f"Warning: Suggested due date '{final_due_date.strftime('%Y-%m-%d %H:%M:%S')}' is in the past. Setting to None for now.")
+                if due_date < now:
+                    if not quiet:
+                        self.log(f"Warning: Suggested due date '{timeutil.to_text(due_date)}' is in the past. Setting to None for now.", level="WARNING")
                     # In a real app, might ask user or set to today + 1 day
-                    final_due_date = None 
-            except ValueError:
-                self.log(f"Invalid due date format: {due_date_str}. Scheduling without a due date.")
-                final_due_date = None
+                    due_date = None
+            except (TypeError, ValueError):
+                if not quiet:
+                    self.log(f"Invalid due date format: {suggested_due_date}. Scheduling without a due date.", level="WARNING")
+                due_date = None
         
         # If no due_date, UI will prompt or it remains None.
         # For this agent, we'll proceed if user provides it via UI later or explicitly wants no due date.
 
-        task_to_schedule = {
+        scheduled_payload = {"due_date": timeutil.to_text(due_date), "priority": planned_task.get("priority", 2)}
+        if suggested_due_date and not due_date:
+            scheduled_payload["cleared_due_date"] = str(timeutil.to_text(suggested_due_date))
+        return {
             "description": planned_task["description"],
             "status": "pending", # Official status for new tasks
-            "due_date": final_due_date.strftime('%Y-%m-%d %H:%M:%S') if final_due_date else None,
+            "due_date": due_date,
             "priority": planned_task.get("priority", 2),
             "assigned_agent": self.name,
-            "agent_notes": planned_task.get("agent_notes", "") + f"\nScheduled by SchedulerAgent at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}."
+            # History goes to task_events rather than the row itself
+            "events": list(planned_task.get("events", [])) + [
+                TaskEvent(self.name, "scheduled", scheduled_payload, now)],
         }
-
-        try:
-            task_id = self.db_manager.add_task(task_to_schedule)
-            self.log(f"Task '{task_to_schedule['description']}' (ID: {task_id}) successfully scheduled and stored.")
-            return task_id
-        except Exception as e:
-            self.log(f"Error scheduling task: {e}")
-            return None
\ No newline at end of file
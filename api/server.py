@@ -0,0 +1,363 @@
+# api/server.py
+# Headless JSON API over the same agents and DatabaseManager the Streamlit UI
+# uses. Standard library only: a ThreadingHTTPServer with HTTP/1.1 keep-alive,
+# one handler thread per client connection, each on its own pooled SQLite
+# connection.
+#
+#   GET    /health
+#   GET    /tasks?status=&q=&limit=&cursor=&fields=&archive=   list (keyset pages) or search
+#   POST   /tasks            {"text": "..."}  Planner -> Scheduler
+#   GET    /tasks/<id>
+#   PATCH  /tasks/<id>       {"status": ..., "priority": ..., ...}
+#   DELETE /tasks/<id>
+#   GET    /tasks/<id>/events?limit=   history, newest first
+#   POST   /tasks/bulk       {"items": ["...", ...]}
+#   POST   /tasks/bulk/update {"ids": [...], "updates": {...}}
+#   POST   /tasks/bulk/delete {"ids": [...]}
+#   GET    /reminders?after=<seq>
+#   POST   /reminders/check
+#   GET    /stats
+#   GET    /metrics          Prometheus text format
+#
+# Timestamps are 'YYYY-MM-DD HH:MM:SS' strings in the server's local time; a
+# due_date may also be sent as ISO 8601 with a UTC offset, or epoch seconds.
+# Requests act on the tasks of the user named in the X-User header (the
+# default user when absent); other users' tasks answer 404. The header is
+# not authenticated: any client can send any user name, so users are kept
+# apart for convenience, not security. Don't expose the server beyond
+# clients trusted with every user's tasks.
+# Completed tasks are archived after a while (database/archive.py): listings
+# include them with archive=1, and updating one restores it.
+import base64
+import copy
+import json
+import re
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from agents.planner_agent import PlannerAgent, plan_task
+from agents.reminder_agent import ReminderAgent
+from agents.reminder_service import ReminderService, get_reminder_service
+from agents.scheduler_agent import SchedulerAgent
+from database.archive import TaskArchiver, get_task_archiver
+from database.db_manager import DEFAULT_USER, TIMESTAMP_FIELDS, DatabaseManager
+from database.models import TASK_COLUMNS, TaskEvent, json_default
+from utils import timeutil
+from utils.metrics import metrics
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BULK_ITEMS = 10000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+EDITABLE_FIELDS = ("description", "status", "due_date", "priority")
+STATUSES = ("pending", "in progress", "completed")
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_.@-]{1,64}")
+
+class APIError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+def encode_cursor(task: Dict[str, Any]) -> str:
+    raw = json.dumps(DatabaseManager.page_cursor(task), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    if (not isinstance(values, list) or len(values) != 4
+            or not all(value is None or isinstance(value, (int, str)) for value in values)):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return tuple(values)
+
+def task_json(task) -> Dict[str, Any]:
+    # A task row (dict or TaskRecord) with its epoch-second timestamps as text.
+    body = dict(task)
+    for field in TIMESTAMP_FIELDS:
+        if field in body:
+            body[field] = timeutil.to_text(body[field])
+    return body
+
+def _validate_updates(updates: Any) -> Dict[str, Any]:
+    if not isinstance(updates, dict) or not updates:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Expected a non-empty object of updates")
+    unknown = set(updates) - set(EDITABLE_FIELDS)
+    if unknown:
+        raise APIError(HTTPStatus.BAD_REQUEST, f"Fields not editable: {', '.join(sorted(unknown))}")
+    if "description" in updates and not (isinstance(updates["description"], str) and updates["description"].strip()):
+        raise APIError(HTTPStatus.BAD_REQUEST, "description must be a non-empty string")
+    if "status" in updates and not (isinstance(updates["status"], str) and updates["status"] in STATUSES):
+        raise APIError(HTTPStatus.BAD_REQUEST, f"status must be one of {', '.join(STATUSES)}")
+    priority = updates.get("priority")
+    if "priority" in updates and not (type(priority) is int and priority in (1, 2, 3)):  # not True or 2.0
+        raise APIError(HTTPStatus.BAD_REQUEST, "priority must be 1, 2 or 3")
+    if updates.get("due_date") is not None:
+        try:
+            timeutil.to_epoch(updates["due_date"])
+        except (TypeError, ValueError):
+            raise APIError(HTTPStatus.BAD_REQUEST,
+                           "due_date must be 'YYYY-MM-DD HH:MM:SS' (or ISO 8601), epoch seconds or null")
+    return updates
+
+def _validate_ids(ids: Any) -> List[int]:
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Expected a non-empty list of integer ids")
+    if len(ids) > MAX_BULK_ITEMS:
+        raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {MAX_BULK_ITEMS} ids per request")
+    return ids
+
+class TaskAPI:
+    # Route handlers. Each returns (status, JSON-serialisable body); the HTTP
+    # plumbing lives in APIRequestHandler.
+    def __init__(self, db: Optional[DatabaseManager] = None, reminders: bool = True, archive: bool = True):
+        self.planner = PlannerAgent()
+        self.scheduler = SchedulerAgent()
+        if db is not None:  # e.g. a different database file than the UI's
+            self.planner.db_manager = self.scheduler.db_manager = db
+        self.db = self.planner.db_manager
+        self.reminder_service: Optional[ReminderService] = None
+        self._owns_reminder_service = False
+        if reminders:
+            if db is None:
+                self.reminder_service = get_reminder_service()
+            else:
+                agent = ReminderAgent()
+                agent.db_manager = db
+                self.reminder_service = ReminderService(agent)
+                self.reminder_service.start()
+                self._owns_reminder_service = True
+        self.archiver: Optional[TaskArchiver] = None
+        self._owns_archiver = archive and db is not None
+        if archive:
+            self.archiver = get_task_archiver() if db is None else TaskArchiver.from_env(db)
+            self.archiver.start()
+        cls = type(self)  # handlers are called on the requesting user's view (for_user)
+        self.routes = [
+            ("GET", re.compile(r"/health"), cls.health),
+            ("GET", re.compile(r"/stats"), cls.stats),
+            ("GET", re.compile(r"/metrics"), cls.metrics),
+            ("GET", re.compile(r"/tasks"), cls.list_tasks),
+            ("POST", re.compile(r"/tasks"), cls.create_task),
+            ("POST", re.compile(r"/tasks/bulk"), cls.create_tasks),
+            ("POST", re.compile(r"/tasks/bulk/update"), cls.update_tasks),
+            ("POST", re.compile(r"/tasks/bulk/delete"), cls.delete_tasks),
+            ("GET", re.compile(r"/tasks/(\d+)"), cls.get_task),
+            ("PATCH", re.compile(r"/tasks/(\d+)"), cls.update_task),
+            ("DELETE", re.compile(r"/tasks/(\d+)"), cls.delete_task),
+            ("GET", re.compile(r"/tasks/(\d+)/events"), cls.get_task_events),
+            ("GET", re.compile(r"/reminders"), cls.get_reminders),
+            ("POST", re.compile(r"/reminders/check"), cls.check_reminders),
+        ]
+
+    def for_user(self, user_id: str) -> "TaskAPI":
+        # This API with its database and agents scoped to `user_id`'s tasks.
+        if user_id == self.db.user_id:
+            return self
+        api = copy.copy(self)
+        api.db = self.db.for_user(user_id)
+        api.planner = self.planner.for_user(user_id)
+        api.scheduler = self.scheduler.for_user(user_id)
+        return api
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], body: Any,
+                 user_id: str = DEFAULT_USER) -> Tuple[HTTPStatus, Any]:
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method == method:
+                return handler(self.for_user(user_id), *match.groups(), query=query, body=body)
+        if path_matched:
+            raise APIError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise APIError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+
+    def close(self):
+        if self._owns_reminder_service:
+            self.reminder_service.stop()
+        if self._owns_archiver:
+            self.archiver.stop()
+
+    # --- handlers ---
+    def health(self, query, body):
+        return HTTPStatus.OK, {"status": "ok",
+                               "reminders": bool(self.reminder_service and self.reminder_service.running)}
+
+    def stats(self, query, body):
+        return HTTPStatus.OK, {"tasks": self.db.count_tasks(), "cache": self.db.cache.stats()}
+
+    def metrics(self, query, body):
+        return HTTPStatus.OK, metrics.to_prometheus()  # str bodies are sent as text/plain
+
+    def list_tasks(self, query, body):
+        status = query.get("status") or None
+        if status == "all":
+            status = None
+        if status is not None and status not in STATUSES:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"status must be one of {', '.join(STATUSES)} or all")
+        try:
+            limit = min(max(int(query.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "limit must be an integer")
+        columns = None
+        if query.get("fields"):  # e.g. fields=id,description,due_date
+            columns = tuple(field.strip() for field in query["fields"].split(",") if field.strip())
+            if not set(columns) <= set(TASK_COLUMNS):
+                raise APIError(HTTPStatus.BAD_REQUEST, f"fields must be among {', '.join(TASK_COLUMNS)}")
+        if query.get("q", "").strip():
+            tasks = self.db.search_tasks(query["q"], status_filter=status, limit=limit, columns=columns)
+            return HTTPStatus.OK, {"tasks": [task_json(task) for task in tasks], "next_cursor": None}
+        after = decode_cursor(query["cursor"]) if query.get("cursor") else None
+        tasks = self.db.get_all_tasks(status_filter=status, limit=limit + 1, after=after, columns=columns,
+                                      include_archive=query.get("archive") in ("1", "true"))
+        next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+        return HTTPStatus.OK, {"tasks": [task_json(task) for task in tasks[:limit]], "next_cursor": next_cursor}
+
+    def create_task(self, query, body):
+        text = body.get("text") if isinstance(body, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected {\"text\": \"...\"}")
+        planned_task = self.planner.process(text)
+        if isinstance(body.get("priority"), int) and body["priority"] in (1, 2, 3):
+            planned_task["priority"] = body["priority"]
+        task_id = self.scheduler.process(planned_task)
+        if task_id is None:
+            raise APIError(HTTPStatus.INTERNAL_SERVER_ERROR, "Scheduler Agent failed to add the task")
+        return HTTPStatus.CREATED, task_json(self.db.get_task(task_id))
+
+    def create_tasks(self, query, body):
+        # Bulk path: pure planning plus one multi-row insert, as in ingestion.
+        items = body.get("items") if isinstance(body, dict) else None
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected {\"items\": [\"...\", ...]}")
+        if len(items) > MAX_BULK_ITEMS:
+            raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {MAX_BULK_ITEMS} items per request")
+        now = datetime.now()
+        planned = [plan_task(item.strip(), now=now) for item in items if item.strip()]
+        task_ids = self.scheduler.schedule_many(planned, now=now)
+        if planned and not task_ids:
+            raise APIError(HTTPStatus.INTERNAL_SERVER_ERROR, "Scheduler Agent failed to add the tasks")
+        return HTTPStatus.CREATED, {"ids": task_ids}
+
+    def get_task(self, task_id, query, body):
+        task = self.db.get_task(int(task_id))
+        if task is None:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Task {task_id} not found")
+        return HTTPStatus.OK, task_json(task)
+
+    def update_task(self, task_id, query, body):
+        updates = _validate_updates(body)
+        self.get_task(task_id, query, None)
+        self.db.update_task(int(task_id), updates, events=[TaskEvent("API", "edited", updates)])
+        return HTTPStatus.OK, task_json(self.db.get_task(int(task_id)))
+
+    def get_task_events(self, task_id, query, body):
+        self.get_task(task_id, query, None)
+        try:
+            limit = int(query["limit"]) if query.get("limit") else None
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "limit must be an integer")
+        events = self.db.get_task_events(int(task_id), limit=limit)
+        return HTTPStatus.OK, {"events": [dict(event, timestamp=timeutil.to_text(event["timestamp"]))
+                                          for event in events]}
+
+    def delete_task(self, task_id, query, body):
+        self.get_task(task_id, query, None)
+        self.db.delete_task(int(task_id))
+        return HTTPStatus.OK, {"deleted": [int(task_id)]}
+
+    def update_tasks(self, query, body):
+        body = body if isinstance(body, dict) else {}
+        task_ids = _validate_ids(body.get("ids"))
+        updates = _validate_updates(body.get("updates"))
+        updated = self.db.update_tasks(task_ids, updates, events=[TaskEvent("API", "edited", updates)])
+        return HTTPStatus.OK, {"updated": updated}
+
+    def delete_tasks(self, query, body):
+        task_ids = _validate_ids(body.get("ids") if isinstance(body, dict) else None)
+        return HTTPStatus.OK, {"deleted": self.db.delete_tasks(task_ids)}
+
+    def get_reminders(self, query, body):
+        # Long-polling is left to the client: pass the last seen sequence number.
+        if self.reminder_service is None:
+            raise APIError(HTTPStatus.SERVICE_UNAVAILABLE, "Reminder service disabled")
+        try:
+            after = int(query.get("after", 0))
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "after must be an integer")
+        fired = self.reminder_service.get_fired(after, user_id=self.db.user_id)
+        return HTTPStatus.OK, {"reminders": [{"seq": seq, "message": message} for seq, message in fired],
+                               "last_seq": fired[-1][0] if fired else after}
+
+    def check_reminders(self, query, body):
+        if self.reminder_service is None:
+            raise APIError(HTTPStatus.SERVICE_UNAVAILABLE, "Reminder service disabled")
+        self.reminder_service.check_now()
+        return HTTPStatus.ACCEPTED, {"status": "scheduled"}
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: clients reuse one connection (and one handler thread)
+    server_version = "TodoAgentsAPI/1.0"
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid the delayed-ACK stall
+    api: TaskAPI  # set by make_server
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            user_id = self.headers.get("X-User") or DEFAULT_USER
+            if not USER_ID_PATTERN.fullmatch(user_id):
+                raise APIError(HTTPStatus.BAD_REQUEST, "X-User must be 1-64 letters, digits or _.@-")
+            body = self._read_body()
+            status, payload = self.api.dispatch(self.command, url.path.rstrip("/") or "/", query, body, user_id)
+        except APIError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:  # never drop the connection without a response
+            self.api.scheduler.log(f"API error on {self.command} {url.path}: {e}", level="ERROR")
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+        self._send_json(status, payload)
+
+    def _read_body(self) -> Any:
+        length = (self.headers.get("Content-Length") or "0").strip()
+        if not (length.isascii() and length.isdigit()):  # int() would also take "-1", "+1" or "1_0"
+            self.close_connection = True  # the body, if any, can't be skipped
+            raise APIError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+
+    def _send_json(self, status: HTTPStatus, payload: Any):
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, content_type = json.dumps(payload, default=json_default).encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass  # per-request access logging would dominate the cost of small requests
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, api: Optional[TaskAPI] = None) -> ThreadingHTTPServer:
+    handler = type("BoundAPIRequestHandler", (APIRequestHandler,), {"api": api or TaskAPI()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
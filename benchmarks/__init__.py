@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Run individual benchmarks from the project root, e.g.:
+#   python -m benchmarks.connection_bench
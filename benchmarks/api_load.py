@@ -0,0 +1,146 @@
+# benchmarks/api_load.py
+# Load test for the headless API: keep-alive clients issue a read-heavy mix of
+# requests for a fixed duration, then report requests/s and latency
+# percentiles per endpoint. Without --url a local server is started on a
+# scratch database seeded with --seed tasks.
+#
+#   python -m benchmarks.api_load [--url http://127.0.0.1:8000] [--duration 10]
+#                                 [--processes 2] [--concurrency 8] [--seed 5000]
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+# (weight, name, method, path template, body factory)
+MIX = [
+    (55, "list", "GET", "/tasks?limit=25", None),
+    (15, "get", "GET", "/tasks/{id}", None),
+    (10, "search", "GET", "/tasks?q=report&limit=25", None),
+    (10, "create", "POST", "/tasks", lambda: {"text": f"load test task {random.random():.6f} tomorrow 5pm"}),
+    (5, "update", "PATCH", "/tasks/{id}", lambda: {"priority": random.randint(1, 3)}),
+    (5, "reminders", "GET", "/reminders?after=0", None),
+]
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _client(host, port, deadline, task_ids, results):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    weights = [entry[0] for entry in MIX]
+    while time.perf_counter() < deadline:
+        _, name, method, template, body_factory = random.choices(MIX, weights)[0]
+        path = template.format(id=random.choice(task_ids))
+        body = json.dumps(body_factory()).encode() if body_factory else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        results.append((name, time.perf_counter() - started, ok))
+    conn.close()
+
+def _run_process(args):
+    # One client process: `concurrency` threads, each with its own connection.
+    host, port, duration, concurrency, task_ids = args
+    deadline = time.perf_counter() + duration
+    results = []
+    threads = [threading.Thread(target=_client, args=(host, port, deadline, task_ids, results))
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def _request(host, port, method, path, payload=None):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    conn.request(method, path, body=json.dumps(payload) if payload is not None else None,
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = json.loads(response.read())
+    conn.close()
+    return data
+
+def _start_local_server(db_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(root, "main.py"), "serve", "--port", "0", "--db", db_path],
+        stdout=subprocess.PIPE, text=True, env=dict(os.environ, AGENT_LOG_FILE=""),
+    )
+    line = server.stdout.readline()
+    match = re.search(r"http://([^:]+):(\d+)", line)
+    if match is None:
+        server.kill()
+        raise RuntimeError(f"Server failed to start: {line!r}")
+    return server, match.group(1), int(match.group(2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless API throughput and latency under load.")
+    parser.add_argument("--url", default=None, help="Existing instance (default: start a local one)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--processes", type=int, default=2, help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Connections per client process")
+    parser.add_argument("--seed", type=int, default=5000, help="Tasks to seed a local instance with")
+    args = parser.parse_args()
+
+    server = None
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            server, host, port = _start_local_server(os.path.join(tmpdir.name, "load.db"))
+            for start in range(0, args.seed, 5000):
+                items = [f"write report {i} in {i % 30 + 1} days" for i in range(start, min(start + 5000, args.seed))]
+                _request(host, port, "POST", "/tasks/bulk", {"items": items})
+        listing = _request(host, port, "GET", "/tasks?limit=500")
+        task_ids = [task["id"] for task in listing["tasks"]] or [1]
+
+        print(f"Load test: {args.processes} processes x {args.concurrency} connections for {args.duration:.0f}s "
+              f"against {host}:{port}")
+        started = time.perf_counter()
+        with Pool(args.processes) as pool:
+            per_process = pool.map(_run_process, [(host, port, args.duration, args.concurrency, task_ids)]
+                                   * args.processes)
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        tmpdir.cleanup()
+
+    results = [result for process_results in per_process for result in process_results]
+    by_endpoint = {}
+    for name, latency, ok in results:
+        by_endpoint.setdefault(name, []).append((latency, ok))
+    by_endpoint["ALL"] = [(latency, ok) for _, latency, ok in results]
+
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, samples in by_endpoint.items():
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        print(f"{name:<10} {len(samples):>9} {errors:>7} {len(samples) / elapsed:>9.0f} "
+              f"{_percentile(latencies, 0.50):>8.2f} {_percentile(latencies, 0.90):>8.2f} "
+              f"{_percentile(latencies, 0.99):>8.2f} {latencies[-1] if latencies else 0:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/archive_bench.py
+# Hot/cold split: the suite's database (60% of tasks completed, most of them
+# long ago) timed before and after the archiver moves tasks completed more
+# than --days ago out of the working tables. "before" is what every listing
+# paid with completed tasks kept in `tasks` forever; "after" the same calls
+# on the working table alone, and the history view (include_archive) that
+# merges the archive back in.
+# The archiving pass runs alongside a writer updating open tasks, to show
+# that batches don't hold the write lock for long: it reports tasks archived
+# per second and the writer's latency while archiving vs. idle.
+#
+#   python -m benchmarks.archive_bench [--tasks 100000] [--days 30] [--batch-size 200]
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.suite import PAGE_SIZE, _copy_db, cached_db, measure
+from database.archive import TaskArchiver
+from database.db_manager import DatabaseManager
+from utils.logger import agent_logger
+
+def _sizes(manager: DatabaseManager) -> Dict[str, int]:
+    # Bytes per table and index (the dbstat virtual table).
+    return dict(manager._query("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+
+def _calls(manager: DatabaseManager, archived: bool) -> Dict[str, Callable[[], object]]:
+    calls = {
+        "get_all_tasks[all] page": lambda: manager.get_all_tasks(limit=PAGE_SIZE),
+        "get_all_tasks[all] full": lambda: manager.get_all_tasks(),
+        "get_all_tasks[completed] full": lambda: manager.get_all_tasks(status_filter="completed"),
+        "get_all_tasks[pending] full": lambda: manager.get_all_tasks(status_filter="pending"),
+        "search_tasks[all] 'call'": lambda: manager.search_tasks("call", limit=PAGE_SIZE),
+        "get_tasks_for_reminder": manager.get_tasks_for_reminder,
+        "count_tasks[all]": manager.count_tasks,
+    }
+    if archived:  # the history view; "before" it is the plain listing
+        calls["history[all] page"] = lambda: manager.get_all_tasks(limit=PAGE_SIZE, include_archive=True)
+        calls["history[all] full"] = lambda: manager.get_all_tasks(include_archive=True)
+    return calls
+
+def _write_latencies(manager: DatabaseManager, task_ids: List[int], stop: threading.Event) -> List[float]:
+    # Updates random open tasks back to back until `stop`; returns each write's ms.
+    rng = random.Random(7)
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        manager.update_task(rng.choice(task_ids), {"priority": rng.randint(1, 3)})
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def _percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    return (f"{len(samples):>6,} writes  p50 {statistics.median(samples):6.2f} ms  p99 {p99:6.2f} ms  "
+            f"max {samples[-1]:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Working-table timings before and after archiving completed tasks.")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--days", type=float, default=30.0, help="Archive tasks completed at least this long ago")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=2.0, help="Max seconds of timed work per call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "todo_bench_data"))
+    args = parser.parse_args()
+    agent_logger.configure(path="")
+
+    source = cached_db(args.data_dir, args.tasks, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "archive.db")
+        _copy_db(source, path)
+        manager = DatabaseManager(path, cache_size=0)
+        for call in _calls(manager, archived=False).values():  # warm the page cache first
+            call()
+        before = {name: measure(call, args.repeat, args.budget)["median_ms"]
+                  for name, call in _calls(manager, archived=False).items()}
+        sizes_before = _sizes(manager)
+
+        # Archive while another thread keeps writing; the same writer alone first.
+        open_ids = [task.id for task in manager.get_all_tasks(status_filter="pending", columns=("id",))]
+        stop = threading.Event()
+        timer = threading.Timer(2.0, stop.set)
+        timer.start()
+        idle = _write_latencies(manager, open_ids, stop)
+        stop = threading.Event()
+        busy: List[float] = []
+        writer = threading.Thread(target=lambda: busy.extend(_write_latencies(manager, open_ids, stop)))
+        writer.start()
+        archiver = TaskArchiver(manager, after_days=args.days, batch_size=args.batch_size)
+        started = time.perf_counter()
+        moved = archiver.run_once()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        writer.join()
+        print(f"Archived {moved:,} of {args.tasks:,} tasks (completed over {args.days:g} days ago) in {elapsed:.2f}s: "
+              f"{moved / elapsed:,.0f} tasks/s in batches of {args.batch_size}")
+        print(f"  concurrent writer, idle:      {_percentiles(idle)}")
+        print(f"  concurrent writer, archiving: {_percentiles(busy)}")
+        problems = manager.for_user(None).check_stats()
+        if problems:
+            raise SystemExit("Counters drifted while archiving: " + "; ".join(problems))
+
+        with manager.transaction() as conn:
+            conn.execute("ANALYZE")
+        after = {name: measure(call, args.repeat, args.budget)["median_ms"]
+                 for name, call in _calls(manager, archived=True).items()}
+        sizes_after = _sizes(manager)
+        manager.close()
+
+    print(f"\n{'median ms':<34}{'before':>10}{'after':>10}{'speedup':>9}")
+    for name, ms in after.items():
+        baseline = before.get(name, before.get(name.replace("history", "get_all_tasks")))
+        print(f"{name:<34}{baseline:>10.3f}{ms:>10.3f}{baseline / ms:>8.1f}x")
+    print(f"\n{'MB':<34}{'before':>10}{'after':>10}")
+    for name in ("tasks", "idx_tasks_order", "idx_tasks_status_order", "task_events", "tasks_fts_data",
+                 "tasks_archive", "task_events_archive"):
+        print(f"{name:<34}{sizes_before.get(name, 0) / 1e6:>10.1f}{sizes_after.get(name, 0) / 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    main()
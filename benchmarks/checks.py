@@ -0,0 +1,36 @@
+# benchmarks/checks.py
+# The pass/fail scripts among the benchmarks, in one command (for CI, or
+# before a commit): each runs in its own interpreter, on its own scratch
+# database, from fixed seeds, and must exit 0. Exits non-zero if any fails.
+#
+#   python -m benchmarks.checks [query_plans write_checks ...]
+import subprocess
+import sys
+import time
+
+CHECKS = [
+    "query_plans",  # listing, count and reminder queries are served from indexes
+    "write_checks",  # savepoint rollback within a group commit; after-commit callbacks
+    "outbox_checks",  # reminder delivery: lease expiry, retry backoff, delivery after a restart
+]
+
+def main():
+    names = sys.argv[1:] or CHECKS
+    unknown = set(names) - set(CHECKS)
+    if unknown:
+        raise SystemExit(f"Unknown checks: {', '.join(sorted(unknown))}; expected some of {', '.join(CHECKS)}")
+    failed = []
+    for name in names:
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-m", f"benchmarks.{name}"], capture_output=True, text=True)
+        print(f"{'ok' if result.returncode == 0 else 'FAILED':<7}{name:<20}{time.perf_counter() - started:6.1f}s")
+        if result.returncode != 0:
+            failed.append(name)
+            print(result.stdout[-4000:] + result.stderr[-4000:])
+    if failed:
+        print(f"\n{len(failed)} check(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\nAll {len(names)} check(s) passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/connection_bench.py
+# Per-call latency of DatabaseManager operations: connect-per-call (the old
+# behaviour) versus the pooled per-thread connection.
+#
+#   python -m benchmarks.connection_bench [--iterations 2000]
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+
+TASK = {"description": "benchmark task", "status": "pending", "due_date": 1893513600,  # 2030-01-01
+        "created_at": 1700000000, "priority": 2, "assigned_agent": "bench", "agent_notes": ""}
+
+def _unpooled_get_task(db_name, task_id):
+    conn = sqlite3.connect(db_name)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def _unpooled_add_task(db_name, task):
+    conn = sqlite3.connect(db_name)
+    cursor = conn.execute('''
+        INSERT INTO tasks (description, status, due_date, created_at, priority, assigned_agent, agent_notes)
+        VALUES (:description, :status, :due_date, :created_at, :priority, :assigned_agent, :agent_notes)
+    ''', task)
+    conn.commit()
+    conn.close()
+    return cursor.lastrowid
+
+def _time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6  # microseconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call connect vs pooled connection latency.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "bench.db")
+        manager = DatabaseManager(db_name, cache_size=0)  # time the connection, not the query cache
+        task_id = manager.add_task(TASK)
+
+        results = [
+            ("get_task", lambda: _unpooled_get_task(db_name, task_id), lambda: manager.get_task(task_id)),
+            ("add_task", lambda: _unpooled_add_task(db_name, TASK), lambda: manager.add_task(TASK)),
+        ]
+        print(f"{'operation':<12}{'per-call connect':>20}{'pooled':>12}{'speedup':>10}")
+        for name, before, after in results:
+            before_us = _time_per_call(before, args.iterations)
+            after_us = _time_per_call(after, args.iterations)
+            print(f"{name:<12}{before_us:>17.1f} us{after_us:>9.1f} us{before_us / after_us:>9.1f}x")
+        manager.close()
+
+if __name__ == "__main__":
+    main()
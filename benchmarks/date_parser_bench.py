@@ -0,0 +1,82 @@
+# benchmarks/date_parser_bench.py
+# Parses per second: the original multi-pass PlannerAgent date extraction
+# versus utils.date_expressions.parse / parse_many.
+#
+#   python -m benchmarks.date_parser_bench [--inputs 20000]
+import argparse
+import gc
+import re
+import time
+from datetime import datetime, timedelta
+
+from utils import date_expressions
+
+SAMPLES = [
+    "buy milk tomorrow",
+    "finish report by next friday",
+    "call mom on 2026-12-25",
+    "water the plants",
+    "renew passport next monday",
+    "prepare slides for the quarterly review meeting with the whole team",
+    "submit expenses by 2026-11-30",
+    "book flights tomorrow",
+]
+
+def legacy_parse(description):
+    # Copy of the pre-refactor PlannerAgent.process date logic, minus logging.
+    due_date_str = None
+    if "tomorrow" in description.lower():
+        due_date = datetime.now() + timedelta(days=1)
+        description = re.sub(r'\s*tomorrow\s*', '', description, flags=re.IGNORECASE).strip()
+        due_date_str = due_date.strftime('%Y-%m-%d %H:%M:%S')
+    match_next_day = re.search(r'next\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', description.lower())
+    if match_next_day:
+        day_name = match_next_day.group(1)
+        days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+        target_day_index = days.index(day_name)
+        today_index = datetime.now().weekday()
+        days_to_add = (target_day_index - today_index + 7) % 7
+        if days_to_add == 0:
+            days_to_add = 7
+        due_date = datetime.now() + timedelta(days=days_to_add)
+        description = re.sub(r'next\s+' + day_name, '', description, flags=re.IGNORECASE).strip()
+        due_date_str = due_date.strftime('%Y-%m-%d %H:%M:%S')
+    match_date = re.search(r'(by|on)\s+(\d{4}-\d{2}-\d{2})', description.lower())
+    if match_date:
+        try:
+            date_str = match_date.group(2)
+            due_date = datetime.strptime(date_str, '%Y-%m-%d').replace(hour=17, minute=0, second=0)
+            description = re.sub(r'(by|on)\s+' + date_str, '', description, flags=re.IGNORECASE).strip()
+            due_date_str = due_date.strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            pass
+    return description, due_date_str
+
+def _rate(fn, inputs, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(inputs)
+        best = min(best, time.perf_counter() - start)
+    return len(inputs) / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Date expression parser throughput.")
+    parser.add_argument("--inputs", type=int, default=20000)
+    args = parser.parse_args()
+    inputs = [SAMPLES[i % len(SAMPLES)] for i in range(args.inputs)]
+
+    runs = [
+        ("legacy (multi-pass)", lambda xs: [legacy_parse(x) for x in xs]),
+        ("parse()", lambda xs: [date_expressions.parse(x) for x in xs]),
+        ("parse_many()", date_expressions.parse_many),
+    ]
+    baseline = None
+    for name, fn in runs:
+        rate = _rate(fn, inputs)
+        baseline = baseline or rate
+        print(f"{name:<22}{rate:>12,.0f} parses/s{rate / baseline:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/delivery_bench.py
+# Reminder delivery throughput and reliability against local stand-ins: an
+# HTTP server for WebhookSink and a minimal SMTP server for SmtpSink (plus a
+# FileSink), which reject a --fail-rate share of requests so batches go
+# through the retry path. Creates --tasks tasks that are all due a reminder,
+# runs the ReminderService until every reminder is acknowledged, and reports
+# delivered reminders per second per sink and overall.
+# Then checks durability: reminders queued while no dispatcher runs (as if
+# the process died after queueing) are delivered by a fresh manager and
+# dispatcher on the same database, and the in-app feed (a table) holds both runs'.
+# Exits non-zero if any reminder is missing from a sink or a task's
+# reminder_sent_at wasn't set.
+#
+#   python -m benchmarks.delivery_bench [--tasks 2000] [--fail-rate 0.1]
+import argparse
+import json
+import os
+import random
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set
+
+from agents.delivery import FileSink, SmtpSink, WebhookSink
+from agents.reminder_agent import ReminderAgent
+from agents.reminder_service import ReminderService
+from database.db_manager import ALL_USERS, DatabaseManager
+from utils import timeutil
+from utils.logger import agent_logger
+
+class StandIn:
+    # What a stand-in server received: outbox ids (a set: deliveries are at
+    # least once) and request counts.
+    def __init__(self, fail_rate: float, seed: int):
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids: Set[int] = set()
+        self.accepted = self.rejected = 0
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.fail_rate
+
+    def accept(self, ids: List[int]):
+        with self.lock:
+            self.ids.update(ids)
+            self.accepted += 1
+
+    def reject(self):
+        with self.lock:
+            self.rejected += 1
+
+def start_webhook(state: StandIn) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if state.should_fail():
+                state.reject()
+                self.send_response(503)
+            else:
+                state.accept([reminder["id"] for reminder in body["reminders"]])
+                self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_smtp(state: StandIn) -> socketserver.ThreadingTCPServer:
+    # Just enough SMTP for smtplib: every command is accepted; a message is
+    # rejected after DATA (451) at the failure rate.
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line: str):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            self.reply("220 stand-in ESMTP")
+            for raw in self.rfile:
+                command = raw.decode(errors="replace").strip().upper()
+                if command.startswith(("EHLO", "HELO")):
+                    self.reply("250 stand-in")
+                elif command.startswith("DATA"):
+                    self.reply("354 end with .")
+                    message_id = None
+                    for line in self.rfile:
+                        if line in (b".\r\n", b".\n"):
+                            break
+                        if line.lower().startswith(b"message-id: <reminder-"):
+                            message_id = int(line.split(b"-", 2)[2].split(b"@")[0])
+                    if state.should_fail():
+                        state.reject()
+                        self.reply("451 try again later")
+                    else:
+                        state.accept([message_id])
+                        self.reply("250 queued")
+                elif command.startswith("QUIT"):
+                    self.reply("221 bye")
+                    return
+                else:  # MAIL, RCPT, RSET, NOOP
+                    self.reply("250 ok")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_tasks(manager: DatabaseManager, count: int, users: int = 10) -> List[int]:
+    # Due within the hour, so the default policy wants them reminded now.
+    due = timeutil.now() + 3600
+    ids = []
+    for user in range(users):
+        ids += manager.for_user(f"user{user}").add_tasks([
+            {"description": f"deliver me {user}-{i}", "status": "pending", "due_date": due, "priority": 2,
+             "assigned_agent": "bench"} for i in range(user, count, users)])
+    return ids
+
+def wait_delivered(manager: DatabaseManager, task_ids: List[int], timeout: float) -> float:
+    # Seconds until every task has reminder_sent_at and the outbox holds no pending rows.
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        pending = sum(counts.get("pending", 0) for counts in manager.outbox_counts().values())
+        if not pending and all(task["reminder_sent_at"] for task in manager.get_tasks_by_ids(task_ids)):
+            return time.perf_counter() - started
+        time.sleep(0.02)
+    raise SystemExit(f"Reminders still undelivered after {timeout:.0f}s: {manager.outbox_counts()}")
+
+def check(name: str, state: StandIn, expected: int) -> bool:
+    ok = len(state.ids) == expected
+    print(f"  {name:<8} received {len(state.ids):>6,}/{expected:,} distinct reminders "
+          f"({state.accepted:,} requests accepted, {state.rejected:,} rejected){'' if ok else '  MISSING'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Reminder delivery throughput against local SMTP/HTTP stand-ins.")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="Share of requests the stand-ins reject")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    agent_logger.configure(path="")
+
+    webhook_state, smtp_state = StandIn(args.fail_rate, 1), StandIn(args.fail_rate, 2)
+    webhook_server, smtp_server = start_webhook(webhook_state), start_smtp(smtp_state)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "delivery.db")
+        jsonl = os.path.join(tmp, "reminders.jsonl")
+
+        def sinks():
+            return [WebhookSink(f"http://127.0.0.1:{webhook_server.server_port}/hook"),
+                    SmtpSink("127.0.0.1", smtp_server.server_address[1]), FileSink(jsonl)]
+
+        def service(manager: DatabaseManager) -> ReminderService:
+            agent = ReminderAgent()
+            agent.db_manager = manager
+            reminders = ReminderService(agent, sinks=sinks())
+            reminders.dispatcher.base_delay = 0.05  # retries in milliseconds, not seconds
+            return reminders
+
+        manager = DatabaseManager(path, cache_size=0).for_user(ALL_USERS)
+        task_ids = make_tasks(manager, args.tasks)
+        reminders = service(manager)
+        reminders.start()
+        elapsed = wait_delivered(manager, task_ids, args.timeout)
+        stats = reminders.dispatcher.stats
+        reminders.stop()
+        print(f"{args.tasks:,} reminders to 4 sinks (fail rate {args.fail_rate:.0%}) in {elapsed:.2f}s: "
+              f"{args.tasks / elapsed:,.0f} reminders/s acknowledged")
+        for name, counts in stats.items():
+            print(f"  {name:<8} {counts['delivered'] / elapsed:>9,.0f} delivered/s  {counts['batches']:>5,} batches  "
+                  f"{counts['retries']:>4,} retried  {counts['failed']:>3,} gave up")
+        with open(jsonl) as stream:
+            file_ids = {json.loads(line)["id"] for line in stream}
+        ok &= check("webhook", webhook_state, args.tasks) & check("smtp", smtp_state, args.tasks)
+        per_user = [len(range(user, args.tasks, 10)) for user in range(10)]  # make_tasks' spread
+        ok &= len(file_ids) == args.tasks
+        ok &= len(reminders.get_fired()) == sum(min(n, reminders.app_sink.max_fired) for n in per_user)
+
+        # Durability: queue without a running dispatcher, then deliver from a fresh manager.
+        print("Restart: reminders queued before a restart are delivered after it")
+        more = make_tasks(manager, 200)
+        agent = ReminderAgent()
+        agent.db_manager = manager
+        agent.process(tasks=manager.get_tasks_by_ids(more), deliver_to=["webhook", "smtp", "file", "app"])
+        queued = sum(counts.get("pending", 0) for counts in manager.outbox_counts().values())
+        manager.close()
+        manager = DatabaseManager(path, cache_size=0).for_user(ALL_USERS)
+        reminders = service(manager)
+        reminders.dispatcher.start()
+        elapsed = wait_delivered(manager, more, args.timeout)
+        reminders.dispatcher.stop()
+        print(f"  {queued:,} queued rows delivered {elapsed:.2f}s after restart")
+        ok &= check("webhook", webhook_state, args.tasks + 200) & check("smtp", smtp_state, args.tasks + 200)
+        # The in-app feed is in the database, so the fresh service sees both runs' reminders.
+        fed = sum(min(n + len(range(user, 200, 10)), reminders.app_sink.max_fired) for user, n in enumerate(per_user))
+        in_app = len(reminders.get_fired())
+        print(f"  {'app':<8} feed holds {in_app:>6,}/{fed:,} reminders{'' if in_app == fed else '  MISSING'}")
+        ok &= in_app == fed
+        manager.close()
+
+    webhook_server.shutdown()
+    smtp_server.shutdown()
+    if not ok:
+        print("Some reminders were not delivered.")
+        sys.exit(1)
+    print("Every reminder was delivered to every sink.")
+
+if __name__ == "__main__":
+    main()
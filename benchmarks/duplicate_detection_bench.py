@@ -0,0 +1,60 @@
+# benchmarks/duplicate_detection_bench.py
+# Duplicate detection cost for PlannerAgent: the old full-table substring scan
+# versus the FTS5 lookup in DatabaseManager.find_similar_tasks.
+#
+#   python -m benchmarks.duplicate_detection_bench [--rows 100000]
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+
+WORDS = ("buy milk call mom finish report review pull request book flights pay rent "
+         "renew passport water plants clean garage prepare slides email team plan sprint "
+         "fix bug update docs order supplies schedule dentist backup laptop").split()
+PROBES = ["finish report", "call mom", "renew passport", "quarterly budget", "water plants"]
+
+def _old_find_similar(manager, description):
+    # The pre-FTS implementation from PlannerAgent.process
+    return [task for task in manager.get_all_tasks()
+            if task['status'] != 'completed' and description.lower() in task['description'].lower()]
+
+def _populate(manager, rows, batch=10000):
+    statuses = ["pending", "in progress", "completed"]
+    for start in range(0, rows, batch):
+        manager.add_tasks([{
+            "description": " ".join(random.sample(WORDS, 4)) + f" #{i}",
+            "status": random.choice(statuses),
+            "due_date": None,
+            "priority": random.randint(1, 3),
+            "assigned_agent": "bench",
+            "agent_notes": "",
+        } for i in range(start, min(start + batch, rows))])
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000  # milliseconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Duplicate detection: substring scan vs FTS5.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(os.path.join(tmp, "dupes.db"))
+        _populate(manager, args.rows)
+        print(f"{args.rows} tasks")
+        print(f"{'probe':<18}{'scan (ms)':>12}{'fts5 (ms)':>12}{'speedup':>10}")
+        for probe in PROBES:
+            old_ms = _time(lambda: _old_find_similar(manager, probe), args.repeat)
+            new_ms = _time(lambda: manager.find_similar_tasks(probe), args.repeat)
+            print(f"{probe:<18}{old_ms:>12.2f}{new_ms:>12.3f}{old_ms / new_ms:>9.0f}x")
+        manager.close()
+
+if __name__ == "__main__":
+    main()
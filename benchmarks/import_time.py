@@ -0,0 +1,114 @@
+# benchmarks/import_time.py
+# Cold-start cost of the app's entry points. Each module is imported in a fresh
+# interpreter under `python -X importtime`; the import time is the sum of the
+# top-level imports it triggers (interpreter start-up excluded). Opening a
+# DatabaseManager is timed on a new database (all migrations) and on a current
+# one (the PRAGMA user_version fast path). Exits non-zero if importing any of
+# the modules opens the default tasks.db.
+#
+#   python -m benchmarks.import_time [--repeat 5] [--top 12]
+#
+# `python -m benchmarks.suite run` includes these results as the "startup" size.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["database.db_manager", "agents.planner_agent", "agents.scheduler_agent",
+           "agents.reminder_service", "agents.ingestion", "api.server", "main"]
+
+def _importtime(code: str, cwd: str) -> List[Tuple[int, str, int, int]]:
+    # (depth, module, self us, cumulative us) per line of -X importtime output.
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""), AGENT_LOG_FILE="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=cwd, env=env, check=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]  # one separator space, then two spaces per nesting level
+        entries.append(((len(name) - len(name.lstrip(" "))) // 2, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def profile_import(module: str, cwd: str) -> Tuple[float, Dict[str, int]]:
+    # Import time in ms, and self time (us) per top-level package.
+    baseline = {name for _, name, _, _ in _importtime("pass", cwd)}
+    entries = [entry for entry in _importtime(f"import {module}", cwd) if entry[1] not in baseline]
+    total_us = sum(cumulative for depth, _, _, cumulative in entries if depth == 0)
+    by_package: Dict[str, int] = {}
+    for _, name, self_us, _ in entries:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    return total_us / 1000, by_package
+
+def _summary(samples: List[float]) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "ops_per_run": 1,
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "min_ms": samples[0],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+def _open_db_ms(path: str) -> float:
+    from database.db_manager import DatabaseManager
+    started = time.perf_counter()
+    manager = DatabaseManager(path, cache_size=0)
+    elapsed = (time.perf_counter() - started) * 1000
+    manager.close()
+    return elapsed
+
+def measure_startup(repeat: int = 5) -> Tuple[List[Dict[str, Any]], Dict[str, int], List[str]]:
+    # Returns (suite-style results, worst self import time per package across
+    # the entry points, modules whose import opened tasks.db).
+    results, opened_db = [], []
+    packages: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        for module in MODULES:
+            samples = []
+            for _ in range(repeat):
+                total_ms, by_package = profile_import(module, cwd)
+                samples.append(total_ms)
+                for package, self_us in by_package.items():
+                    packages[package] = max(packages.get(package, 0), self_us)
+            if os.path.exists(os.path.join(cwd, "tasks.db")):
+                opened_db.append(module)
+                os.remove(os.path.join(cwd, "tasks.db"))
+            results.append(dict(_summary(samples), name=f"import {module}"))
+
+        fresh, current = [], []
+        for i in range(repeat):
+            path = os.path.join(cwd, f"open_{i}.db")
+            fresh.append(_open_db_ms(path))
+            current.append(_open_db_ms(path))
+        results.append(dict(_summary(fresh), name="DatabaseManager() new database"))
+        results.append(dict(_summary(current), name="DatabaseManager() current schema"))
+    return results, packages, opened_db
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and database open time of the app's entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=12, help="Heaviest packages to list")
+    args = parser.parse_args()
+
+    results, packages, opened_db = measure_startup(args.repeat)
+    print(f"{'startup step':<42} {'median ms':>10} {'min ms':>10}")
+    for result in results:
+        print(f"{result['name']:<42} {result['median_ms']:>10.2f} {result['min_ms']:>10.2f}")
+    print("\nHeaviest packages (self import time, worst entry point):")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {package:<30} {self_us / 1000:>8.2f} ms")
+    if opened_db:
+        print(f"\nImporting {', '.join(opened_db)} opened tasks.db; the database must be opened lazily.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# benchmarks/outbox_checks.py
+# Pass/fail checks of reminder delivery through the reminder_outbox
+# (agents/delivery.py), with stub sinks and explicit clocks so every run
+# takes the same path:
+#   - a claimed row is skipped until its lease lapses, then claimed again
+#     (a dispatcher that died mid-send);
+#   - a failed send is retried with exponential backoff, only the undelivered
+#     part of a PartialDelivery is retried, and after max_attempts the row
+#     fails and the task goes back on the reminder schedule;
+#   - rows queued before a restart are delivered and acknowledged after it.
+# Exits non-zero if any check fails.
+#
+#   python -m benchmarks.outbox_checks
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from agents.delivery import Delivery, DeliverySink, PartialDelivery, ReminderDispatcher
+from database.db_manager import ALL_USERS, DatabaseManager
+from utils import timeutil
+from utils.logger import agent_logger
+
+failures: List[str] = []
+
+def check(ok: bool, what: str):
+    print(f"    {'ok' if ok else '!!'} {what}")
+    if not ok:
+        failures.append(what)
+
+class StubSink(DeliverySink):
+    # Records what it was sent; raises `error` (if set) instead of acknowledging.
+    def __init__(self, name: str, error: Exception = None):
+        super().__init__(name=name)
+        self.error = error
+        self.sent: List[int] = []
+
+    def send(self, reminders: List[Delivery]):
+        self.sent += [reminder.id for reminder in reminders]
+        if self.error is not None:
+            raise self.error
+
+def _queue(manager: DatabaseManager, count: int, sinks: List[str], queued_at: int) -> List[int]:
+    task_ids = manager.for_user("default").add_tasks([
+        {"description": f"remind me {i}", "status": "pending", "due_date": queued_at + 600, "priority": 2,
+         "assigned_agent": "check"} for i in range(count)])
+    manager.queue_reminders(task_ids, queued_at, {task_id: f"reminder {task_id}" for task_id in task_ids}, sinks)
+    return task_ids
+
+def _batch(rows) -> List[Delivery]:
+    return [Delivery(**{key: row[key] for key in ("id", "task_id", "user_id", "message", "queued_at", "attempts")})
+            for row in rows]
+
+def _outbox(manager: DatabaseManager, sink: str):
+    return {row["id"]: dict(row) for row in manager._query("SELECT * FROM reminder_outbox WHERE sink = ?", (sink,))}
+
+def check_lease(manager: DatabaseManager):
+    print("A claimed row comes back once its lease lapses")
+    now = timeutil.now()
+    _queue(manager, 3, ["leased"], now)
+    claimed = [row["id"] for row in manager.claim_deliveries("leased", now, limit=10, lease=30)]
+    check(len(claimed) == 3, "the due rows are claimed")
+    check(manager.claim_deliveries("leased", now + 29, limit=10, lease=30) == [],
+          "nothing is claimed again while the lease holds")
+    check(manager.next_delivery_at(["leased"]) == now + 30, "the dispatcher wakes when the lease lapses")
+    again = manager.claim_deliveries("leased", now + 30, limit=10, lease=30)
+    check([row["id"] for row in again] == claimed, "the same rows are claimed once it lapses")
+    check(all(row["attempts"] == 0 for row in again), "a lapsed claim is not counted as a failed attempt")
+
+def check_retries(manager: DatabaseManager):
+    print("Failed sends are retried with backoff, then given up")
+    random.seed(7)  # the jitter
+    now = timeutil.now()
+    task_ids = _queue(manager, 4, ["flaky"], now)
+    sink = StubSink("flaky", ConnectionError("down"))
+    dispatcher = ReminderDispatcher(manager, [sink], max_attempts=3, base_delay=10, max_delay=1000)
+    batch = _batch(manager.claim_deliveries("flaky", now, limit=10, lease=60))
+    started = time.time()
+    dispatcher._deliver(sink, batch)
+    rows = _outbox(manager, "flaky")
+    check(all(row["attempts"] == 1 and row["status"] == "pending" and "down" in row["last_error"]
+              for row in rows.values()), "a failed batch is counted and kept pending")
+    check(all(started + 5 <= row["next_attempt_at"] <= time.time() + 10 for row in rows.values()),
+          "the first retry waits base_delay, less up to half as jitter")
+    check(manager.claim_deliveries("flaky", now + 4, limit=10, lease=60) == [], "nothing is due before the backoff")
+
+    # Second attempt: half the batch gets through.
+    batch = _batch(manager.claim_deliveries("flaky", time.time() + 10, limit=10, lease=60))
+    sink.error = PartialDelivery([batch[0].id, batch[1].id], ConnectionError("flaky"))
+    started = time.time()
+    dispatcher._deliver(sink, batch)
+    rows = _outbox(manager, "flaky")
+    check(sorted(rows) == sorted(reminder.id for reminder in batch[2:]),
+          "the delivered part is acknowledged (its rows deleted)")
+    check(all(row["attempts"] == 2 and started + 10 <= row["next_attempt_at"] <= time.time() + 20
+              for row in rows.values()), "the rest waits twice as long")
+    reminded = {task["id"]: task for task in manager.get_tasks_by_ids(task_ids)}
+    check([task_id for task_id in task_ids if reminded[task_id]["reminder_sent_at"]] == task_ids[:2],
+          "tasks are marked reminded once their reminder is acknowledged")
+
+    # Third and last attempt fails: the rows fail and the tasks are rescheduled.
+    batch = _batch(manager.claim_deliveries("flaky", time.time() + 20, limit=10, lease=60))
+    sink.error = ConnectionError("still down")
+    dispatcher._deliver(sink, batch)
+    rows = _outbox(manager, "flaky")
+    check(all(row["status"] == "failed" and row["attempts"] == 3 for row in rows.values()),
+          "after max_attempts the rows are marked failed")
+    tasks = manager.get_tasks_by_ids(task_ids[2:])
+    check(all(task["next_reminder_at"] is not None and task["reminder_sent_at"] is None for task in tasks),
+          "the tasks go back on the reminder schedule")
+    check(all(manager.get_task_events(task_id, limit=1)[0]["kind"] == "reminder_failed" for task_id in task_ids[2:]),
+          "a reminder_failed event is recorded")
+    check(manager.claim_deliveries("flaky", time.time() + 10_000, limit=10, lease=60) == [],
+          "failed rows are never claimed again")
+
+def check_restart(path: str):
+    print("Rows queued before a restart are delivered after it")
+    manager = DatabaseManager(path).for_user(ALL_USERS)
+    task_ids = _queue(manager, 5, ["first", "second"], timeutil.now())
+    manager.close()  # as if the process died before delivering anything
+
+    manager = DatabaseManager(path).for_user(ALL_USERS)
+    sinks = [StubSink("first"), StubSink("second")]
+    dispatcher = ReminderDispatcher(manager, sinks)
+    dispatcher.start()
+    deadline = time.time() + 10
+    while time.time() < deadline and any(counts.get("pending") for counts in manager.outbox_counts().values()):
+        time.sleep(0.02)
+    dispatcher.stop()
+    check(all(len(sink.sent) == len(task_ids) for sink in sinks), "every sink received every queued reminder")
+    check("first" not in manager.outbox_counts() and "second" not in manager.outbox_counts(),
+          "acknowledged rows are removed from the outbox")
+    tasks = manager.get_tasks_by_ids(task_ids)
+    check(all(task["reminder_sent_at"] for task in tasks), "the tasks are marked reminded")
+    check(all(sorted(manager.get_task_events(task_id, limit=1)[0]["payload"]["sinks"]) == ["first", "second"]
+              for task_id in task_ids), "the reminder_sent event lists both sinks")
+    manager.close()
+
+def main():
+    agent_logger.configure(path="")
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(os.path.join(tmp, "outbox.db")).for_user(ALL_USERS)
+        check_lease(manager)
+        check_retries(manager)
+        manager.close()
+        check_restart(os.path.join(tmp, "restart.db"))
+    if failures:
+        print(f"\n{len(failures)} outbox check(s) failed.")
+        sys.exit(1)
+    print("\nAll outbox checks passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/query_plans.py
+# Checks that the listing and reminder queries issued by DatabaseManager are
+# served from indexes: no bare table scans and no temp B-tree sorts.
+# Exits non-zero if any plan regresses. The data comes from a fixed --seed,
+# so a run is repeatable (it is one of benchmarks/checks.py).
+#
+#   python -m benchmarks.query_plans [--rows 5000] [--seed 42]
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+
+from database.db_manager import DatabaseManager
+
+STATUSES = ["pending", "in progress", "completed"]
+USERS = ["default"] + [f"user{i}" for i in range(9)]  # the checked manager is the default user's
+
+def _populate(manager, rows, seed=42):
+    rng = random.Random(seed)
+    now = datetime.datetime.now()
+    tasks = []
+    for i in range(rows):
+        due = now + datetime.timedelta(hours=rng.randint(-24 * 30, 24 * 60))
+        tasks.append({
+            "description": f"synthetic task {i}",
+            "status": rng.choice(STATUSES),
+            "due_date": int(due.timestamp()) if rng.random() > 0.1 else None,
+            "created_at": int(now.timestamp()) - rng.randint(0, 86400 * 30),
+            "priority": rng.randint(1, 3),
+            "assigned_agent": "bench",
+            "agent_notes": "",
+            "user_id": rng.choice(USERS),
+        })
+    with manager.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO tasks (description, status, due_date, created_at, priority, assigned_agent, agent_notes, user_id)
+            VALUES (:description, :status, :due_date, :created_at, :priority, :assigned_agent, :agent_notes, :user_id)
+        ''', tasks)
+        manager.reschedule_reminders()
+        conn.execute("ANALYZE")
+
+def _capture_queries(manager, calls):
+    conn = manager._get_connection()
+    captured = []
+    conn.set_trace_callback(captured.append)  # receives SQL with parameters expanded
+    try:
+        for call in calls:
+            call()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in captured if sql.lstrip().upper().startswith("SELECT")]
+
+def check_plans(manager, calls):
+    conn = manager._get_connection()
+    failures = []
+    for sql in _capture_queries(manager, calls):
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        bad = [step for step in plan
+               if "TEMP B-TREE" in step or (step.startswith("SCAN") and "INDEX" not in step)]
+        print(" ".join(sql.split())[:100])
+        for step in plan:
+            print(f"    {'!!' if step in bad else 'ok'} {step}")
+        if bad:
+            failures.append(sql)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify index usage of DatabaseManager queries.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(os.path.join(tmp, "plans.db"))
+        _populate(manager, args.rows, args.seed)
+        calls = [lambda s=s: manager.get_all_tasks(status_filter=s) for s in ["all"] + STATUSES]
+        for status in ["all", "pending"]:
+            first_page = manager.get_all_tasks(status_filter=status, limit=25)
+            for cursor in (manager.page_cursor(first_page[0]), manager.page_cursor(first_page[-1])):
+                calls.append(lambda s=status, c=cursor: manager.get_all_tasks(status_filter=s, limit=25, after=c))
+        calls.extend(lambda s=s: manager.count_tasks(status_filter=s) for s in ["all", "pending"])
+        archived_id = manager.for_user(None).archive_completed(int(datetime.datetime.now().timestamp()),
+                                                               batch_size=args.rows // 10)[0]
+        for status in ["all", "completed"]:  # history view: working table and archive merged
+            first_page = manager.get_all_tasks(status_filter=status, limit=25, include_archive=True)
+            calls.append(lambda s=status: manager.get_all_tasks(status_filter=s, include_archive=True))
+            calls.append(lambda s=status, c=manager.page_cursor(first_page[-1]):
+                         manager.get_all_tasks(status_filter=s, limit=25, after=c, include_archive=True))
+        calls.append(lambda: manager.count_tasks(include_archive=True))
+        calls.append(manager.get_stats)
+        calls.append(manager.get_tasks_for_reminder)
+        calls.append(manager.for_user(None).get_tasks_for_reminder)  # the reminder service's view
+        calls.append(manager.get_reminder_schedule)
+        calls.append(lambda: manager.get_task_events(1))
+        calls.append(lambda: manager.get_task(archived_id))
+        calls.append(lambda: manager.next_delivery_at(["app", "webhook"]))
+        calls.append(lambda: manager.get_reminder_feed(after=10, unseen_only=True))  # the UI's reminder panel
+        calls.append(lambda: manager.for_user(None).get_reminder_feed(after=10))
+        failures = check_plans(manager, calls)
+        manager.close()
+
+    if failures:
+        print(f"\n{len(failures)} query plan(s) scan or sort without an index.")
+        sys.exit(1)
+    print("\nAll query plans use indexes.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/row_model_bench.py
+# Memory and latency of the list-view row model at 100k rows: the old
+# `SELECT *` + dict-per-row path versus TaskRecord with all columns and with
+# the LIST_COLUMNS projection (no agent_notes / assigned_agent).
+#
+#   python -m benchmarks.row_model_bench [--rows 100000] [--repeat 5]
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.suite import cached_db
+from database.db_manager import DatabaseManager
+from database.models import LIST_COLUMNS
+from utils.logger import agent_logger
+
+ORDER_BY = " ORDER BY due_date ASC, priority ASC, created_at ASC, id ASC"
+
+def _legacy(manager, limit=None):
+    # get_all_tasks before the row model: every column, one dict per row
+    query = "SELECT * FROM tasks" + ORDER_BY + (f" LIMIT {int(limit)}" if limit else "")
+    return [dict(row) for row in manager._get_connection().execute(query).fetchall()]
+
+def _retained_bytes(fn):
+    # Bytes still allocated by the result once the call has returned.
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="List-view row model: dict rows vs TaskRecord projections.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "todo_bench_data"))
+    args = parser.parse_args()
+    agent_logger.configure(path="")
+
+    manager = DatabaseManager(cached_db(args.data_dir, args.rows, 42), cache_size=0)
+    variants = [
+        ("SELECT * -> dict (old)", lambda limit=None: _legacy(manager, limit)),
+        ("TaskRecord, all columns", lambda limit=None: manager.get_all_tasks(limit=limit)),
+        ("TaskRecord, LIST_COLUMNS", lambda limit=None: manager.get_all_tasks(limit=limit, columns=LIST_COLUMNS)),
+    ]
+    print(f"{args.rows:,} rows")
+    print(f"{'variant':<26} {'full list ms':>13} {'retained MB':>12} {'bytes/row':>10} {'page(25) ms':>12}")
+    for name, fn in variants:
+        full_ms = _median_ms(fn, args.repeat)
+        retained = _retained_bytes(fn)
+        page_ms = _median_ms(lambda: fn(25), args.repeat * 200)
+        print(f"{name:<26} {full_ms:>13.1f} {retained / 1e6:>12.1f} {retained / args.rows:>10.0f} {page_ms:>12.3f}")
+    manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# benchmarks/suite.py
+# Reproducible timings of the hot paths over synthetic task databases.
+#
+#   python -m benchmarks.suite run [--sizes startup,1k,100k,1M] [--output results.json]
+#   python -m benchmarks.suite compare baseline.json results.json [--threshold 0.15]
+#
+# Databases are generated from a fixed seed with a realistic mix of status,
+# priority and due dates, and cached in --data-dir (regenerated each day, as
+# due dates are relative to today). Every size is benchmarked on a scratch
+# copy, so writes never leak into the cached database or between runs.
+# The query cache is disabled so reads measure SQLite, not the LRU.
+# The "startup" size times cold imports and database opens (benchmarks/import_time.py).
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.planner_agent import PlannerAgent
+from agents.reminder_agent import ReminderAgent
+from agents.scheduler_agent import SchedulerAgent
+from database.db_manager import DatabaseManager
+from utils import timeutil
+from utils.logger import agent_logger
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+STATUS_FILTERS = ["all", "pending", "in progress", "completed"]
+PAGE_SIZE = 25  # the UI's default page
+DATA_VERSION = 8  # bump when the generator changes, so cached databases are rebuilt
+
+VERBS = ["buy", "call", "email", "finish", "review", "book", "pay", "clean", "plan", "fix",
+         "write", "renew", "schedule", "prepare", "send", "update", "order", "cancel", "check", "submit"]
+OBJECTS = ["milk", "mom", "the report", "dentist appointment", "rent", "the garage", "quarterly budget",
+           "invoice", "passport", "car insurance", "team meeting", "slides", "groceries", "flight tickets",
+           "gym membership", "tax return", "birthday gift", "project proposal", "bike", "newsletter"]
+PLANNER_INPUTS = [
+    "buy milk tomorrow 5pm", "call mom", "finish the report by next friday", "pay rent on Dec 1",
+    "book dentist appointment in 3 days", "review slides at 10:30 am", "renew passport on 2030-05-01",
+    "clean the garage this saturday", "send invoice tonight", "plan team meeting in 2 weeks",
+]
+
+def _synthetic_tasks(rng: random.Random, count: int, now: datetime.datetime, first: int = 0) -> List[Dict[str, Any]]:
+    tasks = []
+    finished = random.Random(first)  # completion times; keeps `rng` (the other columns) as before
+    for i in range(first, first + count):
+        status = rng.choices(["completed", "pending", "in progress"], [60, 30, 10])[0]
+        due = None
+        if rng.random() < 0.8:
+            if status == "completed":
+                due = now - datetime.timedelta(days=rng.uniform(0, 365))
+            elif rng.random() < 0.03:  # a few open tasks slip past their due date
+                due = now - datetime.timedelta(days=rng.uniform(0, 14))
+            else:
+                due = now + datetime.timedelta(days=rng.uniform(0, 90))
+        created = (due or now) - datetime.timedelta(days=rng.uniform(1, 30))
+        reminded = None
+        if due is not None and status != "completed" and due < now + datetime.timedelta(days=1) and rng.random() < 0.5:
+            reminded = now - datetime.timedelta(hours=rng.uniform(0, 12))
+        description = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} #{i}"
+        created_at = timeutil.to_epoch(min(created, now))
+        completed = None
+        if status == "completed":  # around the due date, or within a month of creation
+            completed = min(now, max(created, due or created + datetime.timedelta(days=finished.uniform(0, 30)))
+                            + datetime.timedelta(days=finished.uniform(0, 3)))
+        events = [  # (agent, kind, timestamp, payload) as the agents record them
+            ("PlannerAgent", "planned", created_at, json.dumps({"input": description})),
+            ("SchedulerAgent", "scheduled", created_at, json.dumps({"due_date": due.strftime(DATE_FORMAT) if due else None})),
+        ]
+        if reminded:
+            events.append(("ReminderAgent", "reminder_sent", timeutil.to_epoch(reminded), None))
+        tasks.append({
+            "id": i + 1,
+            "description": description,
+            "status": status,
+            "due_date": timeutil.to_epoch(due),
+            "priority": rng.choices([1, 2, 3], [20, 60, 20])[0],
+            "created_at": created_at,
+            "assigned_agent": "SchedulerAgent",
+            "reminder_sent_at": timeutil.to_epoch(reminded),
+            "completed_at": timeutil.to_epoch(completed),
+            "events": events,
+        })
+    return tasks
+
+def generate_db(path: str, rows: int, seed: int = 42):
+    # Schema (indexes, FTS, triggers) comes from DatabaseManager itself.
+    rng = random.Random(seed)
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    manager = DatabaseManager(path, cache_size=0)
+    with manager.transaction() as conn:
+        if manager.fts_enabled:  # index once at the end instead of per row
+            conn.execute("UPDATE tasks_fts_sync SET enabled = 0")
+        for start in range(0, rows, 50_000):
+            batch = _synthetic_tasks(rng, min(50_000, rows - start), now, first=start)
+            conn.executemany('''
+                INSERT INTO tasks (id, description, status, due_date, priority, created_at,
+                                   assigned_agent, reminder_sent_at, completed_at)
+                VALUES (:id, :description, :status, :due_date, :priority, :created_at,
+                        :assigned_agent, :reminder_sent_at, :completed_at)
+            ''', batch)
+            conn.executemany("INSERT INTO task_events (task_id, agent, kind, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                             [(task["id"],) + event for task in batch for event in task["events"]])
+        manager.reschedule_reminders()  # next_reminder_at under the default policy
+        if manager.fts_enabled:
+            conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+            conn.execute("UPDATE tasks_fts_sync SET enabled = 1")
+        conn.execute("ANALYZE")
+    manager.close()
+    # Leave a self-contained file (no -wal) so it can be renamed into place;
+    # that needs the manager's connections (its writer's too) closed first.
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+
+def cached_db(data_dir: str, rows: int, seed: int) -> str:
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"tasks_{rows}_{seed}_v{DATA_VERSION}_{datetime.date.today():%Y%m%d}.db")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        print(f"  generating {rows:,} rows -> {path}", flush=True)
+        generate_db(partial, rows, seed)
+        os.replace(partial, path)
+    return path
+
+def _copy_db(source: str, destination: str):
+    # The backup API copies a consistent snapshot, WAL included.
+    src, dst = sqlite3.connect(source), sqlite3.connect(destination)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+def measure(fn: Callable[[], Any], repeat: int, budget: float, setup: Optional[Callable[[], Any]] = None,
+            ops: int = 1) -> Dict[str, Any]:
+    # Runs fn up to `repeat` times (at least once) or until `budget` seconds of
+    # timed work have been spent. `ops` > 1 reports per-operation times for
+    # batched calls. setup() runs before each call and isn't timed.
+    samples = []
+    spent = 0.0
+    while len(samples) < repeat and (not samples or spent < budget):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        spent += elapsed
+        samples.append(elapsed / ops * 1000)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "ops_per_run": ops,
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "min_ms": samples[0],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+def run_size(label: str, source: str, repeat: int, budget: float) -> List[Dict[str, Any]]:
+    results = []
+
+    def record(name, result):
+        result.update(size=label, name=name)
+        results.append(result)
+        print(f"  {label:>5} {name:<42} median {result['median_ms']:>10.3f} ms  "
+              f"p95 {result['p95_ms']:>10.3f} ms  ({result['runs']} runs)", flush=True)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "work.db")
+        _copy_db(source, path)
+        manager = DatabaseManager(path, cache_size=0)
+        planner, scheduler, reminder = PlannerAgent(), SchedulerAgent(), ReminderAgent()
+        planner.db_manager = scheduler.db_manager = reminder.db_manager = manager
+        task = {"description": "benchmark task", "status": "pending", "due_date": None, "priority": 2,
+                "assigned_agent": "SchedulerAgent"}
+
+        for status in STATUS_FILTERS:
+            record(f"get_all_tasks[{status}] page",
+                   measure(lambda: manager.get_all_tasks(status_filter=status, limit=PAGE_SIZE), repeat, budget))
+        for status in STATUS_FILTERS:
+            record(f"get_all_tasks[{status}] full",
+                   measure(lambda: manager.get_all_tasks(status_filter=status), repeat, budget))
+        record("get_tasks_for_reminder", measure(manager.get_tasks_for_reminder, repeat, budget))
+        record("get_stats", measure(manager.get_stats, repeat, budget))
+
+        # ReminderAgent marks what it reminds; clear that first so every run
+        # sees the same reminder set.
+        snapshot = [(t["reminder_sent_at"], t["next_reminder_at"], t["id"])
+                    for t in manager.get_tasks_for_reminder()]
+
+        def reset_reminders():
+            with manager.transaction() as conn:
+                conn.executemany("UPDATE tasks SET reminder_sent_at = ?, next_reminder_at = ? WHERE id = ?",
+                                 snapshot)
+
+        record("ReminderAgent.process", measure(reminder.process, repeat, budget, setup=reset_reminders))
+        record("PlannerAgent.process",
+               measure(lambda: [planner.process(text) for text in PLANNER_INPUTS], repeat, budget,
+                       ops=len(PLANNER_INPUTS)))
+        record("add_task", measure(lambda: manager.add_task(task), repeat * 10, budget))
+        record("Planner+SchedulerAgent.process",
+               measure(lambda: [scheduler.process(planner.process(text)) for text in PLANNER_INPUTS],
+                       repeat, budget, ops=len(PLANNER_INPUTS)))
+        batch = [dict(task, description=f"bulk task {i}") for i in range(1000)]
+        record("SchedulerAgent.schedule_many[1000]",
+               measure(lambda: scheduler.schedule_many(batch), repeat, budget, ops=len(batch)))
+        manager.close()
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    agent_logger.configure(path="")  # keep benchmark runs out of the agent log file
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES and size != "startup"]
+    if unknown:
+        sys.exit(f"Unknown sizes {unknown}; choose from startup, {', '.join(SIZES)}")
+    report = {
+        "meta": {
+            "started": datetime.datetime.now().strftime(DATE_FORMAT),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    for size in sizes:
+        print(f"{size}:", flush=True)
+        if size == "startup":
+            from benchmarks.import_time import measure_startup
+            startup, _, _ = measure_startup(min(args.repeat, 5))
+            for result in startup:
+                result["size"] = size
+                print(f"  {size:>5} {result['name']:<42} median {result['median_ms']:>10.3f} ms  "
+                      f"p95 {result['p95_ms']:>10.3f} ms  ({result['runs']} runs)", flush=True)
+            report["results"].extend(startup)
+            continue
+        source = cached_db(args.data_dir, SIZES[size], args.seed)
+        report["results"].extend(run_size(size, source, args.repeat, args.budget))
+        agent_logger.clear_logs()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+def compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = {(r["size"], r["name"]): r for r in json.load(f)["results"]}
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'size':>5} {'benchmark':<42} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    for result in current:
+        base = baseline.get((result["size"], result["name"]))
+        if base is None:
+            print(f"{result['size']:>5} {result['name']:<42} {'-':>10} {result['median_ms']:>10.3f}      new")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        # Sub-`min_ms` timings are mostly noise; don't flag them.
+        regressed = change > args.threshold and result["median_ms"] - base["median_ms"] > args.min_ms
+        regressions += regressed
+        print(f"{result['size']:>5} {result['name']:<42} {base['median_ms']:>10.3f} {result['median_ms']:>10.3f} "
+              f"{change:>+7.1%}" + ("  REGRESSION" if regressed else ""))
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite over synthetic task databases.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the suite and write JSON results")
+    run_parser.add_argument("--sizes", default="startup,1k,100k,1M",
+                            help=f"Comma-separated: startup, {', '.join(SIZES)}")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "todo_bench_data"))
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=20, help="Max runs per benchmark")
+    run_parser.add_argument("--budget", type=float, default=5.0, help="Max timed seconds per benchmark")
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed median slowdown")
+    compare_parser.add_argument("--min-ms", type=float, default=0.05, help="Ignore absolute changes below this")
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+if __name__ == "__main__":
+    main()
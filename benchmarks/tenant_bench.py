@@ -0,0 +1,112 @@
+# benchmarks/tenant_bench.py
+# One user's latency as the number of users sharing the database grows. Each
+# database holds --tasks-per-user synthetic tasks for every user (interleaved,
+# as real sign-ups are); the timed calls run on a single user's view. With
+# user_id leading the indexes they should stay flat from 1 to 1000 users.
+# Exits non-zero if a call's best time grows by more than --max-ratio.
+# Search is reported but not checked: the owner is indexed in tasks_fts so
+# only the user's matches are joined, but bm25 ranking (and prefix expansion
+# of the last word) still reads each term's doclist across all users.
+#
+#   python -m benchmarks.tenant_bench [--users 1,10,100,1000] [--tasks-per-user 500]
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks.suite import _synthetic_tasks, measure
+from database.db_manager import DatabaseManager
+from utils.logger import agent_logger
+
+NOT_FLAT = {"search_tasks['milk']"}  # see above
+
+def generate_db(path: str, users: int, tasks_per_user: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    rows = users * tasks_per_user
+    manager = DatabaseManager(path, cache_size=0)
+    with manager.transaction() as conn:
+        if manager.fts_enabled:
+            conn.execute("UPDATE tasks_fts_sync SET enabled = 0")
+        for start in range(0, rows, 50_000):
+            batch = _synthetic_tasks(rng, min(50_000, rows - start), now, first=start)
+            for task in batch:
+                task["user_id"] = f"user{(task['id'] - 1) % users}"
+            conn.executemany('''
+                INSERT INTO tasks (id, user_id, description, status, due_date, priority, created_at,
+                                   assigned_agent, reminder_sent_at, completed_at)
+                VALUES (:id, :user_id, :description, :status, :due_date, :priority, :created_at,
+                        :assigned_agent, :reminder_sent_at, :completed_at)
+            ''', batch)
+            conn.executemany("INSERT INTO task_events (task_id, agent, kind, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                             [(task["id"],) + event for task in batch for event in task["events"]])
+        manager.reschedule_reminders()
+        if manager.fts_enabled:
+            conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+            conn.execute("UPDATE tasks_fts_sync SET enabled = 1")
+        conn.execute("ANALYZE")
+    manager.close()
+
+def run_users(path: str, repeat: int, budget: float) -> Dict[str, Dict]:
+    manager = DatabaseManager(path, cache_size=0).for_user("user0")
+    first_id = manager.get_all_tasks(limit=1)[0].id
+    task = {"description": "benchmark task", "status": "pending", "due_date": None, "priority": 2,
+            "assigned_agent": "SchedulerAgent"}
+    calls = [
+        ("get_all_tasks[all] page", lambda: manager.get_all_tasks(limit=25)),
+        ("get_all_tasks[pending] page", lambda: manager.get_all_tasks(status_filter="pending", limit=25)),
+        ("get_all_tasks[all] full", lambda: manager.get_all_tasks()),
+        ("count_tasks[pending]", lambda: manager.count_tasks(status_filter="pending")),
+        ("search_tasks['milk']", lambda: manager.search_tasks("milk")),
+        ("get_tasks_for_reminder", manager.get_tasks_for_reminder),
+        ("get_task_events", lambda: manager.get_task_events(first_id)),
+        ("add_task", lambda: manager.add_task(task)),
+    ]
+    results = {name: measure(fn, repeat, budget) for name, fn in calls}
+    manager.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user query latency as the number of users grows.")
+    parser.add_argument("--users", default="1,10,100,1000", help="Comma-separated user counts")
+    parser.add_argument("--tasks-per-user", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=2.0, help="Max seconds of timed work per call")
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="Fail if a call's min time at the most users exceeds this multiple of the fewest")
+    args = parser.parse_args()
+    agent_logger.configure(path="")
+
+    counts = [int(count) for count in args.users.split(",")]
+    by_count: Dict[int, Dict[str, Dict]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for users in counts:
+            path = os.path.join(tmp, f"tenants_{users}.db")
+            print(f"  generating {users:,} users x {args.tasks_per_user} tasks", flush=True)
+            generate_db(path, users, args.tasks_per_user)
+            by_count[users] = run_users(path, args.repeat, args.budget)
+
+    names: List[str] = list(by_count[counts[0]])
+    print(f"\nmedian ms per call for one user ({args.tasks_per_user} tasks), by number of users")
+    print(f"{'call':<30}" + "".join(f"{users:>10,}" for users in counts) + f"{'ratio':>8}")
+    regressions = []
+    for name in names:
+        ratio = by_count[counts[-1]][name]["min_ms"] / by_count[counts[0]][name]["min_ms"]
+        flag = ""
+        if name in NOT_FLAT:
+            flag = " (not checked)"
+        elif ratio > args.max_ratio:
+            regressions.append(name)
+            flag = " !!"
+        print(f"{name:<30}" + "".join(f"{by_count[users][name]['median_ms']:>10.3f}" for users in counts)
+              + f"{ratio:>7.2f}x{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} call(s) slow down with the number of users: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nPer-user latency is flat in the number of users.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/timestamp_bench.py
+# Timestamp handling on the two hot paths, before and after timestamps were
+# stored as epoch seconds: rendering the task list (the four timestamps each
+# row shows) and wording reminders for the tasks that are due. The "text"
+# columns repeat what ui/app.py and ReminderAgent did with the old
+# 'YYYY-MM-DD HH:MM:SS' columns (strptime per value, datetime arithmetic,
+# strftime); "epoch" is the current code. The same synthetic tasks feed both,
+# as text and as ints. "epoch, cold" clears the display cache before each run,
+# i.e. the first render of a page nobody has looked at yet. The full list has
+# more distinct instants than the cache holds, so it formats mostly cold.
+# SQL time isn't included; benchmarks.suite covers the calls end to end.
+#
+#   python -m benchmarks.timestamp_bench [--tasks 10000] [--page 100]
+import argparse
+import datetime
+import random
+from typing import Any, Dict, List
+
+from benchmarks.suite import _synthetic_tasks, measure
+from utils import timeutil
+
+DATE_FORMAT = timeutil.DATE_FORMAT
+FIELDS = ("due_date", "created_at", "reminder_sent_at")
+
+# --- the old text path ---
+def _text_display(dt_str):
+    if not dt_str:
+        return "N/A"
+    try:
+        return datetime.datetime.strptime(dt_str, DATE_FORMAT).strftime('%Y-%m-%d %I:%M %p')
+    except (ValueError, TypeError):
+        return "Invalid Date"
+
+def _text_reminder(task, now: datetime.datetime) -> str:
+    due_date = datetime.datetime.strptime(task['due_date'], DATE_FORMAT) if task['due_date'] else None
+    if due_date is None:
+        return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is pending and has no due date."
+    if due_date < now:
+        diff = now - due_date
+        return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is OVERDUE by {diff.days} days, {diff.seconds//3600} hours."
+    diff = due_date - now
+    if diff.days < 1:
+        return (f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is due in {diff.seconds//3600} hours, "
+                f"{(diff.seconds//60)%60} minutes (at {due_date.strftime('%H:%M')}).")
+    return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is due on {due_date.strftime('%Y-%m-%d at %H:%M')}."
+
+# --- the epoch path (as in ui/app.py and ReminderAgent.process) ---
+def _epoch_reminder(task, now: int) -> str:
+    due_date = task['due_date'] if isinstance(task['due_date'], int) else None
+    if due_date is None:
+        return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is pending and has no due date."
+    if due_date < now:
+        days, seconds = divmod(now - due_date, 86400)
+        return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is OVERDUE by {days} days, {seconds//3600} hours."
+    seconds = due_date - now
+    if seconds < 86400:
+        return (f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is due in {seconds//3600} hours, "
+                f"{(seconds//60)%60} minutes (at {timeutil.format_time(due_date, '%H:%M')}).")
+    return f"REMINDER: Task '{task['description']}' (ID: {task['id']}) is due on {timeutil.format_time(due_date, '%Y-%m-%d at %H:%M')}."
+
+def _render(tasks: List[Dict[str, Any]], display) -> List[str]:
+    return [f"{task['description']} | Due: {display(task['due_date'])} | Created: {display(task['created_at'])}"
+            f" | Reminder: {display(task['reminder_sent_at'])} | Next: {display(task['next_reminder_at'])}"
+            for task in tasks]
+
+def main():
+    parser = argparse.ArgumentParser(description="Timestamp parsing/formatting cost: text columns vs epoch seconds.")
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--page", type=int, default=100, help="Tasks per rendered list page")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=2.0, help="Max seconds of timed work per call")
+    args = parser.parse_args()
+
+    now_dt = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    now = timeutil.to_epoch(now_dt)
+    epoch_tasks = _synthetic_tasks(random.Random(42), args.tasks, now_dt)
+    for task in epoch_tasks:
+        task["next_reminder_at"] = task["due_date"] - 86400 if task["due_date"] and task["status"] != "completed" else None
+    text_tasks = [dict(task, **{field: timeutil.to_text(task[field]) for field in FIELDS + ("next_reminder_at",)})
+                  for task in epoch_tasks]
+    due = [i for i, task in enumerate(epoch_tasks)
+           if task["status"] != "completed" and task["due_date"] and task["due_date"] < now + 86400]
+    epoch_due, text_due = [epoch_tasks[i] for i in due], [text_tasks[i] for i in due]
+    assert [_text_reminder(t, now_dt) for t in text_due] == [_epoch_reminder(t, now) for t in epoch_due]
+    assert _render(text_tasks[:args.page], _text_display) == _render(epoch_tasks[:args.page], timeutil.format_display)
+
+    cases = [
+        (f"list page ({args.page} tasks)",
+         lambda: _render(text_tasks[:args.page], _text_display),
+         lambda: _render(epoch_tasks[:args.page], timeutil.format_display)),
+        (f"full list ({args.tasks:,} tasks)",
+         lambda: _render(text_tasks, _text_display),
+         lambda: _render(epoch_tasks, timeutil.format_display)),
+        (f"reminder check ({len(due):,} due)",
+         lambda: [_text_reminder(task, now_dt) for task in text_due],
+         lambda: [_epoch_reminder(task, now) for task in epoch_due]),
+        (f"to_epoch / strptime ({args.tasks:,})",
+         lambda: [datetime.datetime.strptime(task["due_date"], DATE_FORMAT) for task in text_tasks if task["due_date"]],
+         lambda: [timeutil.to_epoch(task["due_date"]) for task in epoch_tasks if task["due_date"]]),
+    ]
+    print(f"{'median ms':<34}{'text':>10}{'epoch':>10}{'epoch, cold':>13}{'speedup':>9}")
+    for name, text_fn, epoch_fn in cases:
+        text = measure(text_fn, args.repeat, args.budget)["median_ms"]
+        warm = measure(epoch_fn, args.repeat, args.budget)["median_ms"]
+        cold = measure(epoch_fn, args.repeat, args.budget, setup=timeutil.format_time.cache_clear)["median_ms"]
+        print(f"{name:<34}{text:>10.3f}{warm:>10.3f}{cold:>13.3f}{text / warm:>8.1f}x", flush=True)
+
+if __name__ == "__main__":
+    main()
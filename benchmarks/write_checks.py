@@ -0,0 +1,109 @@
+# benchmarks/write_checks.py
+# Pass/fail checks of DatabaseManager's write path (database/writer.py):
+#   - a write that fails inside a group commit is rolled back to its own
+#     savepoint (with the writes nested in it), and the rest of the batch
+#     still commits in the same transaction;
+#   - after-commit work (listeners) runs only for writes that committed:
+#     for writes joining transaction(), after its COMMIT and never after a
+#     ROLLBACK.
+# The batch is made deterministic by holding the writer thread on a first
+# write until the others are queued. Exits non-zero if any check fails.
+#
+#   python -m benchmarks.write_checks
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from typing import List
+
+from database.db_manager import DatabaseManager
+from utils.logger import agent_logger
+
+failures: List[str] = []
+
+def check(ok: bool, what: str):
+    print(f"    {'ok' if ok else '!!'} {what}")
+    if not ok:
+        failures.append(what)
+
+def _insert(key: str):
+    return lambda conn: conn.execute("INSERT INTO scratch (key) VALUES (?)", (key,)).lastrowid
+
+def _keys(manager: DatabaseManager) -> List[str]:
+    return [row[0] for row in manager._query("SELECT key FROM scratch ORDER BY key")]
+
+def check_savepoint_isolation(manager: DatabaseManager):
+    print("A failing write in a group commit rolls back alone")
+    notified = []
+    manager.add_listener(notified.append)
+    running, release = threading.Event(), threading.Event()
+    def hold(conn):  # holds the writer until the batch below is queued
+        running.set()
+        return release.wait(10)
+    blocker = manager.submit_write(hold)
+    running.wait(10)
+    transactions = manager.writer.stats["transactions"]
+
+    nested = []
+    def failing(conn):
+        conn.execute("INSERT INTO scratch (key) VALUES ('bad')")
+        nested.append(manager.submit_write(_insert("nested")))  # joins this write, so shares its fate
+        conn.execute("INSERT INTO scratch (key) VALUES ('a')")  # duplicate key: IntegrityError
+    first = manager.submit_write(_insert("a"), changed=lambda row_id: [row_id])
+    bad = manager.submit_write(failing, changed=lambda value: [-1])
+    last = manager.submit_write(_insert("b"), changed=lambda row_id: [row_id])
+    release.set()
+    blocker.result()
+    check(first.result(5) > 0 and last.result(5) > 0, "the writes around the failing one commit")
+    check(isinstance(bad.exception(5), sqlite3.IntegrityError), "the failing write's future carries its error")
+    check(len(nested) == 1 and isinstance(nested[0].exception(5), sqlite3.IntegrityError),
+          "a write nested in the failing one fails with it")
+    check(_keys(manager) == ["a", "b"], "only the committed writes' rows are in the table")
+    check(manager.writer.stats["transactions"] == transactions + 2,  # the blocker's and theirs
+          "the three writes shared one transaction")
+    check([-1] not in notified and sorted(notified) == sorted([[first.result()], [last.result()]]),
+          "listeners hear about the committed writes only")
+    manager.remove_listener(notified.append)
+
+def check_transaction_callbacks(manager: DatabaseManager):
+    print("Writes joining transaction() notify after its COMMIT, never after ROLLBACK")
+    notified = []
+    def listener(task_ids):
+        notified.append((task_ids, _keys(manager)))  # what a listener re-reading the table sees
+    manager.add_listener(listener)
+    with manager.transaction():
+        row_id = manager.submit_write(_insert("c"), changed=lambda row_id: [row_id]).result()
+        check(notified == [], "nothing is notified before COMMIT")
+    check(notified == [([row_id], ["a", "b", "c"])], "listeners run after COMMIT and see the row")
+    notified.clear()
+    try:
+        with manager.transaction():
+            manager.submit_write(_insert("d"), changed=lambda row_id: [row_id]).result()
+            raise RuntimeError("roll back")
+    except RuntimeError:
+        pass
+    check(notified == [] and "d" not in _keys(manager), "a rolled-back write is neither stored nor notified")
+    count = manager.count_tasks()
+    with manager.transaction() as conn:
+        conn.execute("INSERT INTO tasks (description, status, priority, created_at, user_id) "
+                     "VALUES ('raw', 'pending', 2, 0, 'default')")
+    check(manager.count_tasks() == count + 1, "cached reads see a raw transaction() write")
+    manager.remove_listener(listener)
+
+def main():
+    agent_logger.configure(path="")
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(os.path.join(tmp, "writes.db"), write_window=0)
+        with manager.transaction() as conn:
+            conn.execute("CREATE TABLE scratch (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE)")
+        check_savepoint_isolation(manager)
+        check_transaction_callbacks(manager)
+        manager.close()
+    if failures:
+        print(f"\n{len(failures)} write check(s) failed.")
+        sys.exit(1)
+    print("\nAll write checks passed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/write_stress.py
+# Many simulated UI sessions writing at once. Each session is a thread that
+# loops for --seconds over a small-write mix (add a task, edit one, complete
+# one) with a page read in between, as Streamlit sessions do, pausing --think
+# seconds on average between actions. Runs twice on fresh databases:
+#   queue   DatabaseManager writes through the single writer thread
+#           (grouped commits)
+#   direct  the same calls inside the session's own transaction(), each
+#           committed on its own connection (how writes ran before the queue)
+# and reports write throughput, write/read latency, "database is locked"
+# errors and, for the queue, writes per transaction.
+#
+#   python -m benchmarks.write_stress [--sessions 32] [--seconds 5] [--think 0.01] [--busy-timeout 1.0]
+import argparse
+import contextlib
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from database.db_manager import DatabaseManager
+from utils.logger import agent_logger
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))] if samples else 0.0
+
+def _session(manager: DatabaseManager, mode: str, user: str, think: float, stop: threading.Event,
+             results: Dict[str, Any], lock: threading.Lock):
+    rng = random.Random(user)
+    db = manager.for_user(user)
+    writes, reads, errors, own_ids = [], [], 0, []
+    while not stop.is_set():
+        task = {"description": f"stress task {rng.random():.6f}", "status": "pending", "due_date": None,
+                "priority": rng.randint(1, 3), "assigned_agent": "stress"}
+        action = rng.random()
+        started = time.perf_counter()
+        try:
+            # Inside transaction() the same calls run on the session's own
+            # connection and commit at the end of the block.
+            with db.transaction() if mode == "direct" else contextlib.nullcontext():
+                if action < 0.5 or not own_ids:
+                    own_ids.append(db.add_task(task))
+                elif action < 0.8:
+                    db.update_task(rng.choice(own_ids), {"priority": rng.randint(1, 3)})
+                else:
+                    db.update_task(rng.choice(own_ids), {"status": "completed"})
+            writes.append(time.perf_counter() - started)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            errors += 1
+        started = time.perf_counter()
+        db.get_all_tasks(limit=25)
+        reads.append(time.perf_counter() - started)
+        if think:
+            stop.wait(rng.expovariate(1 / think))
+    with lock:
+        results["writes"].extend(writes)
+        results["reads"].extend(reads)
+        results["errors"] += errors
+
+def run(mode: str, sessions: int, seconds: float, busy_timeout: float, window: float,
+        think: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DatabaseManager(os.path.join(tmp, f"{mode}.db"), cache_size=0, write_window=window)
+        manager.pool.timeout = busy_timeout  # applies to connections opened from here on
+        manager.close()
+        results: Dict[str, Any] = {"writes": [], "reads": [], "errors": 0}
+        lock, stop = threading.Lock(), threading.Event()
+        threads = [threading.Thread(target=_session, args=(manager, mode, f"user{i}", think, stop, results, lock))
+                   for i in range(sessions)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stats = dict(manager.writer.stats)
+        manager.close()
+    writes, reads = sorted(results["writes"]), sorted(results["reads"])
+    return {
+        "mode": mode,
+        "writes_per_s": len(writes) / elapsed,
+        "write_p50_ms": statistics.median(writes) * 1000 if writes else 0.0,
+        "write_p99_ms": _percentile(writes, 0.99) * 1000,
+        "read_p50_ms": statistics.median(reads) * 1000 if reads else 0.0,
+        "read_p99_ms": _percentile(reads, 0.99) * 1000,
+        "lock_errors": results["errors"],
+        "writes_per_commit": stats["writes"] / stats["transactions"] if stats["transactions"] else 1.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent sessions writing through the write queue vs directly.")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--busy-timeout", type=float, default=1.0,
+                        help="SQLite busy timeout per connection; direct writers waiting longer fail as locked")
+    parser.add_argument("--window", type=float, default=0.002, help="Group commit window (s) for the queue")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="Mean pause (s) between a session's actions; 0 writes flat out")
+    args = parser.parse_args()
+    agent_logger.configure(path="")
+
+    print(f"{args.sessions} sessions for {args.seconds:.0f}s each, busy timeout {args.busy_timeout}s")
+    print(f"{'mode':<8} {'writes/s':>9} {'write p50':>10} {'write p99':>10} {'read p50':>9} {'read p99':>9} "
+          f"{'locked':>7} {'writes/commit':>14}")
+    for mode in ("direct", "queue"):
+        result = run(mode, args.sessions, args.seconds, args.busy_timeout, args.window, args.think)
+        print(f"{result['mode']:<8} {result['writes_per_s']:>9.0f} {result['write_p50_ms']:>8.2f}ms "
+              f"{result['write_p99_ms']:>8.2f}ms {result['read_p50_ms']:>7.2f}ms {result['read_p99_ms']:>7.2f}ms "
+              f"{result['lock_errors']:>7} {result['writes_per_commit']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# database/archive.py
+# Background archiver: moves tasks completed more than ARCHIVE_AFTER_DAYS
+# days ago (default 30; 0 or "off" disables it) out of the working tasks
+# table into tasks_archive (see migrations.add_task_archive), so listings,
+# searches and the listing indexes stop carrying years of finished work.
+# Each batch is one DatabaseManager.archive_completed call: a short write on
+# the writer thread, with a pause before the next so other writes get in
+# between. Archived tasks stay readable (get_task, get_task_events,
+# get_all_tasks(include_archive=True)) and are restored by any update, such
+# as "Mark Pending".
+import os
+import threading
+import time
+from typing import Optional
+
+from .db_manager import ALL_USERS, DatabaseManager, get_db_manager
+from utils.logger import agent_logger
+
+ARCHIVE_ENV = "ARCHIVE_AFTER_DAYS"
+DEFAULT_ARCHIVE_DAYS = 30.0
+
+def archive_days_from_env() -> Optional[float]:
+    # None: archiving is off.
+    value = os.environ.get(ARCHIVE_ENV, "").strip().lower()
+    if not value:
+        return DEFAULT_ARCHIVE_DAYS
+    if value == "off":
+        return None
+    days = float(value)
+    return days if days > 0 else None
+
+class TaskArchiver:
+    # after_days: archive tasks completed at least this long ago (None: never).
+    # batch_size: tasks per write; pause: seconds between batches;
+    # interval: seconds between passes.
+    def __init__(self, db_manager: Optional[DatabaseManager] = None, after_days: Optional[float] = DEFAULT_ARCHIVE_DAYS,
+                 batch_size: int = 200, pause: float = 0.05, interval: float = 3600.0):
+        self.db_manager = (db_manager or get_db_manager()).for_user(ALL_USERS)
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.archived = 0  # tasks moved since start
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, db_manager: Optional[DatabaseManager] = None, **options) -> "TaskArchiver":
+        return cls(db_manager, after_days=archive_days_from_env(), **options)
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        # One pass: archives every task old enough, batch by batch; returns how many.
+        if self.after_days is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.after_days * 86400
+        moved = 0
+        while not self._stopped.is_set():
+            batch = self.db_manager.archive_completed(cutoff, batch_size=self.batch_size)
+            moved += len(batch)
+            if len(batch) < self.batch_size:
+                break
+            self._stopped.wait(self.pause)
+        self.archived += moved
+        if moved:
+            agent_logger.log("TaskArchiver", f"Archived {moved} task(s) completed over {self.after_days:g} days ago.")
+        return moved
+
+    # --- lifecycle ---
+    def start(self):
+        if self.running or self.after_days is None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="TaskArchiver", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:  # keep going; the next pass retries
+                agent_logger.log("TaskArchiver", f"Archiving failed: {e}", level="ERROR")
+            self._stopped.wait(self.interval)
+
+_archiver: Optional[TaskArchiver] = None
+_archiver_lock = threading.Lock()
+
+def get_task_archiver(start: bool = True) -> TaskArchiver:
+    # One archiver per process for the app's database, like get_reminder_service.
+    global _archiver
+    with _archiver_lock:
+        if _archiver is None:
+            _archiver = TaskArchiver.from_env()
+        if start and not _archiver.running:
+            _archiver.start()
+        return _archiver
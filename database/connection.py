@@ -0,0 +1,110 @@
+# database/connection.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Pragmas applied to every new connection. WAL lets readers run alongside a
+# writer, NORMAL sync is durable enough under WAL, and a bigger page cache plus
+# memory-mapped I/O keep hot pages out of the read() syscall path.
+DEFAULT_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # negative = KiB, so ~16 MB
+    "mmap_size": 268435456,  # 256 MB
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+class PooledConnection(sqlite3.Connection):
+    # Plain subclass so per-connection bookkeeping (e.g. the last
+    # PRAGMA data_version seen by DatabaseManager) can live on the object.
+    pass
+
+# Hands out one long-lived sqlite3 connection per thread. Connections of
+# finished threads are recycled for new ones rather than closed.
+class ConnectionPool:
+    def __init__(self, db_name: str, pragmas: dict = None, timeout: float = 5.0, max_idle: int = 8):
+        self.db_name = db_name
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread id -> (thread, connection), so close_all() can reach them
+        self._idle = []  # connections released by finished threads
+
+    def _open(self) -> sqlite3.Connection:
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves in transaction()
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout,
+                               isolation_level=None, check_same_thread=False,
+                               factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        if self.db_name != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                self._reclaim_dead_threads()
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._open()
+            elif conn.in_transaction:  # left open by a thread that died mid-transaction
+                conn.execute("ROLLBACK")
+            self._local.conn = conn
+            with self._lock:
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    def current(self) -> Optional[sqlite3.Connection]:
+        # The calling thread's connection, if it has one (without opening it).
+        return getattr(self._local, "conn", None)
+
+    def _reclaim_dead_threads(self):
+        # Streamlit runs every rerun on a fresh script thread; hand the connections
+        # of finished threads to the next ones instead of reconnecting each time.
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                del self._connections[ident]
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        if conn.in_transaction:  # nested use joins the outer transaction
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def close(self):
+        # Closes the calling thread's connection only.
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._lock:
+                self._connections.pop(threading.get_ident(), None)
+
+    def close_all(self):
+        with self._lock:
+            for _, conn in self._connections.values():
+                conn.close()
+            for conn in self._idle:
+                conn.close()
+            self._connections.clear()
+            self._idle.clear()
+        self._local = threading.local()
@@ -1,125 +1,985 @@
 # database/db_manager.py
+import contextlib
+import copy
 import sqlite3
-import datetime
-from typing import List, Dict, Any, Optional
+import functools
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterator, List, Dict, Any, Optional, Sequence, Tuple
+
+from .cache import QueryCache
+from .connection import ConnectionPool
+from .migrations import migrate, rebuild_task_stats
+from .models import CURSOR_COLUMNS, TASK_COLUMNS, TaskEvent, TaskRecord, projection, record_factory
+from .writer import WriteQueue
+from utils import timeutil
+from utils.metrics import metrics
+from utils.reminder_policy import ReminderPolicy
 
 DATABASE_NAME = 'tasks.db'
+BULK_INDEX_THRESHOLD = 64  # add_tasks batches at least this large index FTS in one statement
+REMINDER_FIELDS = {'status', 'due_date', 'reminder_sent_at'}  # inputs to next_reminder_at
+TIMESTAMP_FIELDS = ('created_at', 'due_date', 'reminder_sent_at', 'next_reminder_at', 'completed_at')  # epoch seconds
+DEFAULT_USER = 'default'  # owner of tasks created before multi-tenancy, and of single-user setups
+ALL_USERS = None  # for_user(ALL_USERS): unscoped view, for cross-tenant jobs like the reminder service
+ARCHIVED_STATUSES = (None, 'all', 'completed')  # status filters whose listings can include archived tasks
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+def _fts_query(text: str, prefix_last: bool = False) -> Optional[str]:
+    # Quote every word so user input can't inject FTS5 syntax; words are ANDed.
+    tokens = _SEARCH_TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = ['"' + token.replace('"', '""') + '"' for token in tokens]
+    if prefix_last:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+def _cache_key(value: Any) -> Any:
+    # Hashable stand-in for a query argument: lists and tuples become tuples,
+    # sets frozensets and dicts sorted item tuples (so columns=[...] caches).
+    if isinstance(value, (list, tuple)):
+        return tuple(_cache_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_cache_key(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _cache_key(item)) for key, item in value.items()))
+    return value
+
+def _detached(value: Any) -> Any:
+    # Copy of a cached result's lists and dicts, so a caller modifying what it
+    # got can't change what the next caller gets. TaskRecords are read-only
+    # and shared.
+    if isinstance(value, list):
+        return [_detached(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _detached(item) for key, item in value.items()}
+    return value
+
+def cached_query(method):
+    # Serves repeated reads (e.g. Streamlit reruns) from DatabaseManager.cache
+    # until a write bumps the data version. Each caller gets its own copy of
+    # the result (see _detached); calls with arguments that can't be made
+    # hashable skip the cache.
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (name, self.user_id, _cache_key(args), _cache_key(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        version = self._cache_version()
+        found, value = self.cache.get(key, version)
+        if not found:
+            value = method(self, *args, **kwargs)
+            if self.cache.maxsize <= 0:
+                return value  # nothing else holds it
+            self.cache.put(key, version, value)
+        return _detached(value)
+    return wrapper
+
+_INSERT_TASK = '''
+    INSERT INTO tasks (user_id, description, status, created_at, due_date, priority, assigned_agent, next_reminder_at)
+    VALUES (:user_id, :description, :status, :created_at, :due_date, :priority, :assigned_agent, :next_reminder_at)
+'''
+_INSERT_EVENT = "INSERT INTO task_events (task_id, agent, kind, timestamp, payload) VALUES (?, ?, ?, ?, ?)"
+
+def _event_params(task_id: int, event: TaskEvent) -> Tuple:
+    timestamp = timeutil.to_epoch(event.timestamp)
+    return (task_id, event.agent, event.kind, timestamp if timestamp is not None else timeutil.now(),
+            json.dumps(event.payload) if event.payload is not None else None)
+
+def _epochs(values: Dict[str, Any]) -> Dict[str, Any]:
+    # Copy of a task dict or update with its timestamps as epoch seconds
+    # (callers may pass text or datetimes, see timeutil.to_epoch).
+    converted = dict(values)
+    for field in TIMESTAMP_FIELDS:
+        if field in converted:
+            converted[field] = timeutil.to_epoch(converted[field])
+    return converted
 
 class DatabaseManager:
-    def __init__(self, db_name=DATABASE_NAME):
+    # Every task belongs to a user (tasks.user_id, the leading column of each
+    # listing index). A manager only sees and changes its user's tasks; get
+    # one per user with for_user(), which shares this manager's connections,
+    # cache, listeners and writer.
+    # Writes are queued to a single writer thread (database/writer.py) that
+    # commits them in groups, waiting at most `write_window` seconds for more
+    # writes to join a transaction; reads run on the calling thread.
+    def __init__(self, db_name=DATABASE_NAME, cache_size: int = 256,
+                 reminder_policy: Optional[ReminderPolicy] = None, user_id: Optional[str] = DEFAULT_USER,
+                 write_window: float = 0.002):
         self.db_name = db_name
-        self._create_table()
+        self.user_id = user_id
+        self.pool = ConnectionPool(db_name)
+        self.writer = WriteQueue(self.pool.connection, window=write_window)
+        self.fts_enabled = False
+        self._listeners: List[Callable[[List[int]], None]] = []
+        self.cache = QueryCache(cache_size)
+        self._version_lock = threading.Lock()
+        # [own writes, commits by other connections/processes]; a list so that
+        # for_user() views share it.
+        self._versions = [0, 0]
+        # Schema changes live in migrations.py; a current database is one PRAGMA read.
+        conn = self._get_connection()
+        self.applied_migrations = migrate(conn)
+        self.fts_enabled = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone() is not None
+        self.reminder_policy = reminder_policy or ReminderPolicy.from_env()
+        stored = conn.execute("SELECT value FROM settings WHERE key = 'reminder_policy'").fetchone()
+        if stored is None or stored[0] != self.reminder_policy.key():
+            self.reschedule_reminders()  # first open since the column was added, or the policy changed
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_name)
+    def for_user(self, user_id: Optional[str]) -> "DatabaseManager":
+        # Cheap view of the same database scoped to `user_id` (ALL_USERS: unscoped).
+        if user_id == self.user_id:
+            return self
+        view = copy.copy(self)
+        view.user_id = user_id
+        return view
 
-    def _create_table(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                description TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                due_date TIMESTAMP,
-                priority INTEGER DEFAULT 2, -- 1:High, 2:Medium, 3:Low
-                assigned_agent TEXT,
-                agent_notes TEXT,
-                reminder_sent_at TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def add_task(self, task_data: Dict[str, Any]) -> int:
+    def _owner(self, alias: str = "") -> Tuple[str, Tuple]:
+        # SQL condition (with leading AND) and parameters restricting rows to this user.
+        if self.user_id is ALL_USERS:
+            return "", ()
+        return f" AND {alias}user_id = ?", (self.user_id,)
+
+    def _fts_match(self, match: str) -> str:
+        # Narrows a description MATCH to this user's rows within the FTS index
+        # (callers still filter on t.user_id: tokenizing can merge user ids).
+        owner = _fts_query(self.user_id) if self.user_id is not ALL_USERS else None
+        if owner is None:
+            return f"description : ({match})"
+        return f"user_id : ({owner}) AND description : ({match})"
+
+    def _owned(self, conn: sqlite3.Connection, task_ids: Sequence[int], table: str = "tasks") -> List[int]:
+        # The subset of task_ids that exist in `table` (tasks, or tasks_archive)
+        # and that this manager may touch, in the given order; ALL_USERS
+        # skips the owner check, not the existence check.
+        if not task_ids:
+            return []
+        owner, owner_params = self._owner()
+        owned = set()
+        for start in range(0, len(task_ids), 500):
+            chunk = list(task_ids[start:start + 500])
+            placeholders = ", ".join("?" for _ in chunk)
+            owned.update(row[0] for row in conn.execute(
+                f"SELECT id FROM {table} WHERE id IN ({placeholders}){owner}", chunk + list(owner_params)))
+        return [task_id for task_id in task_ids if task_id in owned]
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Long-lived, per-thread connection; callers must not close it.
+        return self.pool.connection()
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        # Usage: with db_manager.transaction() as conn: ...
+        # Runs on the calling thread, outside the write queue (and its group
+        # commits). PRAGMA data_version ignores a connection's own commits, so
+        # committing bumps the write counter to invalidate cached reads. Writes
+        # submitted inside it queue their after-commit work (listeners) on
+        # conn.after_commit: it runs after COMMIT and is dropped on ROLLBACK.
+        conn = self.pool.connection()
+        if conn.in_transaction:  # nested use joins the outer block, which commits
+            yield conn
+            return
+        conn.after_commit = []
+        try:
+            with self.pool.transaction() as conn:
+                yield conn
+        finally:
+            pending, conn.after_commit = conn.after_commit, None
+        with self._version_lock:
+            self._versions[0] += 1
+        callback_error = None
+        for after_commit, value in pending:
+            try:
+                after_commit(value)
+            except Exception as e:  # committed either way; tell the other listeners too
+                callback_error = callback_error or e
+        if callback_error is not None:
+            raise callback_error
+
+    def submit_write(self, work: Callable[[sqlite3.Connection], Any],
+                     changed: Optional[Callable[[Any], List[int]]] = None) -> Future:
+        # Queues work(conn) for the writer thread. The future resolves to its
+        # return value once committed; listeners are told about the task ids
+        # changed(value) first. Without `changed`, cached reads are just invalidated.
+        # Inside transaction() the work runs there and then and the future
+        # resolves at once, but listeners wait for the outer COMMIT.
+        def after_commit(value):
+            if changed is None:
+                with self._version_lock:
+                    self._versions[0] += 1
+            else:
+                self._notify(changed(value))
+        conn = self.pool.current()
+        pending = getattr(conn, "after_commit", None)
+        if pending is not None:  # inside transaction(): join it, as nested use always did
+            future: Future = Future()
+            try:
+                value = work(conn)
+            except BaseException as e:
+                future.set_exception(e)
+                return future
+            pending.append((after_commit, value))
+            future.set_result(value)
+            return future
+        return self.writer.submit(work, after_commit)
+
+    def close(self):
+        self.writer.close()
+        self.pool.close_all()
+
+    def _query(self, sql: str, params=(), row_factory=None) -> List[Any]:
+        # Every read goes through here: it runs the statement to completion and
+        # records the duration and row count under the statement's shape.
+        started = time.perf_counter()
+        cursor = self._get_connection().cursor()
+        if row_factory is not None:
+            cursor.row_factory = row_factory
+        rows = cursor.execute(sql, params).fetchall()
+        metrics.observe_query(sql, time.perf_counter() - started, len(rows))
+        return rows
+
+    def _execute(self, conn: sqlite3.Connection, sql: str, params=(), many: bool = False) -> sqlite3.Cursor:
+        # Timed write on a transaction's connection.
+        started = time.perf_counter()
+        cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+        metrics.observe_query(sql, time.perf_counter() - started, cursor.rowcount)
+        return cursor
+
+    def add_listener(self, callback: Callable[[List[int]], None]):
+        # callback(task_ids) runs after every committed write that touches tasks
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[List[int]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _cache_version(self) -> Tuple[int, int]:
+        # PRAGMA data_version changes on a connection whenever *another*
+        # connection commits, which catches writes from other processes that
+        # never went through _notify.
         conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO tasks (description, status, due_date, priority, assigned_agent, agent_notes)
-            VALUES (:description, :status, :due_date, :priority, :assigned_agent, :agent_notes)
-        ''', task_data)
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return task_id
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(conn, "seen_data_version", None) != data_version:
+            conn.seen_data_version = data_version
+            with self._version_lock:
+                self._versions[1] += 1
+        return tuple(self._versions)
+
+    def _notify(self, task_ids: List[int]):
+        with self._version_lock:
+            self._versions[0] += 1
+        for callback in list(self._listeners):
+            callback(list(task_ids))
 
+    def _insert_user(self) -> str:
+        return self.user_id if self.user_id is not ALL_USERS else DEFAULT_USER
+
+    def _new_row(self, task: Dict[str, Any], user_id: str, now: int) -> Dict[str, Any]:
+        # _INSERT_TASK parameters for a task dict.
+        row = _epochs(task)
+        if row.get('created_at') is None:
+            row['created_at'] = now
+        row.update(user_id=user_id, next_reminder_at=self.reminder_policy.for_task(row))
+        return row
+
+    def add_task(self, task_data: Dict[str, Any], events: Sequence[TaskEvent] = ()) -> int:
+        return self.add_task_async(task_data, events).result()
+
+    def add_task_async(self, task_data: Dict[str, Any], events: Sequence[TaskEvent] = ()) -> "Future[int]":
+        # add_task without waiting for the commit; the future resolves to the new id.
+        task_data = self._new_row(task_data, self._insert_user(), timeutil.now())
+
+        def work(conn):
+            cursor = self._execute(conn, _INSERT_TASK, task_data)
+            task_id = cursor.lastrowid
+            self._insert_events(conn, [(task_id, event) for event in events])
+            return task_id
+        return self.submit_write(work, changed=lambda task_id: [task_id])
+
+    def add_tasks(self, tasks: List[Dict[str, Any]],
+                  events: Optional[Sequence[Sequence[TaskEvent]]] = None) -> List[int]:
+        return self.add_tasks_async(tasks, events).result()
+
+    def add_tasks_async(self, tasks: List[Dict[str, Any]],
+                        events: Optional[Sequence[Sequence[TaskEvent]]] = None) -> "Future[List[int]]":
+        # `events`, if given, runs parallel to `tasks`: the history to store with each one.
+        if not tasks:
+            future: Future = Future()
+            future.set_result([])
+            return future
+        bulk_index = self.fts_enabled and len(tasks) >= BULK_INDEX_THRESHOLD
+        user_id, now = self._insert_user(), timeutil.now()
+        rows = [self._new_row(task, user_id, now) for task in tasks]
+
+        def work(conn):
+            if bulk_index:  # per-row trigger inserts dominate large batches
+                conn.execute("UPDATE tasks_fts_sync SET enabled = 0")
+            self._execute(conn, _INSERT_TASK, rows, many=True)
+            # AUTOINCREMENT ids are handed out sequentially and we hold the write
+            # lock for the whole batch, so the new ids are contiguous.
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(tasks) + 1
+            if bulk_index:
+                self._execute(conn, '''
+                    INSERT INTO tasks_fts (rowid, description, user_id)
+                    SELECT id, description, user_id FROM tasks WHERE id BETWEEN ? AND ?
+                ''', (first_id, last_id))
+                conn.execute("UPDATE tasks_fts_sync SET enabled = 1")
+            task_ids = list(range(first_id, last_id + 1))
+            if events:
+                self._insert_events(conn, [(task_id, event) for task_id, task_events in zip(task_ids, events)
+                                           for event in task_events])
+            return task_ids
+        return self.submit_write(work, changed=lambda task_ids: task_ids)
+
+    def _reschedule(self, conn: sqlite3.Connection, task_ids: Sequence[int]):
+        # Recomputes next_reminder_at for tasks whose status, due date or last
+        # reminder just changed (inside the caller's transaction).
+        for start in range(0, len(task_ids), 500):
+            chunk = list(task_ids[start:start + 500])
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT id, status, due_date, reminder_sent_at FROM tasks WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            schedule = self.reminder_policy.schedule
+            self._execute(conn, "UPDATE tasks SET next_reminder_at = ? WHERE id = ?",
+                          [(schedule(row['status'], row['due_date'], row['reminder_sent_at']), row['id'])
+                           for row in rows], many=True)
+
+    def reschedule_reminders(self) -> int:
+        # Recomputes next_reminder_at for every open task with the current
+        # policy; returns how many are scheduled. Runs on open when the stored
+        # policy differs. Call it after writing tasks with raw SQL, and
+        # check_now() any running ReminderService afterwards.
+        policy = self.reminder_policy
+
+        def work(conn):
+            scheduled = 0
+            self._execute(conn, """
+                UPDATE tasks SET next_reminder_at = NULL
+                WHERE next_reminder_at IS NOT NULL AND (status = 'completed' OR due_date IS NULL)
+            """)
+            last_id = 0
+            while True:  # keyset pages by id, so updated rows never feed back into the read
+                rows = conn.execute("""
+                    SELECT id, status, due_date, reminder_sent_at FROM tasks
+                    WHERE id > ? AND status != 'completed' AND due_date IS NOT NULL
+                    ORDER BY id LIMIT 5000
+                """, (last_id,)).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]['id']
+                schedule = [(policy.schedule(row['status'], row['due_date'], row['reminder_sent_at']), row['id'])
+                            for row in rows]
+                scheduled += sum(1 for when, _ in schedule if when is not None)
+                conn.executemany("UPDATE tasks SET next_reminder_at = ? WHERE id = ?", schedule)
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('reminder_policy', ?)",
+                         (policy.key(),))
+            return scheduled
+        return self.submit_write(work).result()
+
+    def _insert_events(self, conn: sqlite3.Connection, events: List[Tuple[int, TaskEvent]]):
+        if events:
+            self._execute(conn, _INSERT_EVENT, [_event_params(task_id, event) for task_id, event in events],
+                          many=True)
+
+    def add_events(self, task_ids: Sequence[int], *events: TaskEvent):
+        # Appends the same events to each task's history; rows in tasks are untouched.
+        if not task_ids or not events:
+            return
+
+        def work(conn):
+            owned = self._owned(conn, task_ids)
+            self._insert_events(conn, [(task_id, event) for task_id in owned for event in events])
+            return owned
+        self.submit_write(work, changed=lambda owned: owned).result()
+
+    @cached_query
+    def get_task_events(self, task_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Newest first; payloads are decoded from JSON. An archived task's
+        # events are read from the archive.
+        owner, owner_params = self._owner()
+        table = "task_events"
+        if not self._query(f"SELECT 1 FROM tasks WHERE id = ?{owner}", (task_id,) + owner_params):
+            if not self._query(f"SELECT 1 FROM tasks_archive WHERE id = ?{owner}", (task_id,) + owner_params):
+                return []
+            table = "task_events_archive"
+        query = f"SELECT id, task_id, agent, kind, timestamp, payload FROM {table} WHERE task_id = ? ORDER BY id DESC"
+        params = [task_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        events = []
+        for row in self._query(query, params):
+            event = dict(row)
+            event["payload"] = json.loads(event["payload"]) if event["payload"] else None
+            events.append(event)
+        return events
+
+    @cached_query
     def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        task = cursor.fetchone()
-        conn.close()
-        return dict(task) if task else None
-
-    def get_all_tasks(self, status_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        query = "SELECT * FROM tasks"
+        # Falls back to the archive, so an archived task can still be opened
+        # (updating it restores it, see update_task).
+        owner, owner_params = self._owner()
+        rows = self._query(f"SELECT * FROM tasks WHERE id = ?{owner}", (task_id,) + owner_params)
+        if not rows:
+            rows = self._query(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks_archive WHERE id = ?{owner}",
+                               (task_id,) + owner_params)
+        return dict(rows[0]) if rows else None
+
+    def get_tasks_by_ids(self, task_ids: List[int]) -> List[Dict[str, Any]]:
+        if not task_ids:
+            return []
+        placeholders = ", ".join("?" for _ in task_ids)
+        owner, owner_params = self._owner()
+        rows = self._query(f"SELECT * FROM tasks WHERE id IN ({placeholders}){owner}",
+                           list(task_ids) + list(owner_params))
+        return [dict(row) for row in rows]
+
+    def get_reminder_schedule(self) -> List[Dict[str, Any]]:
+        # (id, next_reminder_at) of every task with a reminder coming up, for
+        # the reminder service; a scan of idx_tasks_next_reminder.
+        owner, owner_params = self._owner()
+        rows = self._query(f"""
+            SELECT id, next_reminder_at FROM tasks
+            WHERE next_reminder_at IS NOT NULL{owner}
+            ORDER BY next_reminder_at ASC
+        """, owner_params)
+        return [dict(row) for row in rows]
+
+    @cached_query
+    def get_all_tasks(self, status_filter: Optional[str] = None, limit: Optional[int] = None,
+                      after: Optional[Tuple] = None, columns: Optional[Sequence[str]] = None,
+                      include_archive: bool = False) -> List[TaskRecord]:
+        # Keyset pagination: pass `after=page_cursor(last_task_of_previous_page)`
+        # to continue from there. Each page is an index range scan, so its cost
+        # doesn't grow with how deep into the list it is.
+        # `columns` (a tuple, e.g. models.LIST_COLUMNS) limits what is read;
+        # the cursor columns are always included.
+        # include_archive: history view, with archived tasks merged in list order.
+        columns = projection(columns, required=CURSOR_COLUMNS)
+        query, params = self._list_query(columns, status_filter, after, include_archive)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return self._query(query, params, row_factory=record_factory(columns))
+
+    def iter_tasks(self, status_filter: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                   batch_size: int = 1000) -> Iterator[TaskRecord]:
+        # Every task in list order, read `batch_size` rows at a time from one
+        # cursor, so memory stays flat however many there are (for exports).
+        # Not cached; the rows come from one consistent snapshot.
+        columns = projection(columns)
+        query, params = self._list_query(columns, status_filter)
+        started = time.perf_counter()
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = record_factory(columns)
+        rows = 0
+        try:
+            cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows += len(batch)
+                yield from batch
+        finally:
+            cursor.close()
+            metrics.observe_query(query, time.perf_counter() - started, rows)
+
+    def _list_query(self, columns: Sequence[str], status_filter: Optional[str] = None,
+                    after: Optional[Tuple] = None, include_archive: bool = False) -> Tuple[str, List[Any]]:
+        query, params = self._list_select("tasks", columns, status_filter, after)
+        if include_archive and status_filter in ARCHIVED_STATUSES:
+            # Both sides come out of their indexes in list order and are merged
+            # (no sort); archived tasks are all completed, so no status check.
+            archived, archived_params = self._list_select("tasks_archive", columns, None, after)
+            query += " UNION ALL " + archived
+            params += archived_params
+        query += " ORDER BY due_date ASC, priority ASC, created_at ASC, id ASC"
+        return query, params
+
+    def _list_select(self, table: str, columns: Sequence[str], status_filter: Optional[str],
+                     after: Optional[Tuple]) -> Tuple[str, List[Any]]:
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+        conditions = []
         params = []
+        if self.user_id is not ALL_USERS:  # leading column of both listing indexes
+            conditions.append("user_id = ?")
+            params.append(self.user_id)
         if status_filter and status_filter != "all":
-            query += " WHERE status = ?"
+            conditions.append("status = ?")
             params.append(status_filter)
-        query += " ORDER BY due_date ASC, priority ASC, created_at ASC"
-        
-        cursor.execute(query, params)
-        tasks = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return tasks
-
-    def update_task(self, task_id: int, updates: Dict[str, Any]):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
+        if after is not None:
+            due_date, priority, created_at, task_id = after
+            if due_date is None: # NULL due dates sort first, so every dated task follows
+                conditions.append("(due_date IS NOT NULL OR (priority, created_at, id) > (?, ?, ?))")
+                params.extend([priority, created_at, task_id])
+            else:
+                conditions.append("due_date >= ? AND (due_date > ? OR (priority, created_at, id) > (?, ?, ?))")
+                params.extend([due_date, due_date, priority, created_at, task_id])
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return query, params
+
+    @staticmethod
+    def page_cursor(task) -> Tuple:
+        return (task['due_date'], task['priority'], task['created_at'], task['id'])
+
+    @cached_query
+    def count_tasks(self, status_filter: Optional[str] = None, include_archive: bool = False) -> int:
+        # Summed from the trigger-maintained task_stats counters (at most one
+        # row per status and priority) instead of counting index entries.
+        # Archived tasks (include_archive) are counted off their index.
+        owner, owner_params = self._owner()
+        archived = 0
+        if include_archive and status_filter in ARCHIVED_STATUSES:
+            archived = self._query(f"SELECT COUNT(*) FROM tasks_archive WHERE 1{owner}", owner_params)[0][0]
+        if status_filter and status_filter != "all":
+            return archived + self._query(f"SELECT IFNULL(SUM(n), 0) FROM task_stats WHERE status = ?{owner}",
+                                          (status_filter,) + owner_params)[0][0]
+        return archived + self._query(f"SELECT IFNULL(SUM(n), 0) FROM task_stats WHERE 1{owner}",
+                                      owner_params)[0][0]
+
+    def get_stats(self, now: Optional[timeutil.Timestamp] = None) -> Dict[str, Any]:
+        # Dashboard counts from the task_stats tables (see migrations.add_task_stats):
+        # tasks by status, open tasks by priority, and open tasks overdue (due
+        # before today) and due today, in local calendar days. A few rows are
+        # read however many tasks there are.
+        return self._stats(timeutil.local_day(timeutil.now() if now is None else timeutil.to_epoch(now)))
+
+    @cached_query
+    def _stats(self, today: int) -> Dict[str, Any]:
+        owner, owner_params = self._owner()
+        if self._query(f"SELECT 1 FROM task_overdue WHERE as_of != ?{owner} LIMIT 1", (today,) + owner_params):
+            self.submit_write(lambda conn: self._roll_overdue(conn, today)).result()
+        by_status: Dict[str, int] = {}
+        by_priority: Dict[int, int] = {}
+        for status, priority, n in self._query(f"SELECT status, priority, n FROM task_stats WHERE n != 0{owner}",
+                                               owner_params):
+            by_status[status] = by_status.get(status, 0) + n
+            if status != 'completed':
+                by_priority[priority] = by_priority.get(priority, 0) + n
+        overdue = self._query(f"SELECT IFNULL(SUM(n), 0) FROM task_overdue WHERE 1{owner}", owner_params)[0][0]
+        due_today = self._query(f"SELECT IFNULL(SUM(n), 0) FROM task_due_days WHERE day = ?{owner}",
+                                (today,) + owner_params)[0][0]
+        return {"total": sum(by_status.values()), "by_status": by_status, "by_priority": by_priority,
+                "overdue": overdue, "due_today": due_today}
+
+    def _roll_overdue(self, conn: sqlite3.Connection, today: int):
+        # Moves each task_overdue counter's as_of to `today`, adding (or, if
+        # the clock went back, subtracting) the due-day buckets in between.
+        owner, owner_params = self._owner()
+        self._execute(conn, f'''
+            UPDATE task_overdue SET n = n + CASE
+                WHEN as_of < ? THEN (SELECT IFNULL(SUM(d.n), 0) FROM task_due_days AS d
+                                     WHERE d.user_id = task_overdue.user_id AND d.day >= task_overdue.as_of AND d.day < ?)
+                ELSE -(SELECT IFNULL(SUM(d.n), 0) FROM task_due_days AS d
+                       WHERE d.user_id = task_overdue.user_id AND d.day >= ? AND d.day < task_overdue.as_of)
+            END, as_of = ?
+            WHERE as_of != ?{owner}
+        ''', (today,) * 5 + owner_params)
+
+    def check_stats(self) -> List[str]:
+        # Consistency check over the whole database: recounts the task_stats
+        # tables from tasks and returns a line per counter that was wrong.
+        today = timeutil.local_day(timeutil.now())
+        tables = ("task_stats", "task_due_days", "task_overdue")
+
+        def counters(conn):
+            return {(table,) + row[:-1]: row[-1] for table in tables for row in conn.execute(f"SELECT * FROM {table}")}
+
+        def work(conn):
+            self.for_user(ALL_USERS)._roll_overdue(conn, today)
+            stored = counters(conn)
+            rebuild_task_stats(conn)
+            counted = counters(conn)
+            return [f"{key}: {stored.get(key, 0)} stored, {counted.get(key, 0)} counted"
+                    for key in sorted(stored.keys() | counted.keys(), key=repr)
+                    if stored.get(key, 0) != counted.get(key, 0)]
+        return self.submit_write(work).result()
+
+    @cached_query
+    def search_tasks(self, text: str, status_filter: Optional[str] = None, limit: int = 50,
+                     columns: Optional[Sequence[str]] = None) -> List[TaskRecord]:
+        # Ranked full-text search; the last word is treated as a prefix so the
+        # UI search box matches while typing.
+        columns = projection(columns)
+        select = ", ".join(f"t.{column}" for column in columns)
+        factory = record_factory(columns)
+        status_clause, owner_params = self._owner("t.")
+        params = list(owner_params)
+        if status_filter and status_filter != "all":
+            status_clause += " AND t.status = ?"
+            params.append(status_filter)
+        if not self.fts_enabled:
+            return self._query(f"""
+                SELECT {select} FROM tasks t WHERE t.description LIKE ?{status_clause}
+                ORDER BY t.due_date ASC, t.priority ASC, t.created_at ASC LIMIT ?
+            """, [f"%{text.strip()}%"] + params + [limit], row_factory=factory)
+
+        match = _fts_query(text, prefix_last=True)
+        if match is None:
+            return []
+        return self._query(f"""
+            SELECT {select} FROM tasks_fts f JOIN tasks t ON t.id = f.rowid
+            WHERE tasks_fts MATCH ?{status_clause}
+            ORDER BY f.rank LIMIT ?
+        """, [self._fts_match(match)] + params + [limit], row_factory=factory)
+
+    def find_similar_tasks(self, description: str, limit: int = 5) -> List[Dict[str, Any]]:
+        # Open tasks whose description contains every word of `description`,
+        # best matches first.
+        owner, owner_params = self._owner("t.")
+        if not self.fts_enabled:
+            rows = self._query(f"""
+                SELECT * FROM tasks t WHERE t.status != 'completed' AND t.description LIKE ?{owner} LIMIT ?
+            """, (f"%{description.strip()}%",) + owner_params + (limit,))
+            return [dict(row) for row in rows]
+
+        match = _fts_query(description)
+        if match is None:
+            return []
+        rows = self._query(f"""
+            SELECT t.* FROM tasks_fts f JOIN tasks t ON t.id = f.rowid
+            WHERE tasks_fts MATCH ? AND t.status != 'completed'{owner}
+            ORDER BY f.rank LIMIT ?
+        """, (self._fts_match(match),) + owner_params + (limit,))
+        return [dict(row) for row in rows]
+
+    def update_task(self, task_id: int, updates: Dict[str, Any], events: Sequence[TaskEvent] = ()):
+        updates = _epochs(updates)
         set_clauses = []
         values = []
         for key, value in updates.items():
             set_clauses.append(f"{key} = ?")
             values.append(value)
-        
+
         if not set_clauses:
             return # No updates to make
 
-        query = f"UPDATE tasks SET {', '.join(set_clauses)} WHERE id = ?"
+        owner, owner_params = self._owner()
+        query = f"UPDATE tasks SET {', '.join(set_clauses)} WHERE id = ?{owner}"
         values.append(task_id)
-        
-        cursor.execute(query, tuple(values))
-        conn.commit()
-        conn.close()
+        values.extend(owner_params)
+
+        def work(conn):
+            self._restore(conn, [task_id])
+            if not self._execute(conn, query, tuple(values)).rowcount:
+                return False  # no such task for this user
+            if REMINDER_FIELDS.intersection(updates):
+                self._reschedule(conn, [task_id])
+            self._insert_events(conn, [(task_id, event) for event in events])
+            return True
+        self.submit_write(work, changed=lambda updated: [task_id] if updated else []).result()
+
+    def update_tasks(self, task_ids: List[int], updates: Dict[str, Any], events: Sequence[TaskEvent] = ()) -> List[int]:
+        # Applies the same updates (and appends the same events) to every task in one transaction.
+        # Returns the ids updated: those of task_ids that belong to this user.
+        if not task_ids or not updates:
+            return []
+        updates = _epochs(updates)
+        set_clauses = ", ".join(f"{key} = ?" for key in updates)
+        values = tuple(updates.values())
+        def work(conn):
+            self._restore(conn, task_ids)
+            owned = self._owned(conn, task_ids)
+            self._execute(conn, f"UPDATE tasks SET {set_clauses} WHERE id = ?",
+                          [values + (task_id,) for task_id in owned], many=True)
+            if REMINDER_FIELDS.intersection(updates):
+                self._reschedule(conn, owned)
+            self._insert_events(conn, [(task_id, event) for task_id in owned for event in events])
+            return owned
+        return self.submit_write(work, changed=lambda owned: owned).result()
+
+    def mark_reminded(self, task_ids: List[int], reminded_at: timeutil.Timestamp,
+                      messages: Optional[Dict[int, str]] = None):
+        # Sets reminder_sent_at, schedules the next reminder and records a
+        # reminder_sent event per task.
+        if not task_ids:
+            return
+        reminded_at = timeutil.to_epoch(reminded_at)
+        def work(conn):
+            owned = self._owned(conn, task_ids)
+            self._set_reminded(conn, owned, reminded_at,
+                               {task_id: {"message": message} for task_id, message in (messages or {}).items()})
+            return owned
+        self.submit_write(work, changed=lambda owned: owned).result()
+
+    def _set_reminded(self, conn: sqlite3.Connection, task_ids: Sequence[int], reminded_at: int,
+                      payloads: Dict[int, Dict[str, Any]]):
+        self._execute(conn, "UPDATE tasks SET reminder_sent_at = ? WHERE id = ?",
+                      [(reminded_at, task_id) for task_id in task_ids], many=True)
+        self._reschedule(conn, task_ids)
+        self._insert_events(conn, [(task_id, TaskEvent("ReminderAgent", "reminder_sent", payloads.get(task_id),
+                                                       reminded_at))
+                                   for task_id in task_ids])
+
+    # --- reminder delivery outbox (agents/delivery.py; see migrations.add_reminder_outbox) ---
+    def queue_reminders(self, task_ids: List[int], queued_at: timeutil.Timestamp, messages: Dict[int, str],
+                        sinks: Sequence[str]) -> List[int]:
+        # Queues each task's reminder for every sink and takes the task off
+        # the reminder schedule, so it isn't reminded again while delivery is
+        # under way; reminder_sent_at is set once a sink acknowledges it
+        # (ack_deliveries). Returns the ids queued.
+        queued_at = timeutil.to_epoch(queued_at)
+        def work(conn):
+            owned = [task_id for task_id in self._owned(conn, task_ids) if task_id in messages]
+            self._execute(conn, '''
+                INSERT INTO reminder_outbox (task_id, user_id, sink, message, queued_at, next_attempt_at)
+                SELECT id, user_id, ?, ?, ?, ? FROM tasks WHERE id = ?
+            ''', [(sink, messages[task_id], queued_at, queued_at, task_id) for task_id in owned for sink in sinks],
+                          many=True)
+            self._execute(conn, "UPDATE tasks SET next_reminder_at = NULL WHERE id = ?",
+                          [(task_id,) for task_id in owned], many=True)
+            return owned
+        return self.submit_write(work, changed=lambda owned: owned).result()
+
+    def claim_deliveries(self, sink: str, now: float, limit: int, lease: float) -> List[Dict[str, Any]]:
+        # Up to `limit` of `sink`'s due outbox rows, oldest first, claimed for
+        # `lease` seconds: other dispatchers (and this one) skip them until
+        # they are acknowledged, failed, or the claim lapses after a crash.
+        def work(conn):
+            return [dict(row) for row in self._execute(conn, '''
+                UPDATE reminder_outbox SET next_attempt_at = ?
+                WHERE id IN (SELECT id FROM reminder_outbox
+                             WHERE status = 'pending' AND sink = ? AND next_attempt_at <= ?
+                             ORDER BY next_attempt_at, id LIMIT ?)
+                RETURNING id, task_id, user_id, sink, message, queued_at, attempts
+            ''', (now + lease, sink, now, limit)).fetchall()]
+        return sorted(self.submit_write(work).result(), key=lambda row: row["id"])
+
+    def next_delivery_at(self, sinks: Sequence[str]) -> Optional[float]:
+        # When the earliest pending row of any of `sinks` is due (or its claim lapses).
+        if not sinks:
+            return None
+        placeholders = ", ".join("?" for _ in sinks)
+        return self._query(f"""
+            SELECT MIN(next_attempt_at) FROM reminder_outbox WHERE status = 'pending' AND sink IN ({placeholders})
+        """, tuple(sinks))[0][0]
+
+    def ack_deliveries(self, outbox_ids: Sequence[int], delivered_at: timeutil.Timestamp):
+        delivered_at = timeutil.to_epoch(delivered_at)
+        def work(conn):
+            keys = self._outbox_keys(conn, outbox_ids)
+            self._execute(conn, "UPDATE reminder_outbox SET status = 'sent', delivered_at = ? WHERE id = ?",
+                          [(delivered_at, outbox_id) for outbox_id in outbox_ids], many=True)
+            return self._finish_reminders(conn, keys)
+        self.submit_write(work, changed=lambda task_ids: task_ids).result()
+
+    def fail_deliveries(self, retries: Sequence[Tuple[int, Optional[float]]], error: str):
+        # retries: (outbox id, when to try again, or None to give up on it).
+        def work(conn):
+            keys = self._outbox_keys(conn, [outbox_id for outbox_id, _ in retries])
+            self._execute(conn, '''
+                UPDATE reminder_outbox SET attempts = attempts + 1, last_error = ?,
+                    status = CASE WHEN ? IS NULL THEN 'failed' ELSE status END,
+                    next_attempt_at = IFNULL(?, next_attempt_at)
+                WHERE id = ?
+            ''', [(error, retry_at, retry_at, outbox_id) for outbox_id, retry_at in retries], many=True)
+            return self._finish_reminders(conn, keys)
+        self.submit_write(work, changed=lambda task_ids: task_ids).result()
+
+    def outbox_counts(self) -> Dict[str, Dict[str, int]]:
+        # {sink: {status: rows}} across all users.
+        counts: Dict[str, Dict[str, int]] = {}
+        for sink, status, n in self._query("SELECT sink, status, COUNT(*) FROM reminder_outbox GROUP BY 1, 2"):
+            counts.setdefault(sink, {})[status] = n
+        return counts
+
+    # --- in-app reminder feed (InAppSink; see migrations.add_reminder_feed) ---
+    def add_to_feed(self, reminders: Sequence[Tuple[int, int, str, str]], fired_at: timeutil.Timestamp,
+                    keep: int = 500) -> int:
+        # reminders: (outbox id, task id, owner, message). A reminder already
+        # in the feed (redelivered) is skipped; each owner keeps their `keep`
+        # newest. Returns how many were added.
+        fired_at = timeutil.to_epoch(fired_at)
+        def work(conn):
+            added = self._execute(conn, '''
+                INSERT OR IGNORE INTO reminder_feed (outbox_id, task_id, user_id, message, fired_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [tuple(reminder) + (fired_at,) for reminder in reminders], many=True).rowcount
+            self._execute(conn, '''
+                DELETE FROM reminder_feed WHERE user_id = ? AND id <= (
+                    SELECT id FROM reminder_feed WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)
+            ''', [(owner, owner, keep) for owner in {reminder[2] for reminder in reminders}], many=True)
+            return added
+        return self.submit_write(work).result()
+
+    def get_reminder_feed(self, after: int = 0, unseen_only: bool = False) -> List[Tuple[int, str]]:
+        # (sequence number, message) of this user's in-app reminders after
+        # sequence number `after`, oldest first; unseen_only skips dismissed ones.
+        owner, owner_params = self._owner()
+        unseen = " AND seen_at IS NULL" if unseen_only else ""
+        rows = self._query(f"SELECT id, message FROM reminder_feed WHERE id > ?{owner}{unseen} ORDER BY id",
+                           (after,) + owner_params)
+        return [(row[0], row[1]) for row in rows]
+
+    def dismiss_reminders(self, up_to: int, seen_at: Optional[timeutil.Timestamp] = None) -> int:
+        # Marks this user's in-app reminders up to sequence number `up_to` as
+        # seen; returns how many were still unseen.
+        seen_at = timeutil.now() if seen_at is None else timeutil.to_epoch(seen_at)
+        owner, owner_params = self._owner()
+        def work(conn):
+            return self._execute(conn, f"UPDATE reminder_feed SET seen_at = ? WHERE id <= ?{owner} AND seen_at IS NULL",
+                                 (seen_at, up_to) + owner_params).rowcount
+        return self.submit_write(work).result()
+
+    def _outbox_keys(self, conn: sqlite3.Connection, outbox_ids: Sequence[int]) -> List[Tuple[int, int]]:
+        # The (task_id, queued_at) reminders these outbox rows belong to.
+        keys = set()
+        for start in range(0, len(outbox_ids), 500):
+            chunk = list(outbox_ids[start:start + 500])
+            placeholders = ", ".join("?" for _ in chunk)
+            keys.update(tuple(row) for row in conn.execute(
+                f"SELECT task_id, queued_at FROM reminder_outbox WHERE id IN ({placeholders})", chunk))
+        return sorted(keys)
+
+    def _finish_reminders(self, conn: sqlite3.Connection, keys: Sequence[Tuple[int, int]]) -> List[int]:
+        # Completes the reminders whose sinks have all answered: acknowledged by
+        # at least one, the task counts as reminded (at the first ack) and its
+        # acknowledged rows are deleted; otherwise the task goes back on the
+        # reminder schedule to be reminded afresh. Failed rows are kept.
+        # Returns the ids of the tasks completed.
+        finished = []
+        for task_id, queued_at in keys:
+            rows = conn.execute('''
+                SELECT sink, message, status, delivered_at, last_error FROM reminder_outbox
+                WHERE task_id = ? AND queued_at = ?
+            ''', (task_id, queued_at)).fetchall()
+            if not rows or any(row["status"] == "pending" for row in rows):
+                continue
+            sent = [row for row in rows if row["status"] == "sent"]
+            failed = [row["sink"] for row in rows if row["status"] == "failed"]
+            if sent:
+                payload = {"message": rows[0]["message"], "sinks": [row["sink"] for row in sent]}
+                if failed:
+                    payload["failed"] = failed
+                self._set_reminded(conn, [task_id], min(row["delivered_at"] for row in sent), {task_id: payload})
+                conn.execute("DELETE FROM reminder_outbox WHERE task_id = ? AND queued_at = ? AND status = 'sent'",
+                             (task_id, queued_at))
+            else:
+                self._reschedule(conn, [task_id])
+                self._insert_events(conn, [(task_id, TaskEvent("ReminderAgent", "reminder_failed", {
+                    "message": rows[0]["message"], "failed": failed, "error": rows[-1]["last_error"]}))])
+            finished.append(task_id)
+        return finished
+
+    # --- archive: completed tasks moved out of the working tables ---
+    def archive_completed(self, completed_before: timeutil.Timestamp, batch_size: int = 200) -> List[int]:
+        # Moves up to `batch_size` of this user's tasks completed at or before
+        # `completed_before` (oldest first), and their events, to the archive
+        # tables in one short write; returns their ids. database/archive.py
+        # calls it repeatedly until a batch comes back short. Reminder
+        # deliveries still in the outbox for them are dropped (foreign key).
+        completed_before = timeutil.to_epoch(completed_before)
+        owner, owner_params = self._owner()
+        def work(conn):
+            task_ids = [row[0] for row in self._execute(conn, f"""
+                SELECT id FROM tasks
+                WHERE status = 'completed' AND completed_at <= ?{owner}
+                ORDER BY completed_at LIMIT ?
+            """, (completed_before,) + owner_params + (batch_size,)).fetchall()]
+            self._move_tasks(conn, task_ids, "tasks", "tasks_archive", archived_at=timeutil.now())
+            return task_ids
+        return self.submit_write(work, changed=lambda task_ids: task_ids).result()
+
+    def restore_tasks(self, task_ids: List[int]) -> List[int]:
+        # Moves archived tasks back to the working tables unchanged (so still
+        # completed, and archived again on the archiver's next pass unless
+        # reopened); returns the ids restored. Updates restore the tasks they
+        # touch on their own.
+        return self.submit_write(lambda conn: self._restore(conn, task_ids), changed=lambda restored: restored).result()
+
+    def _restore(self, conn: sqlite3.Connection, task_ids: Sequence[int]) -> List[int]:
+        archived = self._owned(conn, task_ids, table="tasks_archive")
+        self._move_tasks(conn, archived, "tasks_archive", "tasks")
+        return archived
+
+    def _move_tasks(self, conn: sqlite3.Connection, task_ids: Sequence[int], source: str, target: str,
+                    archived_at: Optional[int] = None):
+        # Copies the task rows, then their events (in order, under new ids),
+        # and deletes both from `source`; task_events goes first, as deleting
+        # a task would cascade to it.
+        events = {"tasks": "task_events", "tasks_archive": "task_events_archive"}
+        columns = ", ".join(TASK_COLUMNS)
+        event_columns = "task_id, agent, kind, timestamp, payload"
+        for start in range(0, len(task_ids), 500):
+            chunk = list(task_ids[start:start + 500])
+            placeholders = ", ".join("?" for _ in chunk)
+            if archived_at is not None:
+                self._execute(conn, f"""
+                    INSERT INTO {target} ({columns}, archived_at)
+                    SELECT {columns}, ? FROM {source} WHERE id IN ({placeholders})
+                """, [archived_at] + chunk)
+            else:
+                self._execute(conn, f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} "
+                                    f"WHERE id IN ({placeholders})", chunk)
+            self._execute(conn, f"""
+                INSERT INTO {events[target]} ({event_columns})
+                SELECT {event_columns} FROM {events[source]} WHERE task_id IN ({placeholders}) ORDER BY id
+            """, chunk)
+            self._execute(conn, f"DELETE FROM {events[source]} WHERE task_id IN ({placeholders})", chunk)
+            self._execute(conn, f"DELETE FROM {source} WHERE id IN ({placeholders})", chunk)
 
     def delete_task(self, task_id: int):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-        conn.commit()
-        conn.close()
+        self.delete_tasks([task_id])
 
-    def get_tasks_for_reminder(self) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        # Remind for tasks due in the next 24 hours or overdue, not completed,
-        # and not reminded in the last 6 hours (to avoid spam)
-        # For simplicity, we'll just check if reminder_sent_at is NULL or more than 6 hours ago
-        now = datetime.datetime.now()
-        reminder_threshold_time = now - datetime.timedelta(hours=6)
-        
-        cursor.execute("""
-            SELECT * FROM tasks 
-            WHERE status != 'completed' 
-            AND due_date IS NOT NULL
-            AND (
-                (due_date <= ?) OR -- Overdue or due within next day
-                (JULIANDAY(due_date) - JULIANDAY('now', 'localtime')) <= 1 
-            )
-            AND (reminder_sent_at IS NULL OR reminder_sent_at < ?)
-            ORDER BY due_date ASC
-        """, (now.strftime('%Y-%m-%d %H:%M:%S'), reminder_threshold_time.strftime('%Y-%m-%d %H:%M:%S')))
-        tasks = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return tasks
-
-# Global instance
-db_manager = DatabaseManager()
\ No newline at end of file
+    def delete_tasks(self, task_ids: List[int]) -> List[int]:
+        # Returns the ids deleted, as update_tasks does. Archived tasks are
+        # deleted from the archive.
+        if not task_ids:
+            return []
+        def work(conn):
+            owned = self._owned(conn, task_ids)
+            archived = self._owned(conn, task_ids, table="tasks_archive")
+            self._execute(conn, "DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in owned], many=True)
+            self._execute(conn, "DELETE FROM task_events_archive WHERE task_id = ?",
+                          [(task_id,) for task_id in archived], many=True)
+            self._execute(conn, "DELETE FROM tasks_archive WHERE id = ?",
+                          [(task_id,) for task_id in archived], many=True)
+            deleted = set(owned).union(archived)  # a task is in one table or the other
+            return [task_id for task_id in task_ids if task_id in deleted]
+        return self.submit_write(work, changed=lambda deleted: deleted).result()
+
+    def get_tasks_for_reminder(self, now: Optional[timeutil.Timestamp] = None) -> List[Dict[str, Any]]:
+        # Tasks whose next reminder is due: one range scan of idx_tasks_next_reminder.
+        # Which tasks qualify, and when, is up to self.reminder_policy; see
+        # next_reminder_at (epoch seconds, like every timestamp column).
+        now = timeutil.to_epoch(now) if now is not None else timeutil.now()
+        owner, owner_params = self._owner()
+        rows = self._query(f"""
+            SELECT * FROM tasks
+            WHERE next_reminder_at <= ?{owner}
+            ORDER BY next_reminder_at ASC
+        """, (now,) + owner_params)
+        return [dict(row) for row in rows]
+
+_default_manager: Optional[DatabaseManager] = None
+_default_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    # The app's shared manager for tasks.db, opened on first use rather than
+    # at import, so importing agents or the API doesn't touch the database.
+    global _default_manager
+    if _default_manager is None:
+        with _default_lock:
+            if _default_manager is None:
+                _default_manager = DatabaseManager()
+    return _default_manager
+
+def __getattr__(name):
+    # Keeps `from database.db_manager import db_manager` working (lazily).
+    if name == "db_manager":
+        return get_db_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,157 @@
+# database/export.py
+# Streaming export (CSV, JSONL, iCalendar) and online backup.
+#
+# Exports read tasks through DatabaseManager.iter_tasks (one cursor, fetched
+# in batches) and yield encoded chunks of about `chunk_rows` tasks, so memory
+# stays flat however large the table is. CSV and JSONL use the column names
+# ingestion reads back (description, due_date, priority, ...), with
+# timestamps as 'YYYY-MM-DD HH:MM:SS' local time. The backup is
+# SQLite's online backup API, copied a few pages per step so writers are
+# never held up for long.
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+from .db_manager import TIMESTAMP_FIELDS, DatabaseManager
+from utils import timeutil
+
+FORMATS = ("csv", "jsonl", "ics")
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson", "ics": "text/calendar"}
+EXPORT_COLUMNS = ("id", "description", "status", "created_at", "due_date", "priority", "assigned_agent",
+                  "reminder_sent_at")
+
+def _values(task) -> List[Any]:
+    return [timeutil.to_text(getattr(task, column)) if column in TIMESTAMP_FIELDS else getattr(task, column)
+            for column in EXPORT_COLUMNS]
+
+def _csv_chunks(tasks: Iterator, chunk_rows: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, task in enumerate(tasks, 1):
+        writer.writerow(_values(task))
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def _jsonl_chunks(tasks: Iterator, chunk_rows: int) -> Iterator[bytes]:
+    lines = []
+    for task in tasks:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, _values(task)))))
+        if len(lines) == chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+# --- iCalendar (RFC 5545): one VTODO per task ---
+ICS_STATUS = {"pending": "NEEDS-ACTION", "in progress": "IN-PROCESS", "completed": "COMPLETED"}
+ICS_PRIORITY = {1: 1, 2: 5, 3: 9}  # high / medium / low on the RFC's 1-9 scale
+
+def _ics_text(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _ics_time(epoch: int) -> str:
+    return time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(epoch))  # UTC
+
+def _ics_line(line: str) -> str:
+    # Folds content lines at 75 octets, without splitting a UTF-8 sequence.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+def _ics_todo(task, stamp: str) -> str:
+    lines = ["BEGIN:VTODO", f"UID:task-{task.id}@todo-agents", f"DTSTAMP:{stamp}",
+             f"SUMMARY:{_ics_text(task.description or '')}",
+             f"STATUS:{ICS_STATUS.get(task.status, 'NEEDS-ACTION')}"]
+    if isinstance(task.created_at, int):
+        lines.append(f"CREATED:{_ics_time(task.created_at)}")
+    if isinstance(task.due_date, int):
+        lines.append(f"DUE:{_ics_time(task.due_date)}")
+    if task.priority in ICS_PRIORITY:
+        lines.append(f"PRIORITY:{ICS_PRIORITY[task.priority]}")
+    lines.append("END:VTODO")
+    return "".join(_ics_line(line) for line in lines)
+
+def _ics_chunks(tasks: Iterator, chunk_rows: int) -> Iterator[bytes]:
+    stamp = _ics_time(timeutil.now())
+    parts = ["BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//todo-agents//export//EN\r\n"]
+    for task in tasks:
+        parts.append(_ics_todo(task, stamp))
+        if len(parts) >= chunk_rows:
+            yield "".join(parts).encode()
+            parts = []
+    parts.append("END:VCALENDAR\r\n")
+    yield "".join(parts).encode()
+
+_WRITERS = {"csv": _csv_chunks, "jsonl": _jsonl_chunks, "ics": _ics_chunks}
+
+def export_chunks(db: DatabaseManager, fmt: str, status_filter: Optional[str] = None,
+                  chunk_rows: int = 1000) -> Iterator[bytes]:
+    # Encoded export of db's tasks (its user's, for a for_user() view), in list order.
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    tasks = db.iter_tasks(status_filter=status_filter, columns=EXPORT_COLUMNS, batch_size=chunk_rows)
+    return _WRITERS[fmt](tasks, chunk_rows)
+
+def export_to(db: DatabaseManager, fmt: str, stream, status_filter: Optional[str] = None) -> int:
+    # Writes the export to a binary stream; returns the number of bytes.
+    written = 0
+    for chunk in export_chunks(db, fmt, status_filter):
+        stream.write(chunk)
+        written += len(chunk)
+    return written
+
+class _Restarted(Exception):
+    pass
+
+def backup(db_name: str, destination: str, pages: int = 256, sleep: float = 0.005, max_restarts: int = 3,
+           progress: Optional[Callable[[int, int], None]] = None) -> int:
+    # Online copy of the database at db_name into destination (overwritten);
+    # returns the number of pages. Each step copies `pages` pages inside a
+    # short read transaction and then sleeps, so writers carry on throughout.
+    # A commit by another connection makes SQLite restart the copy; after
+    # max_restarts of those it is finished in one step instead, which under
+    # WAL holds only a read snapshot. progress(remaining, total) is called
+    # after each step.
+    if os.path.abspath(destination) == os.path.abspath(db_name):
+        raise ValueError("Backup destination is the database itself")
+    source = sqlite3.connect(db_name)
+    target = sqlite3.connect(destination)
+    state = {"remaining": None, "restarts": 0}
+
+    def step(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _Restarted()
+        state["remaining"] = remaining
+        if progress:
+            progress(remaining, total)
+
+    try:
+        try:
+            source.backup(target, pages=pages, progress=step, sleep=sleep)
+        except _Restarted:
+            source.backup(target)
+            if progress:
+                progress(0, target.execute("PRAGMA page_count").fetchone()[0])
+        return target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
+        source.close()
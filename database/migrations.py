@@ -0,0 +1,469 @@
+# database/migrations.py
+# Versioned schema migrations keyed on PRAGMA user_version.
+#
+# MIGRATIONS[i] brings a database from version i to i + 1. Opening a database
+# whose user_version is already SCHEMA_VERSION costs one PRAGMA read; only
+# pending steps run, all in one write transaction together with the version
+# bump. Append new steps to the end of the list, never edit shipped ones.
+import json
+import re
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+# Lines the agents used to append to tasks.agent_notes, for the events migration.
+_LEGACY_NOTE = re.compile(r"^(?P<kind>Planned|Scheduled) by (?P<agent>\w+)"
+                          r"(?:\. Original input: '(?P<input>.*)'| at (?P<at>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}))?")
+
+def _legacy_note_event(task_id: int, line: str, created_at: Optional[str]) -> Tuple:
+    # task_events row (task_id, agent, kind, timestamp, payload) for one agent_notes line.
+    match = _LEGACY_NOTE.match(line)
+    if match is None:
+        return (task_id, "unknown", "note", created_at, json.dumps({"text": line}))
+    payload = json.dumps({"input": match.group("input")}) if match.group("input") is not None else None
+    return (task_id, match.group("agent"), match.group("kind").lower(), match.group("at") or created_at, payload)
+
+def create_tasks(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            due_date TIMESTAMP,
+            priority INTEGER DEFAULT 2, -- 1:High, 2:Medium, 3:Low
+            assigned_agent TEXT,
+            agent_notes TEXT,
+            reminder_sent_at TIMESTAMP
+        )
+    ''')
+    # Composite indexes match the list ordering so filtered and unfiltered
+    # listings are served in index order without a sort step.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_order
+        ON tasks (status, due_date, priority, created_at)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_order
+        ON tasks (due_date, priority, created_at)
+    ''')
+    # Partial index over open tasks with a due date: the reminder scan.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_open_due
+        ON tasks (due_date)
+        WHERE status != 'completed' AND due_date IS NOT NULL
+    ''')
+    # Append-only task history; replaces concatenating text onto tasks.agent_notes.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_events (
+            id INTEGER PRIMARY KEY,
+            task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+            agent TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            payload TEXT -- JSON
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_events_task ON task_events (task_id, id)")
+    # Split any agent_notes text into events (one per line) and clear the
+    # column, so rows stop carrying the ever-growing text.
+    cursor = conn.execute(
+        "SELECT id, created_at, agent_notes FROM tasks WHERE agent_notes IS NOT NULL AND agent_notes != ''")
+    while True:
+        batch = cursor.fetchmany(5000)
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO task_events (task_id, agent, kind, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+            [_legacy_note_event(task_id, line.strip(), created_at)
+             for task_id, created_at, notes in batch for line in notes.splitlines() if line.strip()])
+    conn.execute("UPDATE tasks SET agent_notes = NULL WHERE agent_notes IS NOT NULL")
+
+def create_search_index(conn: sqlite3.Connection):
+    # External-content FTS5 index over descriptions, kept in sync by triggers.
+    # Skipped if this SQLite build lacks FTS5 (search falls back to LIKE scans).
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone()
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts
+            USING fts5(description, content='tasks', content_rowid='id')
+        ''')
+    except sqlite3.OperationalError:
+        return
+    # add_tasks switches the insert trigger off for the duration of a bulk
+    # insert and indexes the new rows in one statement instead.
+    conn.execute("CREATE TABLE IF NOT EXISTS tasks_fts_sync (enabled INTEGER NOT NULL)")
+    if conn.execute("SELECT 1 FROM tasks_fts_sync").fetchone() is None:
+        conn.execute("INSERT INTO tasks_fts_sync (enabled) VALUES (1)")
+    trigger = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'tasks_fts_ai'").fetchone()
+    if trigger is not None and 'tasks_fts_sync' not in trigger[0]:
+        conn.execute("DROP TRIGGER tasks_fts_ai")  # created before bulk mode existed
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks
+        WHEN (SELECT enabled FROM tasks_fts_sync) BEGIN
+            INSERT INTO tasks_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO tasks_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    ''')
+    if not exists:  # index rows that predate the FTS table
+        conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+def add_reminder_schedule(conn: sqlite3.Connection):
+    # tasks.next_reminder_at: when the task's next reminder is due under the
+    # active ReminderPolicy (NULL once completed, undated or done reminding).
+    # The partial index only holds scheduled tasks, so the due-reminder scan is
+    # a range over it. DatabaseManager fills the column in on open, as the
+    # policy isn't known here (settings has no 'reminder_policy' entry yet).
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if "next_reminder_at" not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN next_reminder_at TIMESTAMP")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_next_reminder
+        ON tasks (next_reminder_at)
+        WHERE next_reminder_at IS NOT NULL
+    ''')
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+
+def add_task_owner(conn: sqlite3.Connection):
+    # tasks.user_id partitions tasks by user. It leads both listing indexes, so
+    # one user's list is a contiguous range whatever the number of users.
+    # Existing tasks go to the default user. idx_tasks_next_reminder stays as
+    # is for the reminder service, which scans due reminders across all users;
+    # per-user reminder reads get their own index.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if "user_id" not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN user_id TEXT NOT NULL DEFAULT 'default'")
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_status_order")
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_order")
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_open_due")  # superseded by idx_tasks_next_reminder
+    conn.execute('''
+        CREATE INDEX idx_tasks_status_order
+        ON tasks (user_id, status, due_date, priority, created_at)
+    ''')
+    conn.execute('''
+        CREATE INDEX idx_tasks_order
+        ON tasks (user_id, due_date, priority, created_at)
+    ''')
+    conn.execute('''
+        CREATE INDEX idx_tasks_user_next_reminder
+        ON tasks (user_id, next_reminder_at)
+        WHERE next_reminder_at IS NOT NULL
+    ''')
+    # The owner is indexed in tasks_fts too, so a user's search intersects
+    # with their own rows inside the FTS index instead of ranking every
+    # user's matches and discarding the others.
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone() is None:
+        return  # no FTS5 in this build
+    for trigger in ("tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE tasks_fts")
+    conn.execute('''
+        CREATE VIRTUAL TABLE tasks_fts
+        USING fts5(description, user_id, content='tasks', content_rowid='id')
+    ''')
+    conn.execute('''
+        CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks
+        WHEN (SELECT enabled FROM tasks_fts_sync) BEGIN
+            INSERT INTO tasks_fts (rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description, user_id)
+            VALUES ('delete', old.id, old.description, old.user_id);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER tasks_fts_au AFTER UPDATE OF description, user_id ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description, user_id)
+            VALUES ('delete', old.id, old.description, old.user_id);
+            INSERT INTO tasks_fts (rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+        END
+    ''')
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+def epoch_timestamps(conn: sqlite3.Connection):
+    # Timestamps were '%Y-%m-%d %H:%M:%S' text in local time, except
+    # created_at, which the CURRENT_TIMESTAMP default filled in as UTC; they
+    # become integer epoch seconds (utils/timeutil.py), compared and sorted as
+    # integers by the same indexes. Text that isn't a timestamp is left alone.
+    # SQLite can't change a column's declared type or default in place:
+    # TIMESTAMP columns store integers as integers anyway, and DatabaseManager
+    # always supplies created_at, so the old default no longer applies.
+    columns = [("tasks", "due_date", "local"), ("tasks", "reminder_sent_at", "local"),
+               ("tasks", "next_reminder_at", "local"), ("tasks", "created_at", "utc"),
+               ("task_events", "timestamp", "local")]
+    for table, column, zone in columns:
+        epoch = f"strftime('%s', {column}, 'utc')" if zone == "local" else f"strftime('%s', {column})"
+        conn.execute(f'''
+            UPDATE {table} SET {column} = CAST({epoch} AS INTEGER)
+            WHERE typeof({column}) = 'text' AND {epoch} IS NOT NULL
+        ''')
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"  # timeutil.now()
+# The local calendar day of an epoch timestamp, and today's (timeutil.local_day).
+_TODAY = "(CAST(strftime('%s', 'now', 'localtime') AS INTEGER) / 86400)"
+def _local_day(value: str) -> str:
+    return f"(CAST(strftime('%s', {value}, 'unixepoch', 'localtime') AS INTEGER) / 86400)"
+
+def _count_task(row: str, sign: str) -> str:
+    # Trigger statements adding (sign '+') or removing ('-') tasks row `row`
+    # ('new' or 'old') from the task_stats tables.
+    open_dated = f"{row}.status IS NOT 'completed' AND typeof({row}.due_date) = 'integer'"
+    day = _local_day(f"{row}.due_date")
+    statements = f'''
+        INSERT INTO task_stats (user_id, status, priority, n)
+        VALUES ({row}.user_id, IFNULL({row}.status, ''), IFNULL({row}.priority, 0), {sign}1)
+        ON CONFLICT DO UPDATE SET n = n {sign} 1;
+        INSERT INTO task_due_days (user_id, day, n) SELECT {row}.user_id, {day}, {sign}1 WHERE {open_dated}
+        ON CONFLICT DO UPDATE SET n = n {sign} 1;
+        UPDATE task_overdue SET n = n {sign} 1 WHERE user_id = {row}.user_id AND {open_dated} AND {day} < as_of;
+    '''
+    if sign == "-":
+        statements += f"DELETE FROM task_due_days WHERE user_id = {row}.user_id AND day = {day} AND n = 0;"
+    else:  # every owner has an overdue counter
+        statements = (f"INSERT INTO task_overdue (user_id, as_of, n) VALUES ({row}.user_id, {_TODAY}, 0) "
+                      f"ON CONFLICT DO NOTHING;" + statements)
+    return statements
+
+def rebuild_task_stats(conn: sqlite3.Connection):
+    # Recounts the task_stats tables from tasks, with overdue counted as of today.
+    conn.execute("DELETE FROM task_stats")
+    conn.execute('''
+        INSERT INTO task_stats (user_id, status, priority, n)
+        SELECT user_id, IFNULL(status, ''), IFNULL(priority, 0), COUNT(*) FROM tasks GROUP BY 1, 2, 3
+    ''')
+    conn.execute("DELETE FROM task_due_days")
+    conn.execute(f'''
+        INSERT INTO task_due_days (user_id, day, n)
+        SELECT user_id, {_local_day("due_date")}, COUNT(*) FROM tasks
+        WHERE status IS NOT 'completed' AND typeof(due_date) = 'integer' GROUP BY 1, 2
+    ''')
+    conn.execute("DELETE FROM task_overdue")
+    conn.execute(f'''
+        INSERT INTO task_overdue (user_id, as_of, n)
+        SELECT owners.user_id, {_TODAY}, (SELECT IFNULL(SUM(n), 0) FROM task_due_days
+                                         WHERE user_id = owners.user_id AND day < {_TODAY})
+        FROM (SELECT DISTINCT user_id FROM tasks) AS owners
+    ''')
+
+def add_task_stats(conn: sqlite3.Connection):
+    # Summary counters for the dashboard, kept exact by triggers on tasks so
+    # reading them never scans tasks:
+    #   task_stats: tasks per (user, status, priority);
+    #   task_due_days: open tasks with a due date, per user and local due day;
+    #   task_overdue: per user, open tasks due before local day as_of.
+    # Time passing changes what is overdue without any write to tasks, so
+    # DatabaseManager.get_stats moves as_of up to today when it reads,
+    # adding the task_due_days buckets it passed. Day buckets follow the
+    # local time zone of the process that writes them; check_stats()
+    # recounts everything if that ever changes.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_stats (
+            user_id TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, n INTEGER NOT NULL,
+            PRIMARY KEY (user_id, status, priority)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_due_days (
+            user_id TEXT NOT NULL, day INTEGER NOT NULL, n INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_overdue (
+            user_id TEXT PRIMARY KEY, as_of INTEGER NOT NULL, n INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_stats_ai AFTER INSERT ON tasks BEGIN
+            {_count_task("new", "+")}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_stats_ad AFTER DELETE ON tasks BEGIN
+            {_count_task("old", "-")}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_stats_au AFTER UPDATE OF user_id, status, priority, due_date ON tasks
+        WHEN old.user_id IS NOT new.user_id OR old.status IS NOT new.status
+          OR old.priority IS NOT new.priority OR old.due_date IS NOT new.due_date BEGIN
+            {_count_task("old", "-")}
+            {_count_task("new", "+")}
+        END
+    ''')
+    rebuild_task_stats(conn)
+
+def add_reminder_outbox(conn: sqlite3.Connection):
+    # Durable queue of reminder deliveries (agents/delivery.py): one row per
+    # reminder and sink, written in the same transaction that takes the task
+    # off the reminder schedule, so a restart resumes whatever wasn't
+    # acknowledged. (task_id, queued_at) identifies one reminder across its
+    # sinks. next_attempt_at is fractional epoch seconds: when the row is due
+    # (again, after a failure's backoff), or when a dispatcher's claim on it
+    # lapses. Acknowledged rows are deleted once every sink is done; failed
+    # ones stay for inspection.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reminder_outbox (
+            id INTEGER PRIMARY KEY,
+            task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+            user_id TEXT NOT NULL,
+            sink TEXT NOT NULL,
+            message TEXT NOT NULL,
+            queued_at INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending', -- pending, sent, failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            delivered_at INTEGER,
+            last_error TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reminder_outbox_due
+        ON reminder_outbox (sink, next_attempt_at)
+        WHERE status = 'pending'
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reminder_outbox_task ON reminder_outbox (task_id, queued_at)")
+
+def add_task_archive(conn: sqlite3.Connection):
+    # Hot/cold split. tasks.completed_at records when a task was completed
+    # (NULL while it is open); triggers keep it current on every path that
+    # writes tasks, unless the writer sets it itself, as restoring does.
+    # Tasks already completed take their last recorded activity. Completed
+    # tasks old enough are moved, with their events, to tasks_archive and
+    # task_events_archive (see DatabaseManager.archive_completed), so the
+    # working tables and their indexes only hold what is still in use. The
+    # archive keeps task ids (tasks' AUTOINCREMENT never reuses them); its
+    # events get ids of their own, in their original order. Archived rows
+    # leave tasks_fts and the task_stats counters through the delete
+    # triggers, and come back through the insert triggers when restored.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if "completed_at" not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN completed_at TIMESTAMP")
+    conn.execute('''
+        UPDATE tasks SET completed_at = IFNULL(
+            (SELECT MAX(timestamp) FROM task_events WHERE task_id = tasks.id), created_at)
+        WHERE status = 'completed' AND completed_at IS NULL
+    ''')
+    # The archiver's scan: completed tasks, oldest completion first.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed
+        ON tasks (completed_at)
+        WHERE status = 'completed'
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_completed_ai AFTER INSERT ON tasks
+        WHEN new.status = 'completed' AND new.completed_at IS NULL BEGIN
+            UPDATE tasks SET completed_at = {_NOW} WHERE id = new.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_completed_au AFTER UPDATE OF status ON tasks
+        WHEN old.status IS NOT new.status AND old.completed_at IS new.completed_at BEGIN
+            UPDATE tasks SET completed_at = CASE WHEN new.status = 'completed' THEN {_NOW} END WHERE id = new.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            status TEXT,
+            created_at TIMESTAMP,
+            due_date TIMESTAMP,
+            priority INTEGER,
+            assigned_agent TEXT,
+            agent_notes TEXT,
+            reminder_sent_at TIMESTAMP,
+            next_reminder_at TIMESTAMP,
+            user_id TEXT NOT NULL,
+            completed_at TIMESTAMP,
+            archived_at INTEGER NOT NULL
+        )
+    ''')
+    # Archived tasks are all completed, so one index in list order serves
+    # both the "all" and the "completed" history listings.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_archive_order
+        ON tasks_archive (user_id, due_date, priority, created_at)
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_events_archive (
+            id INTEGER PRIMARY KEY,
+            task_id INTEGER NOT NULL,
+            agent TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            payload TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_events_archive_task ON task_events_archive (task_id, id)")
+
+def add_reminder_feed(conn: sqlite3.Connection):
+    # The in-app reminder feed (InAppSink): reminders delivered to the UI and
+    # GET /reminders, shared by every process on the database, so whichever
+    # one claims an "app" outbox row, the user's UI sees it. id is the feed's
+    # sequence number; outbox_id makes a redelivered row a no-op. seen_at is
+    # set when the user dismisses it in the UI. No foreign key to tasks: a
+    # reminder stays in the feed after its task is deleted or archived.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reminder_feed (
+            id INTEGER PRIMARY KEY,
+            outbox_id INTEGER NOT NULL UNIQUE,
+            task_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            message TEXT NOT NULL,
+            fired_at INTEGER NOT NULL,
+            seen_at INTEGER
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reminder_feed_user ON reminder_feed (user_id, id)")
+
+# Steps are idempotent (IF NOT EXISTS), so databases created before
+# versioning (user_version 0) are brought up to date safely.
+MIGRATIONS: List[Tuple[str, Callable[[sqlite3.Connection], None]]] = [
+    ("tasks and task_events", create_tasks),
+    ("full-text search", create_search_index),
+    ("reminder schedule", add_reminder_schedule),
+    ("task owners", add_task_owner),
+    ("epoch timestamps", epoch_timestamps),
+    ("task stats", add_task_stats),
+    ("reminder outbox", add_reminder_outbox),
+    ("task archive", add_task_archive),
+    ("reminder feed", add_reminder_feed),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> List[str]:
+    # Brings the database up to SCHEMA_VERSION; returns the names of the
+    # steps applied (empty when it was already current). `conn` must be in
+    # autocommit mode (isolation_level=None), as ConnectionPool's are.
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock: another process may have just migrated.
+        version = schema_version(conn)
+        applied = []
+        for name, step in MIGRATIONS[version:]:
+            step(conn)
+            applied.append(name)
+        if applied:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return applied
@@ -0,0 +1,110 @@
+# database/models.py
+import functools
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+TASK_COLUMNS = ("id", "description", "status", "created_at", "due_date", "priority",
+                "assigned_agent", "agent_notes", "reminder_sent_at", "next_reminder_at", "user_id", "completed_at")
+# What the collapsed task list shows (plus the keyset cursor); no long text.
+LIST_COLUMNS = ("id", "description", "status", "created_at", "due_date", "priority", "reminder_sent_at",
+                "next_reminder_at")
+LONG_TEXT_COLUMNS = ("agent_notes",)
+CURSOR_COLUMNS = ("due_date", "priority", "created_at", "id")  # DatabaseManager.page_cursor
+
+class TaskRecord:
+    # Compact task row for list views: one slot per column instead of a
+    # per-row dict. Columns left out of a projection stay unset; reading one
+    # raises KeyError (or AttributeError) rather than returning stale data,
+    # so load the full row with DatabaseManager.get_task when it's needed.
+    # A read-only mapping (task['x'], get, keys, items, values, len, in,
+    # dict(task)), so code written for dict rows keeps working; copy() gives
+    # a plain dict to modify. Being immutable (record_factory fills the slots
+    # through their descriptors), records hash by value and can be shared by
+    # the query cache. json.dumps needs default=json_default.
+    __slots__ = TASK_COLUMNS
+
+    def __getitem__(self, column: str) -> Any:
+        try:
+            return getattr(self, column)
+        except AttributeError:
+            raise KeyError(f"{column!r} was not loaded for this task") from None
+
+    def get(self, column: str, default: Any = None) -> Any:
+        return getattr(self, column, default)
+
+    def __contains__(self, column: str) -> bool:
+        return hasattr(self, column)
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(column for column in TASK_COLUMNS if hasattr(self, column))
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, column) for column in self.keys())
+
+    def items(self) -> Tuple[Tuple[str, Any], ...]:
+        return tuple((column, getattr(self, column)) for column in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    copy = to_dict  # as dict.copy(), but the copy is a dict: records can't be modified
+
+    def __setattr__(self, column: str, value: Any):
+        raise AttributeError("TaskRecord is read-only; modify a copy() instead")
+
+    __delattr__ = __setattr__
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, TaskRecord) and self.items() == other.items()
+
+    def __hash__(self) -> int:
+        return hash(self.items())
+
+    def __repr__(self):
+        return f"TaskRecord({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+Mapping.register(TaskRecord)
+
+def json_default(value: Any) -> Any:
+    # json.dumps(..., default=json_default) serialises TaskRecords as objects.
+    if isinstance(value, TaskRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def projection(columns: Optional[Sequence[str]], required: Sequence[str] = ("id",)) -> Tuple[str, ...]:
+    # Validates a column list (it is interpolated into SQL) and adds the
+    # columns the caller needs regardless, keeping table order.
+    if columns is None:
+        return TASK_COLUMNS
+    unknown = set(columns) - set(TASK_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown task columns: {', '.join(sorted(unknown))}")
+    wanted = set(columns) | set(required)
+    return tuple(column for column in TASK_COLUMNS if column in wanted)
+
+@functools.lru_cache(maxsize=64)
+def record_factory(columns: Tuple[str, ...]) -> Callable[[Any, tuple], TaskRecord]:
+    # sqlite3 row_factory building TaskRecords for a fixed column order.
+    new = TaskRecord.__new__
+    setters = [TaskRecord.__dict__[column].__set__ for column in columns]
+
+    def factory(cursor, values):
+        record = new(TaskRecord)
+        for setter, value in zip(setters, values):
+            setter(record, value)
+        return record
+    return factory
+
+class TaskEvent(NamedTuple):
+    # One entry in a task's append-only history (the task_events table).
+    # The task id is supplied by the DatabaseManager call that stores it.
+    agent: str
+    kind: str
+    payload: Optional[Dict[str, Any]] = None
+    timestamp: Optional[int] = None  # epoch seconds; defaults to now when stored
@@ -0,0 +1,166 @@
+# database/writer.py
+# Single writer thread with group commit. Every DatabaseManager write is a
+# function of a connection, queued here and run on one dedicated connection,
+# so concurrent sessions never contend for SQLite's write lock (no "database
+# is locked") and a burst of small writes shares one transaction and one WAL
+# commit. Reads don't come through here: under WAL they keep running on each
+# thread's own pooled connection.
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+WriteFn = Callable[[sqlite3.Connection], Any]
+AfterCommit = Callable[[Any], None]
+
+_STOP = object()
+
+class WriteQueue:
+    def __init__(self, connect: Callable[[], sqlite3.Connection], window: float = 0.002,
+                 max_batch: int = 256, lock_retries: int = 5):
+        # connect: opens the writer thread's connection (autocommit mode).
+        # window: once a write arrives, wait at most this long for others to
+        #   share its transaction. Only applied while writes are arriving
+        #   together (the previous transaction held more than one); a lone
+        #   write commits at once. 0: only group writes already queued.
+        # max_batch: writes per transaction.
+        # lock_retries: attempts to start a transaction while another process
+        #   holds the write lock, on top of the connection's busy timeout.
+        self._connect = connect
+        self.window = window
+        self.max_batch = max_batch
+        self.lock_retries = lock_retries
+        self._queue: "queue.Queue" = queue.Queue()
+        self._last_batch = 0
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None  # the writer thread's
+        self._start_lock = threading.Lock()
+        self._local = threading.local()  # set on the writer thread while it runs a batch
+        self.stats = {"writes": 0, "transactions": 0, "failed": 0, "lock_retries": 0}
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+                    self._thread.start()
+
+    def submit(self, fn: WriteFn, after_commit: Optional[AfterCommit] = None) -> Future:
+        # Queues fn(conn); the future resolves to its return value once the
+        # transaction that ran it has committed (after_commit(value) runs first).
+        # An exception in fn rolls back that write only and is set on its future.
+        future: Future = Future()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:  # a write issued from inside a write: join the open transaction
+            try:
+                value = fn(conn)
+            except BaseException as e:
+                future.set_exception(e)
+                return future
+            self._local.after_commit.append((after_commit, value, future))
+            return future
+        if threading.current_thread() is self._thread:  # e.g. an after_commit callback writing
+            future.set_running_or_notify_cancel()
+            self._run_batch(self._conn, [(fn, after_commit, future)])
+            return future
+        self._ensure_started()
+        self._queue.put((fn, after_commit, future))
+        return future
+
+    def close(self, timeout: float = 5.0):
+        # Runs what is already queued, then stops the thread.
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _next_batch(self) -> Tuple[List[Tuple], bool]:
+        batch = []
+        item = self._queue.get()
+        if item is _STOP:
+            return batch, True
+        batch.append(item)
+        deadline = time.perf_counter() + (self.window if self._last_batch > 1 else 0)
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.perf_counter()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        self._last_batch = len(batch)
+        return batch, False
+
+    def _begin(self, conn: sqlite3.Connection):
+        for attempt in range(self.lock_retries):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e) or attempt == self.lock_retries - 1:
+                    raise
+                self.stats["lock_retries"] += 1
+                time.sleep(0.05 * (attempt + 1))
+
+    def _run_batch(self, conn: sqlite3.Connection, batch: List[Tuple]):
+        # Futures in `batch` must already be running.
+        self._begin(conn)
+        done = []  # (after_commit, value, future) of the writes that succeeded, nested ones included
+        self._local.conn, self._local.after_commit = conn, done
+        try:
+            for fn, after_commit, future in batch:
+                conn.execute("SAVEPOINT write")
+                nested_from = len(done)
+                try:
+                    value = fn(conn)
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    self.stats["failed"] += 1
+                    for _, _, nested in done[nested_from:]:  # rolled back with it
+                        nested.set_exception(e)
+                    del done[nested_from:]
+                    future.set_exception(e)
+                    continue
+                conn.execute("RELEASE write")
+                done.append((after_commit, value, future))
+            conn.execute("COMMIT")
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in done:
+                future.set_exception(e)
+            raise
+        finally:
+            self._local.conn = self._local.after_commit = None
+        self.stats["transactions"] += 1
+        self.stats["writes"] += len(done)
+        callback_error = None
+        for after_commit, value, future in done:
+            try:
+                if after_commit is not None:
+                    after_commit(value)
+            except Exception as e:  # the write is committed either way
+                callback_error = callback_error or e
+            future.set_result(value)
+        if callback_error is not None:
+            raise callback_error
+
+    def _run(self):
+        self._conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._run_batch(self._conn, batch)
+            except Exception as e:  # BEGIN or COMMIT failed: the whole batch is lost
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -1,13 +1,194 @@
 # main.py
-import subprocess
+import argparse
 import os
+import time
 
-if __name__ == "__main__":
-    # Ensure tasks.db exists (db_manager will create table if not exists)
-    # from database.db_manager import DatabaseManager # This line would initialize it
-    # db = DatabaseManager() # Call to ensure table creation on first run
-    
+def run_ui(args):
     print("Starting Streamlit To-Do App...")
     # Construct the path to app.py relative to main.py
-    app_path = os.path.join(os.path.dirname(__file__), "ui", "app.py")
-    subprocess.run(["streamlit", "run", app_path])
\ No newline at end of file
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui", "app.py")
+    # Run Streamlit's CLI in this process instead of spawning a second
+    # interpreter (and a second round of imports) through the `streamlit` script.
+    from streamlit.web import cli as streamlit_cli
+    streamlit_cli.main(args=["run", app_path], prog_name="streamlit")
+
+def run_reminders(args):
+    # Headless reminder service: fires reminders without a browser session.
+    from agents.reminder_service import get_reminder_service
+    from utils.logger import agent_logger
+
+    agent_logger.configure(echo=True) # Agent log (including reminders) goes to the console
+    service = get_reminder_service()
+    print("Reminder service running. Press Ctrl+C to stop.")
+    try:
+        while service.running:
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        service.stop()
+        agent_logger.flush()
+
+def run_ingest(args):
+    # Bulk import from a text (one task per line), CSV or JSONL file.
+    from agents.ingestion import ingest
+    from agents.scheduler_agent import SchedulerAgent
+
+    def report(stats):
+        print(f"\r{stats}", end="", flush=True)
+
+    scheduler = SchedulerAgent().for_user(args.user) if args.user else None
+    stats = ingest(args.file, fmt=args.format, workers=args.workers,
+                   chunk_size=args.chunk_size, scheduler=scheduler, progress=report)
+    print(f"\rDone: {stats}")
+
+def run_export(args):
+    # Streams one user's tasks as CSV, JSONL or iCalendar to a file or stdout.
+    import sys
+    from database.db_manager import DATABASE_NAME, DatabaseManager
+    from database.export import export_to
+
+    db = DatabaseManager(args.db or DATABASE_NAME).for_user(args.user)
+    try:
+        if args.output:
+            with open(args.output, "wb") as stream:
+                written = export_to(db, args.format, stream, status_filter=args.status)
+            print(f"Wrote {written:,} bytes to {args.output}", file=sys.stderr)
+        else:
+            export_to(db, args.format, sys.stdout.buffer, status_filter=args.status)
+            sys.stdout.flush()
+    except BrokenPipeError: # e.g. piped into `head`
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        db.close()
+
+def run_backup(args):
+    # Online backup: safe while the UI, API or reminder service are writing.
+    from database.db_manager import DATABASE_NAME
+    from database.export import backup
+
+    def report(remaining, total):
+        print(f"\rCopied {total - remaining:,}/{total:,} pages", end="", flush=True)
+
+    try:
+        pages = backup(args.db or DATABASE_NAME, args.destination, pages=args.pages, progress=report)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"\rBacked up {pages:,} pages to {args.destination}")
+
+def run_stats(args):
+    # Dashboard counters for one user; --check recounts them from the tasks table.
+    import json
+    from database.db_manager import DATABASE_NAME, DatabaseManager
+
+    db = DatabaseManager(args.db or DATABASE_NAME).for_user(args.user)
+    try:
+        if args.check:
+            wrong = db.check_stats()
+            print("\n".join(wrong) if wrong else "Counters match the tasks table.")
+            if wrong:
+                print(f"Rebuilt; {len(wrong)} counter(s) were wrong.")
+        print(json.dumps(db.get_stats(), indent=2))
+    finally:
+        db.close()
+
+def run_archive(args):
+    # One archiving pass (the UI and API also archive in the background), or
+    # restores archived tasks by id.
+    from database.archive import TaskArchiver, archive_days_from_env
+    from database.db_manager import ALL_USERS, DATABASE_NAME, DatabaseManager
+
+    db = DatabaseManager(args.db or DATABASE_NAME)
+    try:
+        if args.restore:
+            restored = db.for_user(ALL_USERS).restore_tasks(args.restore)
+            print(f"Restored {len(restored):,} task(s): {', '.join(map(str, restored)) or 'none archived'}")
+            return
+        days = args.days if args.days is not None else archive_days_from_env()
+        if days is None or days <= 0:
+            raise SystemExit("Archiving is off (ARCHIVE_AFTER_DAYS); pass --days to run it anyway.")
+        archiver = TaskArchiver(db, after_days=days, batch_size=args.batch_size)
+        started = time.perf_counter()
+        moved = archiver.run_once()
+        print(f"Archived {moved:,} task(s) completed over {days:g} days ago in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+def run_serve(args):
+    # Headless JSON API (see api/server.py for the routes).
+    from api.server import TaskAPI, make_server
+    from database.db_manager import DatabaseManager
+
+    api = TaskAPI(db=DatabaseManager(args.db) if args.db else None, reminders=not args.no_reminders,
+                  archive=not args.no_archive)
+    server = make_server(args.host, args.port, api)
+    print(f"API listening on http://{args.host}:{server.server_port}. Press Ctrl+C to stop.", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        api.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-Agent To-Do & Reminder App")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("ui", help="Launch the Streamlit UI (default)")
+    reminders_parser = subparsers.add_parser("reminders", help="Run the reminder service headless")
+    reminders_parser.add_argument("--poll-interval", type=float, default=1.0)
+    ingest_parser = subparsers.add_parser("ingest", help="Bulk-import tasks from a txt/csv/jsonl file")
+    ingest_parser.add_argument("file")
+    ingest_parser.add_argument("--format", choices=["txt", "csv", "jsonl"], default=None,
+                               help="Defaults to the file extension")
+    ingest_parser.add_argument("--workers", type=int, default=None,
+                               help="Planner processes (default: CPU count, 0 = in-process)")
+    ingest_parser.add_argument("--chunk-size", type=int, default=1000)
+    ingest_parser.add_argument("--user", default=None, help="Owner of the imported tasks (default: the default user)")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the headless JSON API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--db", default=None, help="Database file (default: the UI's tasks.db)")
+    serve_parser.add_argument("--no-reminders", action="store_true", help="Don't run the reminder service")
+    serve_parser.add_argument("--no-archive", action="store_true", help="Don't archive completed tasks")
+
+    export_parser = subparsers.add_parser("export", help="Export tasks as CSV, JSONL or iCalendar")
+    export_parser.add_argument("--format", choices=["csv", "jsonl", "ics"], default="csv")
+    export_parser.add_argument("--status", choices=["pending", "in progress", "completed"], default=None)
+    export_parser.add_argument("--user", default="default", help="Whose tasks to export")
+    export_parser.add_argument("--output", "-o", default=None, help="File to write (default: stdout)")
+    export_parser.add_argument("--db", default=None, help="Database file (default: the UI's tasks.db)")
+
+    backup_parser = subparsers.add_parser("backup", help="Copy the database while it is in use")
+    backup_parser.add_argument("destination")
+    backup_parser.add_argument("--db", default=None, help="Database file (default: the UI's tasks.db)")
+    backup_parser.add_argument("--pages", type=int, default=256, help="Pages copied per step")
+
+    stats_parser = subparsers.add_parser("stats", help="Show task counts (the UI dashboard)")
+    stats_parser.add_argument("--user", default="default", help="Whose tasks to count")
+    stats_parser.add_argument("--check", action="store_true", help="Recount from the tasks table and repair")
+    stats_parser.add_argument("--db", default=None, help="Database file (default: the UI's tasks.db)")
+
+    archive_parser = subparsers.add_parser("archive", help="Move old completed tasks out of the working table")
+    archive_parser.add_argument("--days", type=float, default=None,
+                                help="Archive tasks completed at least this many days ago (default: ARCHIVE_AFTER_DAYS)")
+    archive_parser.add_argument("--batch-size", type=int, default=200, help="Tasks moved per write")
+    archive_parser.add_argument("--restore", type=int, nargs="+", metavar="ID", help="Restore these archived tasks")
+    archive_parser.add_argument("--db", default=None, help="Database file (default: the UI's tasks.db)")
+
+    args = parser.parse_args()
+    if args.command == "reminders":
+        run_reminders(args)
+    elif args.command == "ingest":
+        run_ingest(args)
+    elif args.command == "export":
+        run_export(args)
+    elif args.command == "backup":
+        run_backup(args)
+    elif args.command == "stats":
+        run_stats(args)
+    elif args.command == "serve":
+        run_serve(args)
+    elif args.command == "archive":
+        run_archive(args)
+    else:
+        run_ui(args)
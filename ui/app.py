@@ -8,29 +8,38 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
     
 # Now your project-specific imports should work
-from database.db_manager import db_manager
+from database.db_manager import ARCHIVED_STATUSES, DEFAULT_USER, get_db_manager
+from database.archive import get_task_archiver
+from database.models import LIST_COLUMNS, TaskEvent
 from agents.planner_agent import PlannerAgent
 from agents.scheduler_agent import SchedulerAgent
-from agents.reminder_agent import ReminderAgent
-from utils.logger import agent_logger
+from agents.reminder_service import get_reminder_service
+from agents.ingestion import ingest_binary
+from database.export import FORMATS as EXPORT_FORMATS, MIME_TYPES as EXPORT_MIME_TYPES, export_to
+from utils.logger import agent_logger, LEVELS as LOG_LEVELS
+from utils.metrics import metrics
+from utils import timeutil # Timestamps are epoch seconds; display formatting is cached
 
 import streamlit as st # Keep other imports after the sys.path modification
+import cProfile
+import re
+import io
+import pstats
+import tempfile
 from datetime import datetime, time
+from time import perf_counter
 
-# Initialize agents
-planner = PlannerAgent()
-scheduler = SchedulerAgent()
-reminder = ReminderAgent()
+# Database, agents and the background reminder service and archiver are
+# created on the first run and shared by every rerun and session of this process.
+@st.cache_resource
+def load_resources():
+    return get_db_manager(), PlannerAgent(), SchedulerAgent(), get_reminder_service(), get_task_archiver()
+
+db_manager, planner, scheduler, reminder_service, archiver = load_resources()
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_.@-]{1,64}")
 
 # --- Helper Functions ---
-def format_datetime_for_display(dt_str):
-    if not dt_str:
-        return "N/A"
-    try:
-        dt_obj = datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
-        return dt_obj.strftime('%Y-%m-%d %I:%M %p')
-    except (ValueError, TypeError):
-        return "Invalid Date"
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
 
 def priority_to_text(p_int):
     return {1: "High", 2: "Medium", 3: "Low"}.get(p_int, "Unknown")
@@ -38,6 +47,14 @@ def priority_to_text(p_int):
 def text_to_priority(p_text):
     return {"High": 1, "Medium": 2, "Low": 3}.get(p_text, 2)
 
+def user_event(kind, **payload):
+    return TaskEvent("UserInterface", kind, payload or None)
+
+def format_event(event):
+    payload = event['payload'] or {}
+    details = payload.get('message') or ", ".join(f"{key}: {value}" for key, value in payload.items() if value is not None)
+    return f"[{timeutil.to_text(event['timestamp'])}] {event['agent']} · {event['kind']}" + (f" — {details}" if details else "")
+
 
 # --- Streamlit UI ---
 st.set_page_config(layout="wide")
@@ -48,40 +65,132 @@ if 'editing_task_id' not in st.session_state:
     st.session_state.editing_task_id = None
 if 'reminders' not in st.session_state:
     st.session_state.reminders = []
+if 'last_reminder_seq' not in st.session_state:
+    st.session_state.last_reminder_seq = 0
 if 'status_filter' not in st.session_state:
     st.session_state.status_filter = "pending" # Default filter
 
+# --- Rerun timing and optional profiling ---
+rerun_started = perf_counter()
+if st.session_state.pop("profile_next_rerun", False):
+    st.session_state.active_profiler = cProfile.Profile()
+    st.session_state.pop("profile_report", None)
+if "active_profiler" in st.session_state:
+    # Re-enabled on every run until one reaches the end of the script, so a
+    # run cut short by st.rerun() still yields one complete capture.
+    st.session_state.active_profiler.enable()
+
+# --- Current user: every read and write below is scoped to their tasks ---
+if 'user_id' not in st.session_state:
+    requested_user = st.query_params.get("user", DEFAULT_USER)
+    st.session_state.user_id = requested_user if USER_ID_PATTERN.fullmatch(requested_user) else DEFAULT_USER
+with st.sidebar:
+    user_input = st.text_input("User", value=st.session_state.user_id).strip()
+    st.caption("⚠️ Not a login: anyone who can open this app can type any user name and see and "
+               "change that user's tasks.")
+    if user_input != st.session_state.user_id:
+        if USER_ID_PATTERN.fullmatch(user_input):
+            st.session_state.user_id = user_input
+            st.session_state.editing_task_id = None
+            st.session_state.reminders = []
+            st.session_state.last_reminder_seq = 0  # their undismissed reminders
+        else:
+            st.error("User names are 1-64 letters, digits or _.@-")
+db_manager = db_manager.for_user(st.session_state.user_id)
+planner = planner.for_user(st.session_state.user_id)
+scheduler = scheduler.for_user(st.session_state.user_id)
+
 # --- Sidebar for Agent Log and Controls ---
 with st.sidebar:
     st.header("Agent Controls & Log")
+    st.caption("Reminder service: " + ("🟢 running" if reminder_service.running else "🔴 stopped"))
     if st.button("🔄 Check for Reminders"):
-        with st.spinner("Reminder Agent processing..."):
-            reminders_fired = reminder.process()
-            st.session_state.reminders.extend(reminders_fired) # Append new reminders
-            if reminders_fired:
-                st.success(f"{len(reminders_fired)} reminder(s) processed.")
-            else:
-                st.info("No new reminders.")
-        st.rerun() # Rerun to update reminder display
+        reminder_service.check_now() # Full rescan in the background; results show up below
+        st.toast("Reminder Agent is checking all tasks...")
+
+    st.subheader("Query Cache")
+    cache_stats = db_manager.cache.stats()
+    cache_cols = st.columns(3)
+    cache_cols[0].metric("Hits", cache_stats["hits"])
+    cache_cols[1].metric("Misses", cache_stats["misses"])
+    cache_cols[2].metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+    st.caption(f"{cache_stats['size']}/{cache_stats['maxsize']} entries, {cache_stats['evictions']} evicted")
+
+    st.subheader("Latency")
+    latency_kind = st.radio("Measure", ["agent", "query", "ui"], horizontal=True, key="latency_kind",
+                            format_func={"agent": "Agents", "query": "SQL", "ui": "UI reruns"}.get)
+    latency_rows = metrics.summary(latency_kind)
+    if latency_rows:
+        st.dataframe([{"name": row["name"], "calls": row["count"], "p50 ms": round(row["p50_ms"], 2),
+                       "p95 ms": round(row["p95_ms"], 2), "p99 ms": round(row["p99_ms"], 2),
+                       "max ms": round(row["max_ms"], 2), "rows": row["rows"]} for row in latency_rows],
+                     hide_index=True, height=200)
+    else:
+        st.caption("No samples yet.")
+    metrics_col1, metrics_col2 = st.columns(2)
+    metrics_col1.download_button("⬇️ Prometheus", metrics.to_prometheus(), file_name="metrics.prom",
+                                 mime="text/plain", key="metrics_export")
+    if metrics_col2.button("🔬 Profile rerun", key="profile_rerun"):
+        st.session_state.profile_next_rerun = True
+        st.rerun()
 
     st.subheader("Agent Log")
+    log_col1, log_col2 = st.columns(2)
+    log_agent = log_col1.selectbox("Agent", ["All"] + agent_logger.get_agents(), key="log_agent")
+    log_level = log_col2.selectbox("Min level", LOG_LEVELS, key="log_level")
+    log_page_size = 25
+    log_filters = {"agent": None if log_agent == "All" else log_agent, "level": log_level}
+    log_records, log_total = agent_logger.get_records(
+        offset=(st.session_state.get("log_page", 1) - 1) * log_page_size, limit=log_page_size, **log_filters)
+    log_pages = max(1, -(-log_total // log_page_size))
+    if st.session_state.get("log_page", 1) > log_pages: # Filter shrank the result set
+        st.session_state.log_page = log_pages
+        log_records, log_total = agent_logger.get_records(
+            offset=(log_pages - 1) * log_page_size, limit=log_page_size, **log_filters)
+    st.number_input(f"Page (of {log_pages})", min_value=1, max_value=log_pages, step=1, key="log_page")
+
     log_container = st.container(height=300)
-    for entry in reversed(agent_logger.get_logs()): # Show newest first
-        log_container.text(entry)
+    for record in log_records: # Newest first, one page only
+        log_container.text(record.format() if record.level == "INFO" else f"{record.format()} [{record.level}]")
     
     if st.button("Clear Agent Log (Session Only)"):
         agent_logger.clear_logs()
+        st.session_state.log_page = 1
         st.rerun()
 
+# --- Dashboard: counters kept current by triggers (task_stats), no scan of tasks ---
+stats = db_manager.get_stats()
+dashboard_cols = st.columns(8)
+dashboard_cols[0].metric("Pending", stats['by_status'].get("pending", 0))
+dashboard_cols[1].metric("In progress", stats['by_status'].get("in progress", 0))
+dashboard_cols[2].metric("Completed", stats['by_status'].get("completed", 0))
+dashboard_cols[3].metric("Overdue", stats['overdue'], help="Open tasks due before today")
+dashboard_cols[4].metric("Due today", stats['due_today'], help="Open tasks due today")
+for col, priority in zip(dashboard_cols[5:], (1, 2, 3)):
+    col.metric(f"{priority_to_text(priority)} priority", stats['by_priority'].get(priority, 0), help="Open tasks")
+
 # --- Display Reminders ---
-if st.session_state.reminders:
-    st.subheader("🔔 Active Reminders")
-    for rem_msg in st.session_state.reminders:
-        st.warning(rem_msg)
-    if st.button("Dismiss All Reminders"):
-        st.session_state.reminders = []
-        st.rerun()
-    st.markdown("---")
+@st.fragment(run_every="15s") # Poll the feed without rerunning the whole page
+def show_reminders():
+    # The feed is in the database, so this includes reminders delivered by
+    # other processes (e.g. `main.py reminders`), and those not yet dismissed
+    # in an earlier session.
+    for seq, rem_msg in reminder_service.get_fired(after=st.session_state.last_reminder_seq,
+                                                   user_id=st.session_state.user_id, unseen_only=True):
+        st.session_state.reminders.append(rem_msg)
+        st.session_state.last_reminder_seq = seq
+
+    if st.session_state.reminders:
+        st.subheader("🔔 Active Reminders")
+        for rem_msg in st.session_state.reminders:
+            st.warning(rem_msg)
+        if st.button("Dismiss All Reminders"):
+            reminder_service.dismiss(st.session_state.last_reminder_seq, user_id=st.session_state.user_id)
+            st.session_state.reminders = []
+            st.rerun()
+        st.markdown("---")
+
+show_reminders()
 
 
 # --- Task Input Form ---
@@ -111,7 +220,7 @@ if submit_button and raw_task_input:
             # If Planner inferred a due date, use it, otherwise use user's input
             if planned_task.get("due_date"):
                 try:
-                    inferred_dt = datetime.strptime(planned_task["due_date"], '%Y-%m-%d %H:%M:%S')
+                    inferred_dt = timeutil.to_local(planned_task["due_date"])
                     final_due_date = inferred_dt.date()
                     final_due_time = inferred_dt.time()
                 except (ValueError, TypeError): # If parsing fails, fall back to user input
@@ -124,10 +233,10 @@ if submit_button and raw_task_input:
             # Combine date and time if both are provided
             if final_due_date and final_due_time:
                 combined_datetime = datetime.combine(final_due_date, final_due_time)
-                planned_task["due_date"] = combined_datetime.strftime('%Y-%m-%d %H:%M:%S')
+                planned_task["due_date"] = timeutil.to_epoch(combined_datetime)
             elif final_due_date: # Only date provided
                 combined_datetime = datetime.combine(final_due_date, time(0,0)) # Midnight
-                planned_task["due_date"] = combined_datetime.strftime('%Y-%m-%d %H:%M:%S')
+                planned_task["due_date"] = timeutil.to_epoch(combined_datetime)
             else:
                 planned_task["due_date"] = None # No due date
 
@@ -143,6 +252,41 @@ if submit_button and raw_task_input:
             st.warning("Planner Agent could not create a task from the input.")
     st.rerun() # Refresh the task list
 
+with st.expander("📥 Bulk import"):
+    st.caption("One task per line (.txt), or .csv/.jsonl with a description column and optional due_date and priority.")
+    uploaded_file = st.file_uploader("Task list", type=["txt", "csv", "jsonl"], key="bulk_import_file")
+    if uploaded_file is not None and st.button("Import Tasks", key="bulk_import"):
+        progress_bar = st.progress(0.0, text="Importing...")
+        total_bytes = max(uploaded_file.size, 1)
+
+        def show_progress(stats):
+            fraction = min(uploaded_file.tell() / total_bytes, 1.0)
+            progress_bar.progress(fraction, text=f"{stats.scheduled:,} tasks scheduled ({stats.rate:,.0f}/s)")
+
+        # Plans in-process: the upload is already in memory and a process pool
+        # per Streamlit rerun costs more than it saves for typical files.
+        stats = ingest_binary(uploaded_file, uploaded_file.name, workers=0, scheduler=scheduler,
+                              progress=show_progress)
+        progress_bar.progress(1.0, text="Import complete")
+        st.success(f"Imported {stats.scheduled:,} tasks from '{uploaded_file.name}' ({stats}).")
+
+with st.expander("📤 Export"):
+    export_format = st.selectbox("Format", EXPORT_FORMATS, key="export_format",
+                                 format_func={"csv": "CSV", "jsonl": "JSON Lines", "ics": "iCalendar (.ics)"}.get)
+    export_db, export_status = db_manager, st.session_state.status_filter
+
+    def export_file():
+        # Runs only when the button is clicked, on Streamlit's download thread,
+        # not on every rerun. Streamlit serves downloads from memory, so the
+        # encoded file is buffered once; the tasks themselves are streamed.
+        buffer = io.BytesIO()
+        export_to(export_db, export_format, buffer, status_filter=export_status)
+        return buffer
+
+    st.download_button(f"⬇️ Download {export_status} tasks", export_file, key="export_download",
+                       file_name=f"tasks-{st.session_state.user_id}-{export_status.replace(' ', '_')}.{export_format}",
+                       mime=EXPORT_MIME_TYPES[export_format])
+
 # --- Task Display and Management ---
 st.header("📋 My Tasks")
 
@@ -157,32 +301,90 @@ if selected_status != st.session_state.status_filter:
     st.rerun()
 
 
-tasks = db_manager.get_all_tasks(status_filter=st.session_state.status_filter)
+# Completed tasks move to the archive after a while; the history view lists them too
+include_archive = (st.session_state.status_filter in ARCHIVED_STATUSES
+                   and st.checkbox("🗄️ Include archived tasks", key="include_archive"))
+
+search_col, page_size_col = st.columns([3, 1])
+search_text = search_col.text_input("🔍 Search tasks:", key="task_search")
+page_size = page_size_col.selectbox("Tasks per page:", PAGE_SIZE_OPTIONS, index=1, key="page_size")
+
+# Paging restarts whenever the user, filter, search or page size changes
+task_view_key = (st.session_state.user_id, st.session_state.status_filter, include_archive, search_text.strip(),
+                 page_size)
+if st.session_state.get('task_view_key') != task_view_key:
+    st.session_state.task_view_key = task_view_key
+    st.session_state.page_cursors = [None] # Keyset cursor for the start of each visited page
+
+if search_text.strip():
+    tasks = db_manager.search_tasks(search_text, status_filter=st.session_state.status_filter, limit=page_size,
+                                    columns=LIST_COLUMNS)
+    total_tasks = len(tasks)
+    has_next_page = False
+else:
+    # Fetch one extra row to learn whether a next page exists
+    page_rows = db_manager.get_all_tasks(status_filter=st.session_state.status_filter,
+                                         limit=page_size + 1, after=st.session_state.page_cursors[-1],
+                                         columns=LIST_COLUMNS, # No long text; notes load on demand
+                                         include_archive=include_archive)
+    tasks = page_rows[:page_size]
+    has_next_page = len(page_rows) > page_size
+    total_tasks = db_manager.count_tasks(status_filter=st.session_state.status_filter, include_archive=include_archive)
+    if not tasks and len(st.session_state.page_cursors) > 1: # Page emptied by deletes/edits
+        st.session_state.page_cursors.pop()
+        st.rerun()
 
 if not tasks:
     st.info(f"No tasks found with status '{st.session_state.status_filter}'. Try a different filter or add new tasks!")
 else:
+    # --- Bulk Actions ---
+    task_labels = {task['id']: f"#{task['id']} {task['description']}" for task in tasks}
+    selected_ids = st.multiselect("Select tasks for bulk actions:", list(task_labels),
+                                  format_func=task_labels.get, key="bulk_selection")
+    if selected_ids:
+        bulk_cols = st.columns(3)
+        if bulk_cols[0].button(f"✅ Complete {len(selected_ids)}", key="bulk_complete"):
+            db_manager.update_tasks(selected_ids, {"status": "completed"}, events=[user_event("status_changed", status="completed")])
+            agent_logger.log("UserInterface", f"{len(selected_ids)} task(s) marked as 'completed' by user.")
+            del st.session_state["bulk_selection"]
+            st.rerun()
+        if bulk_cols[1].button(f"↩️ Mark {len(selected_ids)} Pending", key="bulk_pending"):
+            db_manager.update_tasks(selected_ids, {"status": "pending"}, events=[user_event("status_changed", status="pending")])
+            agent_logger.log("UserInterface", f"{len(selected_ids)} task(s) marked as 'pending' by user.")
+            del st.session_state["bulk_selection"]
+            st.rerun()
+        if bulk_cols[2].button(f"🗑️ Delete {len(selected_ids)}", key="bulk_delete"):
+            db_manager.delete_tasks(selected_ids)
+            agent_logger.log("UserInterface", f"{len(selected_ids)} task(s) deleted by user.")
+            del st.session_state["bulk_selection"]
+            st.rerun()
+
     for task in tasks:
         task_id = task['id']
-        with st.expander(f"**{task['description']}** (Due: {format_datetime_for_display(task['due_date'])}) - P: {priority_to_text(task['priority'])} - S: {task['status'].capitalize()}"):
-            st.caption(f"Task ID: {task_id} | Created: {format_datetime_for_display(task['created_at'])}")
-            if task['agent_notes']:
-                st.markdown("**Agent Notes:**")
-                st.text(task['agent_notes'])
+        with st.expander(f"**{task['description']}** (Due: {timeutil.format_display(task['due_date'])}) - P: {priority_to_text(task['priority'])} - S: {task['status'].capitalize()}"):
+            st.caption(f"Task ID: {task_id} | Created: {timeutil.format_display(task['created_at'])}")
+            # Expander bodies render even when collapsed, so the history is only
+            # fetched once the user asks for it.
+            if st.toggle("📜 History", key=f"history_{task_id}"):
+                task_events = db_manager.get_task_events(task_id)
+                st.text("\n".join(format_event(event) for event in task_events) if task_events else "No history yet.")
             
             if task.get('reminder_sent_at'):
-                st.caption(f"Last Reminder Sent: {format_datetime_for_display(task['reminder_sent_at'])}")
+                st.caption(f"Last Reminder Sent: {timeutil.format_display(task['reminder_sent_at'])}")
+            if task.get('next_reminder_at'):
+                st.caption(f"Next Reminder: {timeutil.format_display(task['next_reminder_at'])}")
 
 
             # Edit form within the expander
             if st.session_state.editing_task_id == task_id:
+                task = db_manager.get_task(task_id) or task # Full, fresh row for editing
                 with st.form(key=f"edit_form_{task_id}"):
                     st.subheader(f"Edit Task: {task['description'][:30]}...")
                     new_description = st.text_input("Description", value=task['description'])
                     
                     current_due_dt = None
-                    if task['due_date']:
-                        current_due_dt = datetime.strptime(task['due_date'], '%Y-%m-%d %H:%M:%S')
+                    if isinstance(task['due_date'], int):
+                        current_due_dt = timeutil.to_local(task['due_date'])
                     
                     edit_col1, edit_col2 = st.columns(2)
                     with edit_col1:
@@ -207,14 +409,17 @@ else:
                             "status": new_status
                         }
                         if new_due_date and new_due_time:
-                            updates["due_date"] = datetime.combine(new_due_date, new_due_time).strftime('%Y-%m-%d %H:%M:%S')
+                            updates["due_date"] = timeutil.to_epoch(datetime.combine(new_due_date, new_due_time))
                         elif new_due_date: # Only date
-                             updates["due_date"] = datetime.combine(new_due_date, time(0,0)).strftime('%Y-%m-%d %H:%M:%S')
+                             updates["due_date"] = timeutil.to_epoch(datetime.combine(new_due_date, time(0,0)))
                         else: # No due date
                             updates["due_date"] = None
                         
-                        db_manager.update_task(task_id, updates)
-                        agent_logger.log("UserInterface", f"Task ID {task_id} updated by user.")
+                        changes = {key: value for key, value in updates.items() if task.get(key) != value}
+                        if "due_date" in changes: # Readable in the history
+                            changes["due_date"] = timeutil.to_text(changes["due_date"])
+                        db_manager.update_task(task_id, updates, events=[user_event("edited", **changes)] if changes else ())
+                        agent_logger.log("UserInterface", f"Task ID {task_id} updated by user.", task_id=task_id)
                         st.session_state.editing_task_id = None
                         st.success("Task updated!")
                         st.rerun()
@@ -229,20 +434,55 @@ else:
                 
                 if task['status'] != 'completed':
                     if cols[1].button("✅ Mark Complete", key=f"complete_{task_id}"):
-                        db_manager.update_task(task_id, {"status": "completed"})
-                        agent_logger.log("UserInterface", f"Task ID {task_id} marked as 'completed' by user.")
+                        db_manager.update_task(task_id, {"status": "completed"}, events=[user_event("status_changed", status="completed")])
+                        agent_logger.log("UserInterface", f"Task ID {task_id} marked as 'completed' by user.", task_id=task_id)
                         st.rerun()
                 else:
-                    if cols[1].button("↩️ Mark Pending", key=f"uncomplete_{task_id}"): # Option to un-complete
-                        db_manager.update_task(task_id, {"status": "pending"})
-                        agent_logger.log("UserInterface", f"Task ID {task_id} marked as 'pending' by user.")
+                    if cols[1].button("↩️ Mark Pending", key=f"uncomplete_{task_id}"): # Un-completes (and un-archives)
+                        db_manager.update_task(task_id, {"status": "pending"}, events=[user_event("status_changed", status="pending")])
+                        agent_logger.log("UserInterface", f"Task ID {task_id} marked as 'pending' by user.", task_id=task_id)
                         st.rerun()
 
                 if cols[2].button("🗑️ Delete", key=f"delete_{task_id}"):
                     db_manager.delete_task(task_id)
-                    agent_logger.log("UserInterface", f"Task ID {task_id} deleted by user.")
+                    agent_logger.log("UserInterface", f"Task ID {task_id} deleted by user.", task_id=task_id)
                     st.rerun()
 
+# --- Page Controls ---
+if tasks and (has_next_page or len(st.session_state.page_cursors) > 1):
+    page_number = len(st.session_state.page_cursors)
+    first_shown = (page_number - 1) * page_size + 1
+    prev_col, info_col, next_col = st.columns([1, 3, 1])
+    if prev_col.button("◀ Previous", disabled=page_number == 1, key="page_prev"):
+        st.session_state.page_cursors.pop()
+        st.rerun()
+    info_col.caption(f"Page {page_number} of {max(1, -(-total_tasks // page_size))} · "
+                     f"tasks {first_shown}–{first_shown + len(tasks) - 1} of {total_tasks}")
+    if next_col.button("Next ▶", disabled=not has_next_page, key="page_next"):
+        st.session_state.page_cursors.append(db_manager.page_cursor(tasks[-1]))
+        st.rerun()
+
 # --- Final Touches ---
 st.markdown("---")
-st.caption("Built with Streamlit and Multiple Agents.")
\ No newline at end of file
+st.caption("Built with Streamlit and Multiple Agents.")
+
+metrics.observe("ui", "app rerun", perf_counter() - rerun_started)
+active_profiler = st.session_state.pop("active_profiler", None)
+if active_profiler is not None:
+    active_profiler.disable()
+    report = io.StringIO()
+    pstats.Stats(active_profiler, stream=report).sort_stats("cumulative").print_stats(40)
+    with tempfile.NamedTemporaryFile(suffix=".prof") as profile_file:
+        active_profiler.dump_stats(profile_file.name)
+        st.session_state.profile_report = (report.getvalue(), profile_file.read())
+
+if "profile_report" in st.session_state:
+    profile_text, profile_data = st.session_state.profile_report
+    with st.expander("🔬 Profile of the last captured rerun", expanded=True):
+        st.code(profile_text, language=None)
+        profile_cols = st.columns(2)
+        profile_cols[0].download_button("⬇️ Download .prof (snakeviz, pstats)", profile_data,
+                                        file_name="app_rerun.prof", key="profile_download")
+        if profile_cols[1].button("Dismiss", key="profile_dismiss"):
+            del st.session_state.profile_report
+            st.rerun()
\ No newline at end of file
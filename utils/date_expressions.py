@@ -0,0 +1,184 @@
+# utils/date_expressions.py
+# Extracts due dates from free-text task descriptions in a single pass.
+#
+# Supported expressions (case-insensitive):
+#   [by/on] today, tonight, tomorrow
+#   [by/on] next <weekday>, this/on/by <weekday>
+#   in <n> minutes/hours/days/weeks
+#   on/by YYYY-MM-DD
+#   [on/by] <month> <day>[,] [year]   /   [on/by] <day> <month> [year]
+#   times: 5pm, 5:30 pm, at 17:00, at noon, at midnight
+import re
+from datetime import datetime, timedelta, time
+from typing import Iterable, List, NamedTuple, Optional
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+DEFAULT_DUE_TIME = time(17, 0)  # explicit calendar dates default to 5 PM
+
+WEEKDAYS = {name: index for index, name in enumerate(
+    ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])}
+MONTHS = {}
+for _index, _name in enumerate(['january', 'february', 'march', 'april', 'may', 'june', 'july',
+                                'august', 'september', 'october', 'november', 'december'], start=1):
+    MONTHS[_name] = _index
+    MONTHS[_name[:3]] = _index
+MONTHS['sept'] = 9
+
+_WEEKDAY = '|'.join(WEEKDAYS)
+_MONTH = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_UNITS = {'minute': 'minutes', 'min': 'minutes', 'hour': 'hours', 'hr': 'hours',
+          'day': 'days', 'week': 'weeks', 'wk': 'weeks'}
+
+# One alternation, so a single finditer() walk tokenizes the whole input. The
+# shared word boundary and first-character lookahead are hoisted out of the
+# alternatives so most positions are rejected before any branch is tried.
+_EXPRESSION = re.compile(rf'''
+  \b(?=[0-9abdfijmnost])
+  (?:
+    (?P<relday>(?:(?:by|on)\s+)?(?P<relday_word>today|tonight|tomorrow)\b)
+  | (?P<weekday>(?:(?:by|on)\s+)?(?P<weekday_prefix>next|this|on|by)\s+(?P<weekday_name>{_WEEKDAY})\b)
+  | (?P<offset>in\s+(?P<offset_n>\d+)\s+(?P<offset_unit>minute|min|hour|hr|day|week|wk)s?\b)
+  | (?P<iso>(?:(?:by|on)\s+)?(?P<iso_y>\d{{4}})-(?P<iso_m>\d{{2}})-(?P<iso_d>\d{{2}})\b)
+  | (?P<month_day>(?:(?:by|on)\s+)?(?P<md_month>{_MONTH})\.?\s+(?P<md_day>\d{{1,2}})(?:st|nd|rd|th)?\b
+        (?:,?\s+(?P<md_year>\d{{4}})\b)?)
+  | (?P<day_month>(?:(?:by|on)\s+)?(?P<dm_day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<dm_month>{_MONTH})\b
+        (?:,?\s+(?P<dm_year>\d{{4}})\b)?)
+  | (?P<clock>(?:at\s+)?(?P<hour>\d{{1,2}})(?::(?P<minute>\d{{2}}))?\s*(?P<ampm>am|pm|a\.m\.|p\.m\.)(?!\w))
+  | (?P<clock24>at\s+(?P<hour24>\d{{1,2}}):(?P<minute24>\d{{2}})\b)
+  | (?P<named_time>at\s+(?P<named>noon|midnight)\b)
+  )
+''', re.VERBOSE)  # matched against lower-cased text, which is cheaper than IGNORECASE
+_SPACES = re.compile(r'\s{2,}')
+
+# Cheap pre-check: most task descriptions carry no date at all, and rejecting
+# them with a set lookup is far faster than running the full expression.
+_DIGIT = re.compile(r'\d')
+_WORD = re.compile(r'[a-z]+')
+_TRIGGER_WORDS = frozenset(['today', 'tonight', 'tomorrow', 'noon', 'midnight']) | set(WEEKDAYS) | set(MONTHS)
+
+
+class ParsedTask(NamedTuple):
+    description: str  # input with the date/time expressions removed
+    due_date: Optional[datetime]
+    matched: List[str]  # the expressions that were recognised, in order
+
+    @property
+    def due_date_str(self) -> Optional[str]:
+        return self.due_date.strftime(DATE_FORMAT) if self.due_date else None
+
+
+def _resolve_year(now: datetime, month: int, day: int, year: Optional[str]) -> Optional[datetime]:
+    try:
+        if year:
+            return datetime(int(year), month, day)
+        candidate = datetime(now.year, month, day)
+        if candidate.date() < now.date():  # "Jan 5" in December means next year
+            candidate = candidate.replace(year=now.year + 1)
+        return candidate
+    except ValueError:  # e.g. Feb 30
+        return None
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) != len(text):  # keep offsets aligned with `text` (e.g. 'İ' lowers to two chars)
+        lowered = ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    return lowered
+
+
+def parse(text: str, now: Optional[datetime] = None) -> ParsedTask:
+    lowered = _lower(text)
+    if _DIGIT.search(lowered) is None and _TRIGGER_WORDS.isdisjoint(_WORD.findall(lowered)):
+        return ParsedTask(text.strip(), None, [])
+
+    now = now or datetime.now()
+    day = None  # datetime whose date part is the due day
+    clock = None  # explicit time of day
+    default_clock = None  # time used when only a date was given
+    matched = []
+    kept = []
+    last_end = 0
+
+    for match in _EXPRESSION.finditer(lowered):
+        kind = match.lastgroup  # the outermost named group, i.e. the expression type
+        group = match.group
+        resolved_day = None
+        resolved_clock = None
+
+        if kind == 'relday':
+            word = group('relday_word')
+            resolved_day = now + timedelta(days=1) if word == 'tomorrow' else now
+            if word == 'tonight':
+                resolved_clock = time(20, 0)
+        elif kind == 'weekday':
+            days_to_add = (WEEKDAYS[group('weekday_name')] - now.weekday() + 7) % 7
+            if days_to_add == 0 and group('weekday_prefix') == 'next':
+                days_to_add = 7  # "next monday" on a Monday means next week's Monday
+            resolved_day = now + timedelta(days=days_to_add)
+        elif kind == 'offset':
+            amount = int(group('offset_n'))
+            unit = _UNITS[group('offset_unit')]
+            resolved_day = now + timedelta(**{unit: amount})
+            if unit in ('minutes', 'hours'):
+                resolved_clock = resolved_day.time()
+        elif kind == 'iso':
+            try:
+                resolved_day = datetime(int(group('iso_y')), int(group('iso_m')), int(group('iso_d')))
+                default_clock = default_clock or DEFAULT_DUE_TIME
+            except ValueError:
+                resolved_day = None
+        elif kind == 'month_day' or kind == 'day_month':
+            if kind == 'month_day':
+                month, day_of_month, year = group('md_month'), group('md_day'), group('md_year')
+            else:
+                month, day_of_month, year = group('dm_month'), group('dm_day'), group('dm_year')
+            resolved_day = _resolve_year(now, MONTHS[month], int(day_of_month), year)
+            if resolved_day:
+                default_clock = default_clock or DEFAULT_DUE_TIME
+        elif kind == 'clock':
+            hour = int(group('hour'))
+            minute = int(group('minute') or 0)
+            if 1 <= hour <= 12 and minute < 60:
+                hour = hour % 12 + (12 if group('ampm').startswith('p') else 0)
+                resolved_clock = time(hour, minute)
+        elif kind == 'clock24':
+            hour, minute = int(group('hour24')), int(group('minute24'))
+            if hour < 24 and minute < 60:
+                resolved_clock = time(hour, minute)
+        elif kind == 'named_time':
+            resolved_clock = time(12, 0) if group('named') == 'noon' else time(23, 59)
+
+        if resolved_day is None and resolved_clock is None:
+            continue  # looked like a date but wasn't valid; leave it in the text
+        if resolved_day is not None:
+            day = resolved_day
+        if resolved_clock is not None and (clock is None or kind != 'relday'):
+            clock = resolved_clock
+        matched.append(text[match.start():match.end()].strip())
+        kept.append(text[last_end:match.start()])
+        last_end = match.end()
+
+    if not matched:
+        return ParsedTask(text.strip(), None, [])
+
+    kept.append(text[last_end:])
+    description = _SPACES.sub(' ', ''.join(kept)).strip(' ,')
+
+    if day is None:
+        # Only a time was given: today at that time, or tomorrow if it has passed.
+        due = datetime.combine(now.date(), clock)
+        if due <= now:
+            due += timedelta(days=1)
+    elif clock is not None:
+        due = datetime.combine(day.date(), clock)
+    elif default_clock is not None:
+        due = datetime.combine(day.date(), default_clock)
+    else:
+        due = day  # relative days keep the current time of day
+    return ParsedTask(description, due.replace(microsecond=0), matched)
+
+
+def parse_many(inputs: Iterable[str], now: Optional[datetime] = None) -> List[ParsedTask]:
+    # Batch entry point: every input is resolved against the same reference clock.
+    now = now or datetime.now()
+    return [parse(text, now) for text in inputs]
@@ -1,27 +1,142 @@
 # utils/logger.py
+import atexit
 import datetime
+import json
+import os
+import queue
+import threading
+from collections import deque
+from typing import List, NamedTuple, Optional, Tuple
+
+MAX_ENTRIES = 2000  # in-memory ring buffer size
+QUEUE_SIZE = 10000  # pending records for the background writer; overflow is dropped, never blocks
+LOG_FILE = os.environ.get("AGENT_LOG_FILE", os.path.join("logs", "agent_log.jsonl"))  # "" disables
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+class LogRecord(NamedTuple):
+    timestamp: str
+    agent: str
+    level: str
+    message: str
+    task_id: Optional[int] = None
+
+    def format(self) -> str:
+        return f"[{self.timestamp}] [{self.agent}]: {self.message}"
+
+class JsonlSink:
+    # Appends records as JSON lines, rotating to path.1 .. path.N by size.
+    def __init__(self, path: str, max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def write(self, records: List[LogRecord]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record._asdict()) + "\n")
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{index}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
 
 class AgentLog:
     _instance = None
-    log_entries = []
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(AgentLog, cls).__new__(cls)
-            cls._instance.log_entries = []
+            cls._instance.log_entries = deque(maxlen=MAX_ENTRIES)
+            cls._instance.sink = JsonlSink(LOG_FILE) if LOG_FILE else None
+            cls._instance.echo = False
+            cls._instance.dropped = 0
+            cls._instance._queue = queue.Queue(maxsize=QUEUE_SIZE)
+            cls._instance._writer = None
+            cls._instance._writer_lock = threading.Lock()
         return cls._instance
 
-    def log(self, agent_name: str, message: str):
+    def configure(self, path: Optional[str] = None, echo: Optional[bool] = None):
+        # path=None keeps the current sink, "" disables file output.
+        if path is not None:
+            self.sink = JsonlSink(path) if path else None
+        if echo is not None:
+            self.echo = echo
+
+    def log(self, agent_name: str, message: str, level: str = "INFO", task_id: Optional[int] = None):
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = f"[{timestamp}] [{agent_name}]: {message}"
-        self.log_entries.append(entry)
-        print(entry) # Also print to console for debugging
+        record = LogRecord(timestamp, agent_name, level, message, task_id)
+        self.log_entries.append(record)
+        if self.sink is None and not self.echo:
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="AgentLogWriter", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 500:  # drain whatever else is waiting into one write
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.echo:
+                    print("\n".join(record.format() for record in batch))
+                if self.sink is not None:
+                    self.sink.write(batch)
+            except OSError:
+                self.dropped += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        # Blocks until everything queued so far has been written.
+        if self._writer is not None:
+            self._queue.join()
+
+    def get_logs(self) -> List[str]:
+        return [record.format() for record in list(self.log_entries)]
+
+    def get_records(self, agent: Optional[str] = None, level: Optional[str] = None,
+                    offset: int = 0, limit: int = 50) -> Tuple[List[LogRecord], int]:
+        # Newest first. Returns (page, total matching records).
+        min_level = LEVELS.index(level) if level in LEVELS else 0
+        matching = [record for record in reversed(list(self.log_entries))
+                    if (agent is None or record.agent == agent)
+                    and (record.level not in LEVELS or LEVELS.index(record.level) >= min_level)]
+        return matching[offset:offset + limit], len(matching)
 
-    def get_logs(self):
-        return self.log_entries
+    def get_agents(self) -> List[str]:
+        return sorted({record.agent for record in list(self.log_entries)})
 
     def clear_logs(self): # For demo purposes, might want to persist logs differently in prod
-        self.log_entries = []
+        self.log_entries.clear()
 
 # Global instance
-agent_logger = AgentLog()
\ No newline at end of file
+agent_logger = AgentLog()
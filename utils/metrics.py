@@ -0,0 +1,156 @@
+# utils/metrics.py
+# In-process latency histograms for agents, SQL queries and UI reruns.
+#
+# Every series keeps cumulative Prometheus-style buckets (for export) plus a
+# window of recent samples, from which p50/p95/p99 are computed exactly.
+import bisect
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds; +Inf is implicit
+WINDOW = 1024  # recent samples kept per series for percentiles
+METRICS_FILE = os.environ.get("METRICS_FILE", os.path.join("logs", "metrics.prom"))
+KINDS = {  # kind -> (Prometheus metric name, label name)
+    "agent": ("todo_agent_process_seconds", "agent"),
+    "query": ("todo_db_query_seconds", "query"),
+    "ui": ("todo_ui_seconds", "step"),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_COMMENT = re.compile(r"--[^\n]*")
+
+@functools.lru_cache(maxsize=512)
+def sql_shape(sql: str) -> str:
+    # One series per statement shape: whitespace and comments collapsed,
+    # IN (?, ?, ...) lists folded so batch sizes don't multiply series.
+    shape = _WHITESPACE.sub(" ", _SQL_COMMENT.sub(" ", sql)).strip()
+    return _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+class LatencyHistogram:
+    __slots__ = ("bucket_counts", "count", "total", "max", "rows", "recent")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds: float, rows: Optional[int] = None):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if rows is not None and rows > 0:
+            self.rows += rows
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "p50_ms": _percentile(recent, 0.50) * 1000,
+            "p95_ms": _percentile(recent, 0.95) * 1000,
+            "p99_ms": _percentile(recent, 0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "rows": self.rows,
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.enabled = os.environ.get("METRICS_DISABLED", "") == ""
+
+    def observe(self, kind: str, name: str, seconds: float, rows: Optional[int] = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = LatencyHistogram()
+            series.observe(seconds, rows)
+
+    def observe_query(self, sql: str, seconds: float, rows: Optional[int] = None):
+        self.observe("query", sql_shape(sql), seconds, rows)
+
+    @contextmanager
+    def timer(self, kind: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - started)
+
+    def summary(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        # Slowest series (by total time) first.
+        with self._lock:
+            rows = [dict(kind=series_kind, name=name, **series.summary())
+                    for (series_kind, name), series in self._series.items()
+                    if kind is None or series_kind == kind]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> str:
+        # Prometheus text exposition format (version 0.0.4).
+        with self._lock:
+            series = {key: (list(hist.bucket_counts), hist.count, hist.total, hist.rows)
+                      for key, hist in self._series.items()}
+        lines = []
+        for kind, (metric, label) in KINDS.items():
+            entries = sorted((name, data) for (series_kind, name), data in series.items() if series_kind == kind)
+            if not entries:
+                continue
+            lines.append(f"# HELP {metric} Latency of {kind} calls in seconds.")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, (bucket_counts, count, total, _) in entries:
+                label_value = _escape_label(name)
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + (float("inf"),), bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label}="{label_value}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label}="{label_value}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{{label}="{label_value}"}} {count}')
+            if kind == "query":
+                lines.append("# HELP todo_db_query_rows_total Rows returned or changed per query shape.")
+                lines.append("# TYPE todo_db_query_rows_total counter")
+                for name, (_, _, _, rows) in entries:
+                    lines.append(f'todo_db_query_rows_total{{query="{_escape_label(name)}"}} {rows}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Optional[str] = None) -> str:
+        # Atomic replace, so a node_exporter textfile collector never reads a partial file.
+        path = path or METRICS_FILE
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+        return path
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Global instance
+metrics = MetricsRegistry()
@@ -0,0 +1,116 @@
+# utils/reminder_policy.py
+# When tasks get reminded. DatabaseManager stores each open task's next
+# reminder time in tasks.next_reminder_at, recomputed with the active policy
+# whenever a task is added, rescheduled, completed or reminded, so finding due
+# reminders is a single range scan on that column. Times are epoch seconds
+# (see utils/timeutil.py).
+import json
+import os
+from datetime import timedelta
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+# JSON in hours, e.g. {"lead_hours": [24, 1], "repeat_hours": null,
+# "overdue_hours": [[0, 6], [24, 2]], "stop_after_hours": 168}
+POLICY_ENV = "REMINDER_POLICY"
+
+class ReminderPolicy:
+    def __init__(self, lead_times: Sequence[timedelta] = (timedelta(hours=24),),
+                 repeat_every: Optional[timedelta] = timedelta(hours=6),
+                 overdue_steps: Sequence[Tuple[timedelta, timedelta]] = ((timedelta(0), timedelta(hours=6)),),
+                 stop_after: Optional[timedelta] = None):
+        # lead_times: offsets before the due date that each get a reminder;
+        #   the largest one opens the reminder window (none: remind at the due date).
+        # repeat_every: between lead times, re-remind this often until due
+        #   (None: lead-time reminders only).
+        # overdue_steps: (overdue by at least, remind every) pairs; the largest
+        #   threshold reached applies, so reminders can escalate (or back off)
+        #   the longer a task stays overdue.
+        # stop_after: no more reminders once a task is this far overdue.
+        # The defaults are the original rules: from 24 hours before the due
+        # date, at most once every 6 hours, indefinitely.
+        if not overdue_steps or any(interval <= timedelta(0) for _, interval in overdue_steps):
+            raise ValueError("overdue_steps needs at least one step, with positive intervals")
+        if repeat_every is not None and repeat_every <= timedelta(0):
+            raise ValueError("repeat_every must be positive")
+        self.lead_times = tuple(sorted(lead_times, reverse=True))
+        self.repeat_every = repeat_every
+        self.overdue_steps = tuple(sorted(overdue_steps))
+        self.stop_after = stop_after
+        # The same, in whole seconds, for next_reminder()
+        self._leads = tuple(int(lead.total_seconds()) for lead in self.lead_times)
+        self._repeat = int(repeat_every.total_seconds()) if repeat_every is not None else None
+        self._overdue = tuple((int(threshold.total_seconds()), int(interval.total_seconds()))
+                              for threshold, interval in self.overdue_steps)
+        self._stop = int(stop_after.total_seconds()) if stop_after is not None else None
+
+    def next_reminder(self, due: int, reminded_at: Optional[int] = None) -> Optional[int]:
+        # Epoch seconds of the next reminder for a task due at `due`, last
+        # reminded at `reminded_at`; None when there are no more.
+        points = [due - lead for lead in self._leads] or [due]  # earliest first
+        if reminded_at is None or reminded_at < points[0]:
+            return points[0]  # never reminded in this window (or the due date moved)
+        if reminded_at < due:
+            candidates = [point for point in points if point > reminded_at]
+            if self._repeat is not None:
+                candidates.append(reminded_at + self._repeat)
+            return min(candidates) if candidates else due
+        overdue_by = reminded_at - due
+        interval = [interval for threshold, interval in self._overdue if threshold <= overdue_by]
+        when = reminded_at + (interval[-1] if interval else self._overdue[0][1])
+        if self._stop is not None and when - due > self._stop:
+            return None
+        return when
+
+    def schedule(self, status: Optional[str], due_date: Optional[int],
+                 reminder_sent_at: Optional[int] = None) -> Optional[int]:
+        # The stored next_reminder_at value for a task with these columns.
+        # Values that aren't epoch seconds (text a migration couldn't convert)
+        # count as missing.
+        if status == 'completed' or not isinstance(due_date, int):
+            return None
+        return self.next_reminder(due_date, reminder_sent_at if isinstance(reminder_sent_at, int) else None)
+
+    def for_task(self, task: Mapping[str, Any]) -> Optional[int]:
+        # schedule() for a task dict, e.g. one about to be inserted.
+        return self.schedule(task.get('status'), task.get('due_date'), task.get('reminder_sent_at'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        def hours(delta: Optional[timedelta]) -> Optional[float]:
+            return delta.total_seconds() / 3600 if delta is not None else None
+        return {
+            "lead_hours": [hours(lead) for lead in self.lead_times],
+            "repeat_hours": hours(self.repeat_every),
+            "overdue_hours": [[hours(threshold), hours(interval)] for threshold, interval in self.overdue_steps],
+            "stop_after_hours": hours(self.stop_after),
+        }
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> "ReminderPolicy":
+        # Missing keys keep their defaults.
+        def delta(hours: Optional[float]) -> Optional[timedelta]:
+            return timedelta(hours=hours) if hours is not None else None
+        kwargs = {}
+        if "lead_hours" in config:
+            kwargs["lead_times"] = [delta(hours) for hours in config["lead_hours"]]
+        if "repeat_hours" in config:
+            kwargs["repeat_every"] = delta(config["repeat_hours"])
+        if "overdue_hours" in config:
+            kwargs["overdue_steps"] = [(delta(threshold), delta(interval))
+                                       for threshold, interval in config["overdue_hours"]]
+        if "stop_after_hours" in config:
+            kwargs["stop_after"] = delta(config["stop_after_hours"])
+        return cls(**kwargs)
+
+    @classmethod
+    def from_env(cls) -> "ReminderPolicy":
+        config = os.environ.get(POLICY_ENV)
+        return cls.from_dict(json.loads(config)) if config else cls()
+
+    def key(self) -> str:
+        # Stored with the schedule, to detect that it was computed by another policy.
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ReminderPolicy) and self.key() == other.key()
+
+    def __repr__(self):
+        return f"ReminderPolicy({self.key()})"
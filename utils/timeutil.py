@@ -0,0 +1,72 @@
+# utils/timeutil.py
+# Timestamps are stored as integer Unix epoch seconds: absolute instants that
+# SQLite compares and sorts as integers and that need no parsing when read.
+# Text ('YYYY-MM-DD HH:MM:SS' in local time, as the app always used) only
+# appears at the edges: what users type, API JSON, exports and the payloads
+# of task history events. Formatting for display goes through an LRU cache,
+# as every rerun of the task list formats the same instants again.
+import calendar
+import functools
+import time
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+DISPLAY_FORMAT = '%Y-%m-%d %I:%M %p'
+
+Timestamp = Union[int, float, str, datetime]
+
+def now() -> int:
+    return int(time.time())
+
+def parse(text: str) -> int:
+    # 'YYYY-MM-DD HH:MM:SS' (or other ISO 8601 date-times, e.g. with 'T' or a
+    # UTC offset) to epoch seconds; local time unless an offset is given. A
+    # date without a time is rejected rather than read as midnight.
+    text = text.strip()
+    if len(text) <= 10:
+        raise ValueError(f"Expected a date and time, got {text!r}")
+    return int(datetime.fromisoformat(text).timestamp())
+
+def to_epoch(value: Optional[Timestamp]) -> Optional[int]:
+    # Epoch seconds for a stored int, a float from time.time(), a datetime
+    # (naive ones are local time) or text parse() accepts; None stays None.
+    # Raises ValueError (bad text) or TypeError (anything else).
+    if value is None or value == "":
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, str):
+        return parse(value)
+    raise TypeError(f"Not a timestamp: {value!r}")
+
+def to_local(epoch: int) -> datetime:
+    # Timezone-aware datetime in the local zone (for date/time pickers and arithmetic).
+    return datetime.fromtimestamp(epoch, timezone.utc).astimezone()
+
+def local_day(epoch: int) -> int:
+    # The local calendar date as days since 1970-01-01: the due-date buckets
+    # of the task_stats tables, whose triggers compute the same in SQL
+    # (strftime('%s', epoch, 'unixepoch', 'localtime') / 86400).
+    return calendar.timegm(time.localtime(epoch)) // 86400
+
+@functools.lru_cache(maxsize=4096)
+def format_time(epoch: int, fmt: str = DATE_FORMAT) -> str:
+    return time.strftime(fmt, time.localtime(epoch))
+
+def to_text(value: Optional[int]) -> Optional[str]:
+    # 'YYYY-MM-DD HH:MM:SS' local time. None, and text a migration couldn't
+    # read as a timestamp, are returned unchanged.
+    return format_time(value) if isinstance(value, int) else value
+
+def format_display(value: Optional[int]) -> str:
+    # Task list wording, e.g. '2024-05-01 05:00 PM'.
+    if value is None or value == "":
+        return "N/A"
+    if not isinstance(value, int):
+        return "Invalid Date"
+    return format_time(value, DISPLAY_FORMAT)